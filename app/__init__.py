@@ -1,15 +1,33 @@
+import time
+
 from flask import Flask, jsonify, request, redirect, url_for, session
 from flask_sqlalchemy import SQLAlchemy
 from flask_migrate import Migrate
 from flask_login import LoginManager
 from flask_bcrypt import Bcrypt
 
+from app.cache import ResponseCache
+from app.compression import Compression
 from app.config import config
+from app.database import configure_engines
+from app.hashing import PasswordHasher
+from app.instrumentation import Instrumentation
+from app.json_provider import JSONProvider
+from app.live import LiveUpdates
+from app.principal import PrincipalCache
+from app.replicas import ReadReplicas, RoutingSession
 
-db = SQLAlchemy()
+db = SQLAlchemy(session_options={"class_": RoutingSession})
 migrate = Migrate()
 login_manager = LoginManager()
 bcrypt = Bcrypt()
+password_hasher = PasswordHasher()
+response_cache = ResponseCache()
+instrumentation = Instrumentation()
+compression = Compression()
+read_replicas = ReadReplicas()
+principal_cache = PrincipalCache()
+live_updates = LiveUpdates()
 
 
 def create_app(config_name=None):
@@ -19,15 +37,31 @@ def create_app(config_name=None):
 
     app = Flask(__name__)
     app.config.from_object(config[config_name])
+    app.json = JSONProvider(app)
 
     db.init_app(app)
+    configure_engines(app)
+    read_replicas.init_app(app)
     migrate.init_app(app, db)
     login_manager.init_app(app)
+    password_hasher.init_app(app)
     bcrypt.init_app(app)
+    principal_cache.init_app(app)
+    response_cache.init_app(app)
+    compression.init_app(app)
+    live_updates.init_app(app)
 
     @app.before_request
     def make_session_permanent():
-        session.permanent = True
+        # Only touch the session when something changes: a modified session
+        # means a re-signed Set-Cookie on the response
+        if not session.permanent:
+            session.permanent = True
+        if "_user_id" in session:
+            lifetime = app.permanent_session_lifetime.total_seconds()
+            window = app.config["SESSION_REFRESH_WINDOW"].total_seconds()
+            if time.time() - session.get("_issued", 0) > lifetime - window:
+                session["_issued"] = time.time()
 
     @login_manager.unauthorized_handler
     def unauthorized():
@@ -36,6 +70,7 @@ def create_app(config_name=None):
         return redirect(url_for("views.login"))
 
     from app.models import user  # noqa: F401 - register models
+    from app import versioning  # noqa: F401 - register data version events
 
     from app.api import api_bp
     app.register_blueprint(api_bp, url_prefix="/api")
@@ -43,4 +78,6 @@ def create_app(config_name=None):
     from app.views import views_bp
     app.register_blueprint(views_bp)
 
+    instrumentation.init_app(app)
+
     return app
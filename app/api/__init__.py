@@ -2,4 +2,4 @@ from flask import Blueprint
 
 api_bp = Blueprint("api", __name__)
 
-from app.api import auth, programs, workouts, exercises, logs  # noqa: F401, E402
+from app.api import auth, programs, workouts, exercises, logs, analytics, imports, export, idempotency, caching  # noqa: F401, E402
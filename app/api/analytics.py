@@ -0,0 +1,81 @@
+"""Training analytics endpoints.
+
+Like every API GET these are cached and ETagged under the user's
+data_version (see app.api.caching), so repeat views cost nothing until
+the next write.
+"""
+from datetime import date, timedelta
+
+from flask import request, jsonify
+from flask_login import login_required, current_user
+
+from app.api import api_bp
+from app.models.exercise import Exercise
+from app.services.analytics import (
+    FORMULAS, PERIODS, e1rm_trend, load_columns, tonnage_by_muscle_group, volume_by_period,
+)
+
+
+def _date_range():
+    """Parse ?from=&to= (inclusive ISO dates); raises ValueError."""
+    since = request.args.get("from")
+    until = request.args.get("to")
+    since = date.fromisoformat(since) if since else None
+    until = date.fromisoformat(until) + timedelta(days=1) if until else None
+    return since, until
+
+
+def _window(default):
+    return min(max(request.args.get("window", default, type=int), 1), 52)
+
+
+@api_bp.route("/analytics/volume", methods=["GET"])
+@login_required
+def analytics_volume():
+    period = request.args.get("period", "week")
+    if period not in PERIODS:
+        return jsonify({"error": "period must be 'week' or 'month'"}), 400
+    try:
+        since, until = _date_range()
+    except ValueError:
+        return jsonify({"error": "from/to must be YYYY-MM-DD"}), 400
+
+    columns = load_columns(current_user.id, since, until)
+    return jsonify({
+        "period": period,
+        "volume": volume_by_period(columns, period, _window(4)),
+    }), 200
+
+
+@api_bp.route("/analytics/muscle-groups", methods=["GET"])
+@login_required
+def analytics_muscle_groups():
+    try:
+        since, until = _date_range()
+    except ValueError:
+        return jsonify({"error": "from/to must be YYYY-MM-DD"}), 400
+
+    columns = load_columns(current_user.id, since, until)
+    return jsonify(tonnage_by_muscle_group(columns)), 200
+
+
+@api_bp.route("/analytics/e1rm/<int:exercise_id>", methods=["GET"])
+@login_required
+def analytics_e1rm(exercise_id):
+    exercise = Exercise.query.filter_by(id=exercise_id, user_id=current_user.id).first_or_404()
+    formula = request.args.get("formula", "epley")
+    if formula not in FORMULAS:
+        return jsonify({"error": "formula must be 'epley' or 'brzycki'"}), 400
+    try:
+        since, until = _date_range()
+    except ValueError:
+        return jsonify({"error": "from/to must be YYYY-MM-DD"}), 400
+
+    columns = load_columns(current_user.id, since, until, exercise_id=exercise.id)
+    trend = e1rm_trend(columns, formula, _window(5))
+    return jsonify({
+        "exercise": exercise.to_dict(),
+        "formula": formula,
+        "best_e1rm": max((p["e1rm"] for p in trend), default=None),
+        "trend": trend,
+    }), 200
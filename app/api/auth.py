@@ -1,11 +1,19 @@
 from flask import request, jsonify
 from flask_login import login_user, logout_user, login_required, current_user
 
-from app import db, bcrypt
+from app import db, password_hasher
 from app.api import api_bp
+from app.hashing import HasherBusy
 from app.models.user import User
 
 
+@api_bp.errorhandler(HasherBusy)
+def hasher_busy(error):
+    response = jsonify({"error": "Too many sign-ins right now, try again shortly"})
+    response.headers["Retry-After"] = "1"
+    return response, 503
+
+
 @api_bp.route("/auth/register", methods=["POST"])
 def register():
     data = request.get_json()
@@ -36,6 +44,12 @@ def login():
     user = User.query.filter_by(email=email).first()
     if not user or not user.check_password(password):
         return jsonify({"error": "Invalid email or password"}), 401
+    if password_hasher.needs_rehash(user.password_hash):
+        # Stored below the current cost (BCRYPT_LOG_ROUNDS raised, or a
+        # faster host calibrated higher). The new hash also changes the
+        # session stamp (see app.principal), signing out other devices
+        user.set_password(password)
+        db.session.commit()
 
     login_user(user, remember=True)
     return jsonify(user.to_dict()), 200
@@ -0,0 +1,68 @@
+"""Conditional GETs and response caching for the read endpoints.
+
+Every API write bumps the user's data_version (see app.versioning), so
+(user, endpoint, args, version) identifies a response exactly. GETs
+carry a strong ETag derived from that key (weakened if the response is
+compressed); a matching If-None-Match is answered with 304, and otherwise a cached body is served if there is
+one, both before the view runs.
+"""
+import hashlib
+
+from flask import request, jsonify, current_app, g
+from flask_login import login_required, current_user
+
+from app import response_cache
+from app.api import api_bp
+from app.cache import cache_key
+
+# Event streams: no two responses have the same body
+UNCACHED_ENDPOINTS = frozenset({"api.stream_log"})
+
+
+@api_bp.before_request
+def serve_cached_response():
+    if request.method != "GET" or request.endpoint in UNCACHED_ENDPOINTS:
+        return None
+    if not current_user.is_authenticated:
+        return None
+
+    g.cache_key = cache_key(current_user.id, current_user.data_version, request.endpoint, request.args)
+    g.etag = hashlib.sha1(g.cache_key.encode()).hexdigest()
+    if request.if_none_match.contains_weak(g.etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(g.etag)
+        return response
+
+    body = response_cache.get(g.cache_key)
+    if body is None:
+        return None
+    g.pop("cache_key")
+    response = current_app.response_class(body, mimetype="application/json")
+    response.headers["X-Cache"] = "HIT"
+    return response
+
+
+@api_bp.after_request
+def cache_response(response):
+    etag = g.pop("etag", None)
+    key = g.pop("cache_key", None)
+    if etag is None or response.status_code != 200:
+        return response
+    # A replica may lag the data_version read from the primary, so what it
+    # returned can't be tagged or stored under that version
+    if g.get("db_replica_used"):
+        return response
+
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "private, no-cache"
+    # Streamed bodies (e.g. full history) are left alone to keep memory flat
+    if key is not None and not response.is_streamed and response.mimetype == "application/json":
+        response_cache.set(key, response.get_data())
+        response.headers["X-Cache"] = "MISS"
+    return response
+
+
+@api_bp.route("/cache/stats", methods=["GET"])
+@login_required
+def cache_stats():
+    return jsonify(response_cache.stats()), 200
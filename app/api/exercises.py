@@ -3,7 +3,9 @@ from flask_login import login_required, current_user
 
 from app import db
 from app.api import api_bp
-from app.models.exercise import Exercise
+from app.models.exercise import Exercise, MUSCLE_GROUPS
+from app.models.progress import ExerciseProgress
+from app.services import search
 
 
 @api_bp.route("/exercises", methods=["GET"])
@@ -13,6 +15,15 @@ def list_exercises():
     return jsonify([e.to_dict() for e in exercises]), 200
 
 
+@api_bp.route("/exercises/search", methods=["GET"])
+@login_required
+def search_exercises():
+    query = request.args.get("q", "")
+    limit = min(max(request.args.get("limit", 10, type=int), 1), 50)
+    index = search.load_index(current_user.id)
+    return jsonify(index.search(query, limit)), 200
+
+
 @api_bp.route("/exercises", methods=["POST"])
 @login_required
 def create_exercise():
@@ -20,6 +31,7 @@ def create_exercise():
     name = data.get("name", "").strip()
     ex_type = data.get("type", "strength")
     unit = data.get("unit", "reps")
+    muscle_group = data.get("muscle_group")
 
     if not name:
         return jsonify({"error": "Name is required"}), 400
@@ -27,8 +39,10 @@ def create_exercise():
         return jsonify({"error": "Type must be 'strength' or 'cardio'"}), 400
     if unit not in ("reps", "secs", "mins"):
         return jsonify({"error": "Unit must be 'reps', 'secs', or 'mins'"}), 400
+    if muscle_group is not None and muscle_group not in MUSCLE_GROUPS:
+        return jsonify({"error": f"Muscle group must be one of {', '.join(MUSCLE_GROUPS)}"}), 400
 
-    exercise = Exercise(user_id=current_user.id, name=name, type=ex_type, unit=unit)
+    exercise = Exercise(user_id=current_user.id, name=name, type=ex_type, unit=unit, muscle_group=muscle_group)
     db.session.add(exercise)
     db.session.commit()
     return jsonify(exercise.to_dict()), 201
@@ -46,6 +60,8 @@ def update_exercise(exercise_id):
         exercise.type = data["type"]
     if "unit" in data and data["unit"] in ("reps", "secs", "mins"):
         exercise.unit = data["unit"]
+    if "muscle_group" in data and (data["muscle_group"] is None or data["muscle_group"] in MUSCLE_GROUPS):
+        exercise.muscle_group = data["muscle_group"]
 
     db.session.commit()
     return jsonify(exercise.to_dict()), 200
@@ -55,6 +71,7 @@ def update_exercise(exercise_id):
 @login_required
 def delete_exercise(exercise_id):
     exercise = Exercise.query.filter_by(id=exercise_id, user_id=current_user.id).first_or_404()
+    ExerciseProgress.query.filter_by(exercise_id=exercise.id).delete()
     db.session.delete(exercise)
     db.session.commit()
     return jsonify({"message": "Deleted"}), 200
@@ -0,0 +1,22 @@
+from datetime import date
+
+from flask import request, jsonify, Response, stream_with_context
+from flask_login import login_required, current_user
+
+from app import db
+from app.api import api_bp
+from app.services.export import EXPORT_FORMATS, iter_chunks
+
+
+@api_bp.route("/export", methods=["GET"])
+@login_required
+def export_history():
+    fmt = request.args.get("format", "csv")
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}), 400
+
+    mimetype, extension, stream = EXPORT_FORMATS[fmt]
+    body = stream(iter_chunks(db.session, current_user.id))
+    response = Response(stream_with_context(body), mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="workouts-{date.today().isoformat()}.{extension}"'
+    return response
@@ -0,0 +1,110 @@
+"""Idempotency-Key support for API writes.
+
+The service worker replays queued writes after a connection drops, so
+the same request can arrive more than once. The first request for a key
+claims it by committing a pending row before its view runs; the response
+is stored on that row afterwards and returned again for any repeat. A
+repeat that arrives while the first is still running gets a 409, so two
+copies can never both apply.
+
+If the process dies between the view's commit and storing the response,
+the key stays pending, and repeats keep getting 409 rather than applying
+the write a second time, until the key expires.
+"""
+from datetime import datetime, timedelta, timezone
+
+from flask import request, jsonify, current_app, g
+from flask_login import current_user
+from sqlalchemy.exc import IntegrityError
+
+from app import db
+from app.api import api_bp
+from app.models.idempotency import IdempotencyKey
+
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+KEY_TTL = timedelta(days=1)
+
+
+def _saved(user_id, key):
+    return IdempotencyKey.query.filter_by(user_id=user_id, key=key).first()
+
+
+@api_bp.before_request
+def replay_idempotent_request():
+    key = request.headers.get(IDEMPOTENCY_HEADER)
+    if not key or request.method in ("GET", "HEAD", "OPTIONS"):
+        return None
+    if len(key) > 64:
+        return jsonify({"error": f"{IDEMPOTENCY_HEADER} must be at most 64 characters"}), 400
+    if not current_user.is_authenticated:
+        return None
+
+    # The view may log the user out (POST /api/auth/logout), so keep who sent it
+    user_id = current_user.id
+    saved = _saved(user_id, key)
+    if saved is None:
+        db.session.add(IdempotencyKey(user_id=user_id, key=key, method=request.method, path=request.path))
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # A concurrent request with the same key claimed it first
+            db.session.rollback()
+            saved = _saved(user_id, key)
+        else:
+            g.idempotency_key = (user_id, key)
+            return None
+
+    if saved is not None and (saved.method != request.method or saved.path != request.path):
+        return jsonify({"error": f"{IDEMPOTENCY_HEADER} was already used for a different request"}), 422
+    if saved is None or saved.status_code is None:
+        response = jsonify({"error": f"A request with this {IDEMPOTENCY_HEADER} is still in progress"})
+        response.status_code = 409
+        response.headers["Retry-After"] = "1"
+        return response
+
+    response = current_app.response_class(
+        saved.response_body, status=saved.status_code, mimetype="application/json"
+    )
+    response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+@api_bp.after_request
+def store_idempotent_response(response):
+    pending = g.pop("idempotency_key", None)
+    if pending is None:
+        return response
+
+    user_id, key = pending
+    db.session.rollback()
+    claimed = IdempotencyKey.query.filter_by(user_id=user_id, key=key)
+    if response.status_code >= 500 or response.is_streamed:
+        # Nothing worth replaying; let a retry run the request again
+        claimed.delete()
+    else:
+        claimed.update({
+            "status_code": response.status_code,
+            "response_body": response.get_data(as_text=True),
+        })
+    IdempotencyKey.query.filter(
+        IdempotencyKey.user_id == user_id,
+        IdempotencyKey.created_at < datetime.now(timezone.utc) - KEY_TTL,
+    ).delete()
+    db.session.commit()
+    return response
+
+
+@api_bp.teardown_request
+def release_idempotency_key(exc):
+    # Only still set when the view raised past every error handler
+    pending = g.pop("idempotency_key", None)
+    if pending is None:
+        return
+    user_id, key = pending
+    try:
+        db.session.rollback()
+        IdempotencyKey.query.filter_by(user_id=user_id, key=key).delete()
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        current_app.logger.warning("Couldn't release Idempotency-Key %s", key, exc_info=True)
@@ -0,0 +1,29 @@
+from flask import request, jsonify
+from flask_login import login_required, current_user
+
+from app.api import api_bp
+from app.services.importer import FORMATS, ImportFormatError, detect_format, import_records, parse_records
+
+
+@api_bp.route("/import", methods=["POST"])
+@login_required
+def import_history():
+    """Import an export uploaded as multipart `file` or as the raw request body.
+
+    ?format=csv|ndjson|json, else guessed from the filename or Content-Type.
+    """
+    upload = request.files.get("file")
+    if upload is not None:
+        stream, filename, content_type = upload.stream, upload.filename, upload.content_type
+    else:
+        stream, filename, content_type = request.stream, None, request.content_type
+
+    fmt = request.args.get("format") or detect_format(filename, content_type)
+    if fmt not in FORMATS:
+        return jsonify({"error": f"format must be one of {', '.join(FORMATS)}"}), 400
+
+    try:
+        summary = import_records(current_user.id, parse_records(stream, fmt))
+    except ImportFormatError as e:
+        return jsonify({"error": str(e), "line": e.line}), 400
+    return jsonify(summary), 201
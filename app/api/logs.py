@@ -1,19 +1,107 @@
-from datetime import datetime, timezone
+import base64
+import json
+import time
+from datetime import MAXYEAR, MINYEAR, date, datetime, timezone
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
 
-from flask import request, jsonify
+from flask import request, jsonify, current_app, Response, stream_with_context
 from flask_login import login_required, current_user
+from sqlalchemy import and_, or_, update
+from sqlalchemy.orm import selectinload
 
-from app import db
+from app import db, live_updates
 from app.api import api_bp
 from app.models.log import WorkoutLog, SetLog
-from app.models.workout import Workout, WorkoutExercise
+from app.models.workout import Workout
+from app.serializers import serialize_logs
+from app.services.calendar import day_buckets
+from app.services.progress import apply_set_changes, get_progress, refresh_progress, set_values
+from app.services.sets import materialize_sets
+
+
+LOG_PAGE_SIZE = 50
+MAX_LOG_PAGE_SIZE = 200
+LOG_STREAM_CHUNK_SIZE = 200
+PROGRESS_HISTORY_PAGE_SIZE = 20
+SET_FIELDS = ("actual_reps", "weight", "duration_minutes", "completed")
+
+
+def _is_int(value):
+    # bool is an int subclass, but {"id": true} isn't a set id
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+_SET_FIELD_CHECKS = {
+    "actual_reps": lambda v: v is None or _is_int(v),
+    "weight": lambda v: v is None or _is_int(v) or isinstance(v, float),
+    "duration_minutes": lambda v: v is None or _is_int(v),
+    "completed": lambda v: isinstance(v, bool),
+}
+
+
+def _bad_set_field(fields):
+    """Name of the first SET_FIELDS value in fields of the wrong type, if any."""
+    return next((k for k, check in _SET_FIELD_CHECKS.items() if k in fields and not check(fields[k])), None)
+
+
+def _encode_cursor(log):
+    raw = json.dumps([log.started_at.isoformat(), log.id])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def _decode_cursor(cursor):
+    try:
+        started_at, log_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return datetime.fromisoformat(started_at), int(log_id)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_bound(value):
+    """A from/to query value as the naive UTC datetime started_at is stored as."""
+    bound = datetime.fromisoformat(value)
+    if bound.tzinfo is not None:
+        bound = bound.astimezone(timezone.utc).replace(tzinfo=None)
+    return bound
+
+
+def _logs_page(query, limit, after=None):
+    """Fetch one page of logs, newest first, keyed on (started_at, id)."""
+    if after:
+        started_at, log_id = after
+        query = query.filter(or_(
+            WorkoutLog.started_at < started_at,
+            and_(WorkoutLog.started_at == started_at, WorkoutLog.id < log_id),
+        ))
+    return (
+        query
+        .options(selectinload(WorkoutLog.workout))
+        .order_by(WorkoutLog.started_at.desc(), WorkoutLog.id.desc())
+        .limit(limit)
+        .all()
+    )
+
+
+def _stream_json_array(pages, prefix="[", suffix="]"):
+    dumps = current_app.json.dumps
+    yield prefix
+    first = True
+    for logs in pages:
+        for item in serialize_logs(logs):
+            yield dumps(item) if first else "," + dumps(item)
+            first = False
+    yield suffix
 
 
 @api_bp.route("/logs", methods=["GET"])
 @login_required
 def list_logs():
-    from_date = request.args.get("from")
-    to_date = request.args.get("to")
+    # Timestamps with an offset (a local day's bounds, say) are compared in UTC
+    try:
+        from_date = _parse_bound(request.args["from"]) if request.args.get("from") else None
+        to_date = _parse_bound(request.args["to"]) if request.args.get("to") else None
+    except ValueError:
+        return jsonify({"error": "from and to must be ISO 8601 dates or timestamps"}), 400
 
     query = WorkoutLog.query.filter_by(user_id=current_user.id)
 
@@ -22,8 +110,36 @@ def list_logs():
     if to_date:
         query = query.filter(WorkoutLog.started_at <= to_date)
 
-    logs = query.order_by(WorkoutLog.started_at.desc()).all()
-    return jsonify([log.to_dict(include_sets=True) for log in logs]), 200
+    # Paginated mode: ?limit=N[&cursor=...] returns {"logs": [...], "next_cursor": ...}
+    if "limit" in request.args or "cursor" in request.args:
+        limit = request.args.get("limit", LOG_PAGE_SIZE, type=int)
+        if limit < 1:
+            return jsonify({"error": "limit must be a positive integer"}), 400
+        limit = min(limit, MAX_LOG_PAGE_SIZE)
+
+        after = None
+        if request.args.get("cursor"):
+            after = _decode_cursor(request.args["cursor"])
+            if after is None:
+                return jsonify({"error": "Invalid cursor"}), 400
+
+        logs = _logs_page(query, limit + 1, after)
+        next_cursor = _encode_cursor(logs[limit - 1]) if len(logs) > limit else None
+        suffix = '],"next_cursor":' + current_app.json.dumps(next_cursor) + "}"
+        body = _stream_json_array([logs[:limit]], prefix='{"logs":[', suffix=suffix)
+        return Response(stream_with_context(body), mimetype="application/json"), 200
+
+    # Full history: walk keyset pages so memory stays flat however long it is
+    def pages():
+        after = None
+        while True:
+            logs = _logs_page(query, LOG_STREAM_CHUNK_SIZE, after)
+            yield logs
+            if len(logs) < LOG_STREAM_CHUNK_SIZE:
+                return
+            after = (logs[-1].started_at, logs[-1].id)
+
+    return Response(stream_with_context(_stream_json_array(pages())), mimetype="application/json"), 200
 
 
 @api_bp.route("/logs/calendar", methods=["GET"])
@@ -31,27 +147,41 @@ def list_logs():
 def calendar():
     month = request.args.get("month", type=int)
     year = request.args.get("year", type=int)
-
-    if not month or not year:
-        now = datetime.now(timezone.utc)
-        month = month or now.month
-        year = year or now.year
-
-    start = datetime(year, month, 1, tzinfo=timezone.utc)
-    if month == 12:
-        end = datetime(year + 1, 1, 1, tzinfo=timezone.utc)
+    view = request.args.get("view", "month")
+    tz_name = request.args.get("tz", "UTC")
+
+    try:
+        tz = ZoneInfo(tz_name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return jsonify({"error": f"Unknown timezone '{tz_name}'"}), 400
+    if view not in ("month", "year"):
+        return jsonify({"error": "view must be 'month' or 'year'"}), 400
+    # Keep a year either side so the range and its UTC bounds stay representable
+    if year is not None and not MINYEAR < year < MAXYEAR:
+        return jsonify({"error": f"year must be between {MINYEAR + 1} and {MAXYEAR - 1}"}), 400
+    if month is not None and not 1 <= month <= 12:
+        return jsonify({"error": "month must be between 1 and 12"}), 400
+
+    now = datetime.now(tz)
+    year = year or now.year
+    if view == "year":
+        start, end = date(year, 1, 1), date(year + 1, 1, 1)
     else:
-        end = datetime(year, month + 1, 1, tzinfo=timezone.utc)
-
-    logs = (
-        WorkoutLog.query
-        .filter_by(user_id=current_user.id)
-        .filter(WorkoutLog.started_at >= start, WorkoutLog.started_at < end)
-        .all()
-    )
-
-    dates = list(set(log.started_at.strftime("%Y-%m-%d") for log in logs))
-    return jsonify({"month": month, "year": year, "workout_dates": sorted(dates)}), 200
+        month = month or now.month
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+
+    days = day_buckets(current_user.id, start, end, tz)
+    result = {
+        "year": year,
+        "view": view,
+        "timezone": tz_name,
+        "workout_dates": [d["date"] for d in days],
+        "days": days,
+    }
+    if view == "month":
+        result["month"] = month
+    return jsonify(result), 200
 
 
 @api_bp.route("/logs", methods=["POST"])
@@ -93,45 +223,51 @@ def start_workout():
     db.session.flush()
 
     # Pre-populate sets from workout template
-    workout_exercises = (
-        WorkoutExercise.query
-        .filter_by(workout_id=workout_id)
-        .order_by(WorkoutExercise.position)
-        .all()
-    )
-
-    for we in workout_exercises:
-        if we.exercise.type == "cardio":
-            set_log = SetLog(
-                workout_log_id=log.id,
-                exercise_id=we.exercise_id,
-                set_number=1,
-                duration_minutes=we.default_duration_minutes,
-                completed=False,
-            )
-            db.session.add(set_log)
-        else:
-            for s in range(1, we.default_sets + 1):
-                set_log = SetLog(
-                    workout_log_id=log.id,
-                    exercise_id=we.exercise_id,
-                    set_number=s,
-                    planned_reps=we.default_reps,
-                    actual_reps=we.default_reps,
-                    weight=we.default_weight,
-                    completed=False,
-                )
-                db.session.add(set_log)
+    sets = materialize_sets(log, workout.id)
 
     db.session.commit()
-    return jsonify(log.to_dict(include_sets=True)), 201
+    return jsonify(dict(log.to_dict(), sets=sets)), 201
 
 
 @api_bp.route("/logs/<int:log_id>", methods=["GET"])
 @login_required
 def get_log(log_id):
     log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
-    return jsonify(log.to_dict(include_sets=True)), 200
+    return jsonify(serialize_logs([log])[0]), 200
+
+
+@api_bp.route("/logs/<int:log_id>/stream", methods=["GET"])
+@login_required
+def stream_log(log_id):
+    log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
+    if not live_updates.enabled:
+        # No shared broker: updates from other workers would never arrive
+        return "", 204
+    subscription = live_updates.subscribe(log.id)
+    if subscription is None:
+        return jsonify({"error": "Too many live streams open, try again later"}), 503, {"Retry-After": "30"}
+    heartbeat = current_app.config.get("LIVE_HEARTBEAT_SECONDS", 15)
+    max_seconds = current_app.config.get("LIVE_STREAM_MAX_SECONDS", 300)
+
+    # Deliberately not stream_with_context: the request context, and its
+    # database connection, are released before the first event is sent
+    def events():
+        try:
+            yield "retry: 3000\n\n"
+            deadline = time.monotonic() + max_seconds
+            while (remaining := deadline - time.monotonic()) > 0:
+                frame = subscription.get(timeout=min(heartbeat, remaining))
+                # Comments keep proxies from closing an idle connection
+                yield ": keepalive\n\n" if frame is None else frame
+        finally:
+            live_updates.unsubscribe(subscription)
+
+    response = Response(events(), mimetype="text/event-stream")
+    # Also covers a client gone before the first event, when the generator never ran
+    response.call_on_close(lambda: live_updates.unsubscribe(subscription))
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    return response
 
 
 @api_bp.route("/logs/<int:log_id>", methods=["PUT"])
@@ -139,58 +275,39 @@ def get_log(log_id):
 def update_log(log_id):
     log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
     data = request.get_json()
+    sets = None
 
     if "workout_id" in data:
         new_workout_id = data["workout_id"]
         new_workout = Workout.query.filter_by(id=new_workout_id, user_id=current_user.id).first_or_404()
 
         # Clear existing sets if switching workout
+        cleared_exercise_ids = _logged_exercise_ids(log.id)
         SetLog.query.filter_by(workout_log_id=log.id).delete()
+        refresh_progress(current_user.id, cleared_exercise_ids)
 
-        # Update the workout
+        # Update the workout and pre-populate sets from its template
         log.workout_id = new_workout_id
-        db.session.flush()
-
-        # Pre-populate sets from new workout template
-        workout_exercises = (
-            WorkoutExercise.query
-            .filter_by(workout_id=new_workout_id)
-            .order_by(WorkoutExercise.position)
-            .all()
-        )
-
-        for we in workout_exercises:
-            if we.exercise.type == "cardio":
-                set_log = SetLog(
-                    workout_log_id=log.id,
-                    exercise_id=we.exercise_id,
-                    set_number=1,
-                    duration_minutes=we.default_duration_minutes,
-                    completed=False,
-                )
-                db.session.add(set_log)
-            else:
-                for s in range(1, we.default_sets + 1):
-                    set_log = SetLog(
-                        workout_log_id=log.id,
-                        exercise_id=we.exercise_id,
-                        set_number=s,
-                        planned_reps=we.default_reps,
-                        actual_reps=we.default_reps,
-                        weight=we.default_weight,
-                        completed=False,
-                    )
-                    db.session.add(set_log)
+        sets = materialize_sets(log, new_workout.id)
 
+    changed = {}
     if "notes" in data:
-        log.notes = data["notes"]
+        log.notes = changed["notes"] = data["notes"]
     if "body_weight" in data:
-        log.body_weight = data["body_weight"]
+        log.body_weight = changed["body_weight"] = data["body_weight"]
     if data.get("complete"):
         log.completed_at = datetime.now(timezone.utc)
+        changed["completed_at"] = log.completed_at.isoformat()
 
     db.session.commit()
-    return jsonify(log.to_dict(include_sets=True)), 200
+    if sets is not None:
+        # Every set was replaced; watchers refetch rather than get them all here
+        live_updates.publish(log.id, "resync", {})
+    elif changed:
+        live_updates.publish(log.id, "log", {"log": changed})
+    if sets is None:
+        return jsonify(serialize_logs([log])[0]), 200
+    return jsonify(dict(log.to_dict(), sets=sets)), 200
 
 
 @api_bp.route("/logs/<int:log_id>/sets/<int:set_id>", methods=["PUT"])
@@ -198,7 +315,13 @@ def update_log(log_id):
 def update_set(log_id, set_id):
     log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
     set_log = SetLog.query.filter_by(id=set_id, workout_log_id=log.id).first_or_404()
-    data = request.get_json()
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object"}), 400
+    bad = _bad_set_field(data)
+    if bad:
+        return jsonify({"error": f"Invalid {bad}"}), 400
+    before = set_values(set_log)
 
     if "actual_reps" in data:
         set_log.actual_reps = data["actual_reps"]
@@ -209,17 +332,78 @@ def update_set(log_id, set_id):
     if "completed" in data:
         set_log.completed = data["completed"]
 
+    apply_set_changes(current_user.id, log, {set_log.id: (set_log.exercise_id, before, set_values(set_log))})
     db.session.commit()
+    fields = {k: data[k] for k in SET_FIELDS if k in data}
+    if fields:
+        live_updates.publish(log.id, "sets", {"sets": [dict(fields, id=set_log.id)]})
     return jsonify(set_log.to_dict()), 200
 
 
+@api_bp.route("/logs/<int:log_id>/sets", methods=["PATCH"])
+@login_required
+def update_sets(log_id):
+    log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
+    data = request.get_json(silent=True)
+    deltas = data.get("sets") if isinstance(data, dict) else None
+    if not isinstance(deltas, list):
+        return jsonify({"error": "sets must be a list"}), 400
+
+    # Later deltas for the same set win, field by field
+    changes = {}
+    for delta in deltas:
+        if not isinstance(delta, dict) or not _is_int(delta.get("id")):
+            return jsonify({"error": "Each set needs an integer id"}), 400
+        bad = _bad_set_field(delta)
+        if bad:
+            return jsonify({"error": f"Invalid {bad}", "set_id": delta["id"]}), 400
+        fields = {k: delta[k] for k in SET_FIELDS if k in delta}
+        changes.setdefault(delta["id"], {}).update(fields)
+
+    if not changes:
+        return jsonify({"sets": []}), 200
+
+    current = {
+        row.id: row
+        for row in db.session.query(
+            SetLog.id, SetLog.exercise_id, SetLog.completed, SetLog.weight,
+            SetLog.actual_reps, SetLog.duration_minutes,
+        ).filter(SetLog.workout_log_id == log.id, SetLog.id.in_(changes))
+    }
+    missing = sorted(set(changes) - set(current))
+    if missing:
+        return jsonify({"error": "Set not found", "set_ids": missing}), 404
+
+    updates = [dict(fields, id=set_id) for set_id, fields in changes.items() if fields]
+    if updates:
+        db.session.execute(update(SetLog), updates)
+        apply_set_changes(current_user.id, log, {
+            set_id: (row.exercise_id, set_values(row), set_values(row, **changes[set_id]))
+            for set_id, row in current.items()
+        })
+    db.session.commit()
+    if updates:
+        live_updates.publish(log.id, "sets", {"sets": updates})
+
+    set_logs = (
+        SetLog.query
+        .filter(SetLog.id.in_(changes))
+        .options(selectinload(SetLog.exercise))
+        .order_by(SetLog.id)
+        .all()
+    )
+    return jsonify({"sets": [s.to_dict() for s in set_logs]}), 200
+
+
 @api_bp.route("/logs/<int:log_id>/sets/<int:set_id>", methods=["DELETE"])
 @login_required
 def delete_set(log_id, set_id):
     log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
     set_log = SetLog.query.filter_by(id=set_id, workout_log_id=log.id).first_or_404()
     db.session.delete(set_log)
+    refresh_progress(current_user.id, [set_log.exercise_id])
     db.session.commit()
+    live_updates.publish(log.id, "set_deleted", {"id": set_id})
     return jsonify({"message": "Deleted"}), 200
 
 
@@ -227,7 +411,9 @@ def delete_set(log_id, set_id):
 @login_required
 def delete_log(log_id):
     log = WorkoutLog.query.filter_by(id=log_id, user_id=current_user.id).first_or_404()
+    exercise_ids = _logged_exercise_ids(log.id)
     db.session.delete(log)
+    refresh_progress(current_user.id, exercise_ids)
     db.session.commit()
     return jsonify({"message": "Deleted"}), 200
 
@@ -238,69 +424,68 @@ def exercise_progress(exercise_id):
     from app.models.exercise import Exercise
 
     exercise = Exercise.query.filter_by(id=exercise_id, user_id=current_user.id).first_or_404()
+    limit = min(max(request.args.get("limit", PROGRESS_HISTORY_PAGE_SIZE, type=int), 1), MAX_LOG_PAGE_SIZE)
+    offset = max(request.args.get("offset", 0, type=int), 0)
 
-    # Get all set logs for this exercise
-    set_logs = (
-        SetLog.query
-        .filter_by(exercise_id=exercise_id)
-        .join(WorkoutLog)
-        .filter(WorkoutLog.user_id == current_user.id)
-        .order_by(WorkoutLog.started_at.desc())
+    # One page of sessions that include this exercise, newest first
+    logs = (
+        WorkoutLog.query
+        .filter(
+            WorkoutLog.user_id == current_user.id,
+            WorkoutLog.id.in_(
+                db.session.query(SetLog.workout_log_id).filter(SetLog.exercise_id == exercise_id)
+            ),
+        )
+        .options(selectinload(WorkoutLog.workout))
+        .order_by(WorkoutLog.started_at.desc(), WorkoutLog.id.desc())
+        .offset(offset)
+        .limit(limit + 1)
         .all()
     )
+    has_more = len(logs) > limit
+    logs = logs[:limit]
+
+    sessions = {
+        log.id: {
+            "log_id": log.id,
+            "date": log.started_at.isoformat(),
+            "workout_name": log.custom_name if log.workout_id is None else log.workout.name,
+            "sets": [],
+        }
+        for log in logs
+    }
+    if sessions:
+        set_logs = (
+            SetLog.query
+            .filter(SetLog.exercise_id == exercise_id, SetLog.workout_log_id.in_(sessions))
+            .order_by(SetLog.id)
+            .all()
+        )
+        for set_log in set_logs:
+            sessions[set_log.workout_log_id]["sets"].append(set_log.to_dict())
 
-    if not set_logs:
-        return jsonify({"exercise": exercise.to_dict(), "history": []}), 200
-
-    # Group by workout log for display
-    sessions = {}
-    for set_log in set_logs:
-        log_id = set_log.workout_log_id
-        if log_id not in sessions:
-            sessions[log_id] = {
-                "log_id": log_id,
-                "date": set_log.workout_log.started_at.isoformat(),
-                "workout_name": set_log.workout_log.custom_name if set_log.workout_log.workout_id is None else set_log.workout_log.workout.name,
-                "sets": [],
-            }
-        sessions[log_id]["sets"].append(set_log.to_dict())
-
-    # Calculate stats for strength exercises
-    stats = {"exercise": exercise.to_dict(), "history": list(sessions.values())}
+    stats = {
+        "exercise": exercise.to_dict(),
+        "history": list(sessions.values()),
+        "next_offset": offset + limit if has_more else None,
+    }
 
+    progress = get_progress(current_user.id, exercise_id)
     if exercise.type == "strength":
-        # Find PR (personal record) - highest weight
-        max_weight = max(
-            (s["weight"] for s in set_logs if s["weight"] and s["completed"]),
-            default=None,
-        )
-        if max_weight:
-            stats["pr"] = max_weight
-
-        # Get recent PRs (last 3 sessions with weight)
-        recent_weights = []
-        seen_weights = set()
-        for set_log in set_logs:
-            if set_log.weight and set_log.completed:
-                w = set_log.weight
-                if w not in seen_weights:
-                    recent_weights.append(w)
-                    seen_weights.add(w)
-                if len(recent_weights) >= 3:
-                    break
-        stats["recent_weights"] = recent_weights
+        if progress.pr_weight:
+            stats["pr"] = progress.pr_weight
+        stats["best_e1rm"] = progress.best_e1rm
+        stats["total_volume"] = progress.total_volume
+        stats["recent_weights"] = progress.recent_weights
     else:
-        # For cardio, show recent durations
-        recent_durations = []
-        seen_durations = set()
-        for set_log in set_logs:
-            if set_log.duration_minutes and set_log.completed:
-                d = set_log.duration_minutes
-                if d not in seen_durations:
-                    recent_durations.append(d)
-                    seen_durations.add(d)
-                if len(recent_durations) >= 3:
-                    break
-        stats["recent_durations"] = recent_durations
+        stats["recent_durations"] = progress.recent_durations
+    stats["session_count"] = progress.session_count
 
     return jsonify(stats), 200
+
+
+def _logged_exercise_ids(log_id):
+    return [
+        row[0]
+        for row in db.session.query(SetLog.exercise_id).filter_by(workout_log_id=log_id).distinct()
+    ]
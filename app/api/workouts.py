@@ -5,13 +5,15 @@ from app import db
 from app.api import api_bp
 from app.models.workout import Workout, WorkoutExercise
 from app.models.exercise import Exercise
+from app.serializers import serialize_workouts
+from app.services.reorder import sync_ordered
 
 
 @api_bp.route("/workouts", methods=["GET"])
 @login_required
 def list_workouts():
     workouts = Workout.query.filter_by(user_id=current_user.id).all()
-    return jsonify([w.to_dict(include_exercises=True) for w in workouts]), 200
+    return jsonify(serialize_workouts(workouts)), 200
 
 
 @api_bp.route("/workouts", methods=["POST"])
@@ -25,14 +27,14 @@ def create_workout():
     workout = Workout(user_id=current_user.id, name=name)
     db.session.add(workout)
     db.session.commit()
-    return jsonify(workout.to_dict(include_exercises=True)), 201
+    return jsonify(serialize_workouts([workout])[0]), 201
 
 
 @api_bp.route("/workouts/<int:workout_id>", methods=["GET"])
 @login_required
 def get_workout(workout_id):
     workout = Workout.query.filter_by(id=workout_id, user_id=current_user.id).first_or_404()
-    return jsonify(workout.to_dict(include_exercises=True)), 200
+    return jsonify(serialize_workouts([workout])[0]), 200
 
 
 @api_bp.route("/workouts/<int:workout_id>", methods=["PUT"])
@@ -45,7 +47,7 @@ def update_workout(workout_id):
         workout.name = data["name"].strip()
 
     db.session.commit()
-    return jsonify(workout.to_dict(include_exercises=True)), 200
+    return jsonify(serialize_workouts([workout])[0]), 200
 
 
 @api_bp.route("/workouts/<int:workout_id>", methods=["DELETE"])
@@ -61,30 +63,44 @@ def delete_workout(workout_id):
 @login_required
 def update_workout_exercises(workout_id):
     workout = Workout.query.filter_by(id=workout_id, user_id=current_user.id).first_or_404()
-    data = request.get_json()
-    exercises_data = data.get("exercises", [])
-
-    # Clear existing
-    WorkoutExercise.query.filter_by(workout_id=workout.id).delete()
-
+    data = request.get_json(silent=True)
+    exercises_data = data.get("exercises", []) if isinstance(data, dict) else None
+    if not isinstance(exercises_data, list):
+        return jsonify({"error": "exercises must be a list"}), 400
+    for ex in exercises_data:
+        # bool is an int subclass, but true isn't an exercise id
+        if (
+            not isinstance(ex, dict)
+            or type(ex.get("exercise_id")) is not int
+            or ("id" in ex and type(ex["id"]) is not int)
+        ):
+            return jsonify({"error": "Each exercise needs an integer exercise_id"}), 400
+
+    requested = {ex["exercise_id"] for ex in exercises_data}
+    owned = set(db.session.scalars(
+        db.select(Exercise.id).where(Exercise.user_id == current_user.id, Exercise.id.in_(requested))
+    ))
+
+    items = []
     for i, ex in enumerate(exercises_data):
-        exercise = Exercise.query.filter_by(id=ex["exercise_id"], user_id=current_user.id).first()
-        if not exercise:
+        if ex.get("exercise_id") not in owned:
             continue
-        we = WorkoutExercise(
-            workout_id=workout.id,
-            exercise_id=exercise.id,
-            position=i,
-            default_sets=ex.get("default_sets", 5),
-            default_reps=ex.get("default_reps", 5),
-            default_weight=ex.get("default_weight"),
-            default_duration_minutes=ex.get("default_duration_minutes"),
-            unit=ex.get("unit", "reps"),
-        )
-        db.session.add(we)
+        item = {
+            "exercise_id": ex["exercise_id"],
+            "position": i,
+            "default_sets": ex.get("default_sets", 5),
+            "default_reps": ex.get("default_reps", 5),
+            "default_weight": ex.get("default_weight"),
+            "default_duration_minutes": ex.get("default_duration_minutes"),
+            "unit": ex.get("unit", "reps"),
+        }
+        if "id" in ex:
+            item["id"] = ex["id"]
+        items.append(item)
+    sync_ordered(WorkoutExercise, "workout_id", workout.id, "exercise_id", items)
 
     db.session.commit()
-    return jsonify(workout.to_dict(include_exercises=True)), 200
+    return jsonify(serialize_workouts([workout])[0]), 200
 
 
 @api_bp.route("/workouts/<int:workout_id>/exercises", methods=["POST"])
@@ -112,7 +128,7 @@ def add_exercise_to_workout(workout_id):
     )
     db.session.add(we)
     db.session.commit()
-    return jsonify(workout.to_dict(include_exercises=True)), 201
+    return jsonify(serialize_workouts([workout])[0]), 201
 
 
 @api_bp.route("/workouts/<int:workout_id>/exercises/<int:we_id>", methods=["PUT"])
@@ -136,7 +152,7 @@ def update_workout_exercise(workout_id, we_id):
         we.unit = data["unit"]
 
     db.session.commit()
-    return jsonify(workout.to_dict(include_exercises=True)), 200
+    return jsonify(serialize_workouts([workout])[0]), 200
 
 
 @api_bp.route("/workouts/<int:workout_id>/exercises/<int:we_id>", methods=["DELETE"])
@@ -146,4 +162,4 @@ def remove_exercise_from_workout(workout_id, we_id):
     we = WorkoutExercise.query.filter_by(id=we_id, workout_id=workout.id).first_or_404()
     db.session.delete(we)
     db.session.commit()
-    return jsonify(workout.to_dict(include_exercises=True)), 200
+    return jsonify(serialize_workouts([workout])[0]), 200
@@ -0,0 +1,152 @@
+"""Pluggable response cache.
+
+Entries are keyed by (user, endpoint, args, data_version), so they never
+need explicit invalidation: a write bumps the version and old entries
+simply stop being asked for until they age out of the LRU (or expire in
+Redis).
+"""
+import threading
+from collections import OrderedDict
+
+
+class LRUBackend:
+    """In-process cache bounded by entry count and total bytes."""
+
+    name = "lru"
+
+    def __init__(self, max_entries=1024, max_bytes=32 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._entries[key] = value
+            self._bytes += len(value)
+            while self._entries and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def delete(self, key):
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class RedisBackend:
+    """Shared cache for multi-worker deployments (any Redis-compatible server)."""
+
+    name = "redis"
+
+    def __init__(self, url, ttl=3600, prefix="wt:"):
+        import redis  # optional dependency, only needed when configured
+
+        self._client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        return self._client.get(self.prefix + key)
+
+    def set(self, key, value):
+        self._client.set(self.prefix + key, value, ex=self.ttl)
+
+    def delete(self, key):
+        self._client.delete(self.prefix + key)
+
+    def clear(self):
+        for key in self._client.scan_iter(match=self.prefix + "*"):
+            self._client.delete(key)
+
+    def stats(self):
+        return {}
+
+
+class ResponseCache:
+    def __init__(self, app=None):
+        self.backend = None
+        self.enabled = False
+        self.entry_max_bytes = 0
+        self._counts = {"hits": 0, "misses": 0, "stores": 0}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("RESPONSE_CACHE_ENABLED", True)
+        self.entry_max_bytes = app.config.get("RESPONSE_CACHE_ENTRY_MAX_BYTES", 1024 * 1024)
+        url = app.config.get("RESPONSE_CACHE_URL")
+        if url:
+            self.backend = RedisBackend(url, ttl=app.config.get("RESPONSE_CACHE_TTL", 3600))
+        else:
+            self.backend = LRUBackend(
+                max_entries=app.config.get("RESPONSE_CACHE_MAX_ENTRIES", 1024),
+                max_bytes=app.config.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024),
+            )
+        app.extensions["response_cache"] = self
+
+    def _count(self, name):
+        with self._lock:
+            self._counts[name] += 1
+
+    def get(self, key):
+        if not self.enabled:
+            return None
+        try:
+            value = self.backend.get(key)
+        except Exception:
+            # A cache outage must never take the API down with it
+            value = None
+        self._count("hits" if value is not None else "misses")
+        return value
+
+    def set(self, key, value):
+        if not self.enabled or len(value) > self.entry_max_bytes:
+            return
+        try:
+            self.backend.set(key, value)
+        except Exception:
+            return
+        self._count("stores")
+
+    def clear(self):
+        if self.backend is not None:
+            self.backend.clear()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = round(stats["hits"] / lookups, 4) if lookups else None
+        stats["backend"] = self.backend.name if self.backend else None
+        stats.update(self.backend.stats() if self.backend else {})
+        return stats
+
+
+def cache_key(user_id, version, endpoint, args):
+    query = "&".join(f"{k}={v}" for k, v in sorted(args.items(multi=True)))
+    return f"{user_id}:{version}:{endpoint}?{query}"
@@ -0,0 +1,112 @@
+"""gzip / brotli compression of large responses.
+
+Brotli is used when the `brotli` package is installed and the client
+prefers it; gzip otherwise. Streamed bodies (the full history export)
+are compressed chunk by chunk so memory stays flat. Compressing changes
+the bytes on the wire, so a strong ETag is weakened, as nginx does; the
+conditional GET check in app.api.caching compares weakly.
+"""
+import zlib
+
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    "application/json",
+    "application/x-ndjson",
+    "text/csv",
+    "text/html",
+    "text/css",
+    "text/javascript",
+    "application/javascript",
+)
+
+
+class _Gzip:
+    def __init__(self, level):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data):
+        return self._compressor.compress(data)
+
+    def finish(self):
+        return self._compressor.flush()
+
+
+class _Brotli:
+    def __init__(self, quality):
+        self._compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data):
+        return self._compressor.process(data)
+
+    def finish(self):
+        return self._compressor.finish()
+
+
+def _compress_stream(chunks, compressor):
+    for chunk in chunks:
+        if isinstance(chunk, str):
+            chunk = chunk.encode()
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.finish()
+
+
+class Compression:
+    def __init__(self, app=None):
+        self.enabled = False
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("COMPRESS_ENABLED", False)
+        if not self.enabled:
+            return
+        self.min_size = app.config.get("COMPRESS_MIN_SIZE", 1024)
+        self.level = app.config.get("COMPRESS_LEVEL", 6)
+        self.brotli_quality = app.config.get("COMPRESS_BROTLI_QUALITY", 4)
+        self.mimetypes = set(app.config.get("COMPRESS_MIMETYPES", DEFAULT_MIMETYPES))
+        self.encodings = (["br"] if brotli is not None else []) + ["gzip"]
+        app.extensions["compression"] = self
+        app.after_request(self._compress)
+
+    def _compressor(self, encoding):
+        if encoding == "br":
+            return _Brotli(self.brotli_quality)
+        return _Gzip(self.level)
+
+    def _compress(self, response):
+        if (
+            response.status_code < 200
+            or response.status_code in (204, 206, 304)
+            or response.direct_passthrough
+            or "Content-Encoding" in response.headers
+            or response.mimetype not in self.mimetypes
+        ):
+            return response
+
+        response.vary.add("Accept-Encoding")
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None:
+            return response
+        if not response.is_streamed and (response.calculate_content_length() or 0) < self.min_size:
+            return response
+
+        compressor = self._compressor(encoding)
+        if response.is_streamed:
+            response.response = _compress_stream(response.response, compressor)
+            response.headers.pop("Content-Length", None)
+        else:
+            response.set_data(compressor.compress(response.get_data()) + compressor.finish())
+        response.headers["Content-Encoding"] = encoding
+
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
@@ -5,11 +5,100 @@ basedir = os.path.abspath(os.path.dirname(__file__))
 instance_path = os.path.join(os.path.dirname(basedir), 'instance')
 
 
+def engine_options(uri):
+    """SQLALCHEMY_ENGINE_OPTIONS suited to the database in uri."""
+    if not uri or uri.startswith("sqlite"):
+        # The sqlite3 driver's own lock wait; PRAGMA busy_timeout covers the rest
+        return {"connect_args": {"timeout": 30}}
+    return {
+        "pool_size": int(os.environ.get("DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get("DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": 30,
+        # Drop connections the server (or a proxy) closed while idle
+        "pool_pre_ping": True,
+        "pool_recycle": int(os.environ.get("DB_POOL_RECYCLE", 1800)),
+    }
+
+
+def replica_binds(urls):
+    """SQLALCHEMY_BINDS entries for a comma-separated list of replica URLs."""
+    urls = [u.strip() for u in (urls or "").split(",") if u.strip()]
+    return {f"replica_{n}": url for n, url in enumerate(urls)}
+
+
 class Config:
     SECRET_KEY = os.environ.get("SECRET_KEY", "dev-secret-change-me")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     PERMANENT_SESSION_LIFETIME = timedelta(days=30)
     REMEMBER_COOKIE_DURATION = timedelta(days=30)
+    # Re-issue the session cookie only once it has less than this left
+    SESSION_REFRESH_EACH_REQUEST = False
+    SESSION_REFRESH_WINDOW = timedelta(days=7)
+
+    # Password hashing (see app.hashing): bcrypt cost fixed by
+    # BCRYPT_LOG_ROUNDS, or calibrated on first use to PASSWORD_HASH_TARGET_MS.
+    # Fix it when several hosts serve the app, so every worker and restart
+    # hashes at the same cost
+    BCRYPT_LOG_ROUNDS = int(os.environ["BCRYPT_LOG_ROUNDS"]) if os.environ.get("BCRYPT_LOG_ROUNDS") else None
+    PASSWORD_HASH_TARGET_MS = int(os.environ.get("PASSWORD_HASH_TARGET_MS", 250))
+    PASSWORD_HASH_WORKERS = int(os.environ["PASSWORD_HASH_WORKERS"]) if os.environ.get("PASSWORD_HASH_WORKERS") else None
+    PASSWORD_HASH_MAX_QUEUE = int(os.environ.get("PASSWORD_HASH_MAX_QUEUE", 16))
+
+    # Logged-in principal (see app.principal): trusted from the in-process
+    # cache for this many seconds before the users row is read again, which
+    # bounds how long a password reset from another process takes to end
+    # existing sessions; 0 reads it on every request
+    PRINCIPAL_CACHE_TTL = int(os.environ.get("PRINCIPAL_CACHE_TTL", 60))
+    PRINCIPAL_CACHE_SIZE = 10000
+
+    # Applied on every new SQLite connection (see app.database)
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "busy_timeout": 30000,
+        "synchronous": "NORMAL",
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -64000,  # KiB
+    }
+
+    # Read replicas (see app.replicas): GETs go to these once a session's
+    # last write is at least READ_REPLICA_STICKY_SECONDS old
+    SQLALCHEMY_BINDS = replica_binds(os.environ.get("DATABASE_REPLICA_URLS"))
+    READ_REPLICA_STICKY_SECONDS = int(os.environ.get("READ_REPLICA_STICKY_SECONDS", 5))
+
+    # Response cache: in-process LRU unless RESPONSE_CACHE_URL points at Redis
+    RESPONSE_CACHE_ENABLED = True
+    RESPONSE_CACHE_URL = os.environ.get("RESPONSE_CACHE_URL")
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MAX_ENTRIES", 1024))
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+    RESPONSE_CACHE_ENTRY_MAX_BYTES = 1024 * 1024
+    RESPONSE_CACHE_TTL = 3600
+
+    # gzip (or brotli, if installed) for text responses over COMPRESS_MIN_SIZE
+    # bytes; turn off when a proxy in front already compresses
+    COMPRESS_ENABLED = os.environ.get("COMPRESS_ENABLED", "true").lower() in ("1", "true", "yes")
+    COMPRESS_MIN_SIZE = int(os.environ.get("COMPRESS_MIN_SIZE", 1024))
+    COMPRESS_LEVEL = 6
+    COMPRESS_BROTLI_QUALITY = 4
+
+    # Live workout updates over SSE (see app.live): on when LIVE_UPDATES_URL
+    # points at Redis. Set LIVE_UPDATES_ENABLED without it only when one
+    # worker serves the app. Streams end after LIVE_STREAM_MAX_SECONDS and
+    # browsers reconnect; each holds a thread meanwhile, so keep
+    # LIVE_MAX_STREAMS below GUNICORN_THREADS (or raise it under gevent)
+    LIVE_UPDATES_URL = os.environ.get("LIVE_UPDATES_URL")
+    LIVE_UPDATES_ENABLED = (
+        os.environ["LIVE_UPDATES_ENABLED"].lower() in ("1", "true", "yes")
+        if os.environ.get("LIVE_UPDATES_ENABLED") else None
+    )
+    LIVE_MAX_STREAMS = int(os.environ.get("LIVE_MAX_STREAMS", 2))
+    LIVE_QUEUE_SIZE = 100
+    LIVE_HEARTBEAT_SECONDS = 15
+    LIVE_STREAM_MAX_SECONDS = int(os.environ.get("LIVE_STREAM_MAX_SECONDS", 300))
+
+    # Per-request SQL/serialization metrics, Server-Timing and /metrics
+    INSTRUMENTATION_ENABLED = os.environ.get("INSTRUMENTATION_ENABLED", "").lower() in ("1", "true", "yes")
+    QUERY_BUDGET = int(os.environ["QUERY_BUDGET"]) if os.environ.get("QUERY_BUDGET") else None
+    METRICS_TOKEN = os.environ.get("METRICS_TOKEN")
 
 
 class DevelopmentConfig(Config):
@@ -17,16 +106,24 @@ class DevelopmentConfig(Config):
     SQLALCHEMY_DATABASE_URI = os.environ.get(
         "DATABASE_URL", f"sqlite:///{os.path.join(instance_path, 'workout.db')}"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class ProductionConfig(Config):
     DEBUG = False
     SQLALCHEMY_DATABASE_URI = os.environ.get("DATABASE_URL")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
 
 
 class TestingConfig(Config):
     TESTING = True
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
+    SQLALCHEMY_BINDS = {}
+    RESPONSE_CACHE_URL = None
+    LIVE_UPDATES_URL = None
+    LIVE_UPDATES_ENABLED = True
+    LIVE_MAX_STREAMS = 4
+    BCRYPT_LOG_ROUNDS = 4
 
 
 config = {
@@ -0,0 +1,29 @@
+"""Per-connection engine setup.
+
+Every new SQLite connection gets the pragmas in SQLITE_PRAGMAS. WAL lets
+readers run alongside a writer, and busy_timeout makes a second writer
+wait for the lock instead of failing with "database is locked".
+"""
+from sqlalchemy import event
+
+
+def _sqlite_connect_listener(pragmas):
+    def on_connect(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+    return on_connect
+
+
+def configure_engines(app):
+    from app import db
+
+    pragmas = app.config.get("SQLITE_PRAGMAS", {})
+    if not pragmas:
+        return
+    with app.app_context():
+        for engine in db.engines.values():
+            if engine.dialect.name == "sqlite":
+                event.listen(engine, "connect", _sqlite_connect_listener(pragmas))
@@ -0,0 +1,142 @@
+"""Password hashing on a bounded pool instead of the request thread.
+
+bcrypt releases the GIL while it works, so a small thread pool lets a
+burst of logins use every core without starving the threads serving
+everything else, and the pending limit turns an overload into quick 503s
+rather than a growing backlog of requests each waiting on a hash.
+
+The cost (BCRYPT_LOG_ROUNDS) is either configured or, when left unset,
+calibrated on the first hash to the highest value whose hash fits within
+PASSWORD_HASH_TARGET_MS. Calibrating then rather than in create_app
+keeps it out of CLI commands and migrations, and runs it in the worker
+that serves requests. Hashes stored with a lower cost are rehashed
+on the user's next successful login; higher ones are left alone, since
+a rehash also signs the user out of their other devices (see
+app.principal) and hosts that calibrated differently would otherwise
+keep rewriting each other's hashes.
+"""
+import os
+import re
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt as _bcrypt
+
+MIN_ROUNDS = 10
+MAX_ROUNDS = 16
+CALIBRATION_SAMPLES = 5
+
+_ROUNDS_RE = re.compile(r"^\$2[abxy]?\$(\d{2})\$")
+
+
+class HasherBusy(Exception):
+    """Too many hashes pending; the client should retry shortly."""
+
+
+def hash_rounds(password_hash):
+    """The bcrypt cost a stored hash was made with, or None if it isn't bcrypt."""
+    match = _ROUNDS_RE.match(password_hash or "")
+    return int(match.group(1)) if match else None
+
+
+def calibrate(target_ms, min_rounds=MIN_ROUNDS, max_rounds=MAX_ROUNDS, samples=CALIBRATION_SAMPLES):
+    """The highest cost whose hash takes at most target_ms here (at least min_rounds)."""
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        _bcrypt.hashpw(b"calibration", _bcrypt.gensalt(min_rounds))
+        timings.append(time.perf_counter() - start)
+    # The median, so one slow or fast sample doesn't move every worker's cost
+    elapsed_ms = statistics.median(timings) * 1000
+    rounds = min_rounds
+    # Each extra round doubles the work
+    while rounds < max_rounds and elapsed_ms * 2 <= target_ms:
+        rounds += 1
+        elapsed_ms *= 2
+    return rounds
+
+
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.rounds = None
+        self.target_ms = 0
+        self.workers = 0
+        self.max_pending = 0
+        self._executor = None
+        self._pending = 0
+        self._counts = {"hashed": 0, "checked": 0, "rejected": 0}
+        self._peak_pending = 0
+        self._wait_seconds = 0.0
+        self._lock = threading.Lock()
+        self._calibration_lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        # None until cost() calibrates it
+        self.rounds = app.config.get("BCRYPT_LOG_ROUNDS")
+        self.target_ms = app.config.get("PASSWORD_HASH_TARGET_MS", 250)
+        self.workers = app.config.get("PASSWORD_HASH_WORKERS") or min(4, os.cpu_count() or 1)
+        self.max_pending = self.workers + app.config.get("PASSWORD_HASH_MAX_QUEUE", 16)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+        # Threads start on first use, so this is safe to create before gunicorn forks
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        app.extensions["password_hasher"] = self
+
+    def cost(self):
+        """The bcrypt cost to hash at, calibrated on first use if not configured."""
+        if self.rounds is None:
+            with self._calibration_lock:
+                if self.rounds is None:
+                    self.rounds = calibrate(self.target_ms)
+        return self.rounds
+
+    def _run(self, kind, fn, *args):
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counts["rejected"] += 1
+                raise HasherBusy()
+            self._pending += 1
+            self._peak_pending = max(self._peak_pending, self._pending)
+        queued = time.perf_counter()
+
+        def job():
+            return time.perf_counter() - queued, fn(*args)
+
+        try:
+            waited, result = self._executor.submit(job).result()
+        finally:
+            with self._lock:
+                self._pending -= 1
+        with self._lock:
+            self._counts[kind] += 1
+            self._wait_seconds += waited
+        return result
+
+    def hash(self, password):
+        from app import bcrypt
+
+        return self._run("hashed", bcrypt.generate_password_hash, password, self.cost()).decode("utf-8")
+
+    def check(self, password_hash, password):
+        from app import bcrypt
+
+        return self._run("checked", bcrypt.check_password_hash, password_hash, password)
+
+    def needs_rehash(self, password_hash):
+        rounds = hash_rounds(password_hash)
+        return rounds is None or rounds < self.cost()
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._counts)
+            stats.update(
+                pending=self._pending,
+                peak_pending=self._peak_pending,
+                queue_wait_seconds=round(self._wait_seconds, 6),
+            )
+        stats.update(workers=self.workers, rounds=self.rounds)
+        return stats
@@ -0,0 +1,189 @@
+"""Opt-in per-endpoint request instrumentation.
+
+When INSTRUMENTATION_ENABLED is set, every request records how many SQL
+statements it ran, time spent in the database, time spent encoding JSON,
+total time and response size. Per-request figures go out in a
+Server-Timing header; running totals per endpoint are served in
+Prometheus text format at /metrics.
+"""
+import threading
+import time
+
+from flask import request, g, has_app_context, current_app
+from sqlalchemy import event
+
+METRIC_PREFIX = "workout_tracker"
+
+# (name, help text, type, key in the per-endpoint totals)
+METRICS = [
+    ("requests_total", "Requests served", "counter", "requests"),
+    ("sql_statements_total", "SQL statements executed", "counter", "statements"),
+    ("db_seconds_total", "Time spent executing SQL", "counter", "db_seconds"),
+    ("serialize_seconds_total", "Time spent encoding JSON", "counter", "serialize_seconds"),
+    ("request_seconds_total", "Wall time from request start to last body byte", "counter", "duration_seconds"),
+    ("response_bytes_total", "Response body bytes", "counter", "response_bytes"),
+    ("query_budget_exceeded_total", "Requests that ran more SQL statements than QUERY_BUDGET", "counter", "over_budget"),
+]
+
+
+def _current_stats():
+    return g.get("_instrumentation") if has_app_context() else None
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if _current_stats() is not None:
+        conn.info.setdefault("_instrumentation_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = _current_stats()
+    starts = conn.info.get("_instrumentation_start")
+    if stats is not None and starts:
+        stats["statements"] += 1
+        stats["db_seconds"] += time.perf_counter() - starts.pop()
+
+
+def _timed_json_provider(app):
+    """Wrap the app's JSON provider so encoding time is attributed to the request."""
+    base = type(app.json)
+
+    class TimedJSONProvider(base):
+        def dumps(self, obj, **kwargs):
+            start = time.perf_counter()
+            try:
+                return super().dumps(obj, **kwargs)
+            finally:
+                stats = _current_stats()
+                if stats is not None:
+                    stats["serialize_seconds"] += time.perf_counter() - start
+
+    TimedJSONProvider.__name__ = f"Timed{base.__name__}"
+    return TimedJSONProvider(app)
+
+
+class Instrumentation:
+    def __init__(self, app=None):
+        self.enabled = False
+        self.query_budget = None
+        self._totals = {}
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.enabled = app.config.get("INSTRUMENTATION_ENABLED", False)
+        if not self.enabled:
+            return
+        self.query_budget = app.config.get("QUERY_BUDGET")
+        app.extensions["instrumentation"] = self
+
+        from app import db
+
+        with app.app_context():
+            for engine in db.engines.values():
+                event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+                event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+        app.json = _timed_json_provider(app)
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.add_url_rule("/metrics", "metrics", self._metrics_view)
+
+    def _start(self):
+        g._instrumentation = {
+            "start": time.perf_counter(),
+            "statements": 0,
+            "db_seconds": 0.0,
+            "serialize_seconds": 0.0,
+            "response_bytes": 0,
+        }
+
+    def _finish(self, response):
+        stats = g.get("_instrumentation")
+        if stats is None:
+            return response
+
+        endpoint = request.endpoint or "unmatched"
+        elapsed = time.perf_counter() - stats["start"]
+        response.headers["Server-Timing"] = (
+            f'db;dur={stats["db_seconds"] * 1000:.2f};desc="{stats["statements"]} queries", '
+            f'serialize;dur={stats["serialize_seconds"] * 1000:.2f}, '
+            f"app;dur={elapsed * 1000:.2f}"
+        )
+
+        # Streamed bodies keep querying after this hook, so totals are
+        # recorded once the last byte has gone out.
+        def count_bytes(chunks):
+            for chunk in chunks:
+                stats["response_bytes"] += len(chunk)
+                yield chunk
+
+        if response.is_streamed:
+            response.response = count_bytes(response.response)
+        else:
+            stats["response_bytes"] = response.calculate_content_length() or 0
+        logger = current_app.logger
+        response.call_on_close(lambda: self._record(endpoint, stats, logger))
+        return response
+
+    def _record(self, endpoint, stats, logger):
+        duration = time.perf_counter() - stats["start"]
+        over_budget = self.query_budget is not None and stats["statements"] > self.query_budget
+        if over_budget:
+            logger.warning(
+                "%s ran %d SQL statements (budget %d)", endpoint, stats["statements"], self.query_budget
+            )
+
+        with self._lock:
+            totals = self._totals.setdefault(endpoint, dict.fromkeys(
+                ("requests", "statements", "db_seconds", "serialize_seconds",
+                 "duration_seconds", "response_bytes", "over_budget"), 0
+            ))
+            totals["requests"] += 1
+            totals["statements"] += stats["statements"]
+            totals["db_seconds"] += stats["db_seconds"]
+            totals["serialize_seconds"] += stats["serialize_seconds"]
+            totals["duration_seconds"] += duration
+            totals["response_bytes"] += stats["response_bytes"]
+            totals["over_budget"] += int(over_budget)
+
+    def snapshot(self):
+        with self._lock:
+            return {endpoint: dict(totals) for endpoint, totals in self._totals.items()}
+
+    def render_prometheus(self):
+        totals = self.snapshot()
+        lines = []
+        for name, help_text, kind, key in METRICS:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            for endpoint in sorted(totals):
+                lines.append(f'{METRIC_PREFIX}_{name}{{endpoint="{endpoint}"}} {totals[endpoint][key]}')
+
+        cache = current_app.extensions.get("response_cache")
+        if cache is not None:
+            stats = cache.stats()
+            for key in ("hits", "misses", "stores"):
+                lines.append(f"# TYPE {METRIC_PREFIX}_response_cache_{key}_total counter")
+                lines.append(f"{METRIC_PREFIX}_response_cache_{key}_total {stats[key]}")
+
+        hasher = current_app.extensions.get("password_hasher")
+        if hasher is not None:
+            stats = hasher.stats()
+            for key in ("hashed", "checked", "rejected"):
+                lines.append(f"# TYPE {METRIC_PREFIX}_password_{key}_total counter")
+                lines.append(f"{METRIC_PREFIX}_password_{key}_total {stats[key]}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_password_hash_queue_wait_seconds_total counter")
+            lines.append(f"{METRIC_PREFIX}_password_hash_queue_wait_seconds_total {stats['queue_wait_seconds']}")
+            for key in ("pending", "peak_pending", "workers", "rounds"):
+                lines.append(f"# TYPE {METRIC_PREFIX}_password_hash_{key} gauge")
+                lines.append(f"{METRIC_PREFIX}_password_hash_{key} {stats[key]}")
+        return "\n".join(lines) + "\n"
+
+    def _metrics_view(self):
+        token = current_app.config.get("METRICS_TOKEN")
+        if token and request.headers.get("Authorization") != f"Bearer {token}":
+            return current_app.response_class("Unauthorized\n", status=401, mimetype="text/plain")
+        return current_app.response_class(
+            self.render_prometheus(), mimetype="text/plain; version=0.0.4"
+        )
@@ -0,0 +1,78 @@
+"""JSON provider that encodes with orjson when it is installed.
+
+Output matches the stdlib path: sorted keys, compact unless debugging,
+non-string keys coerced to strings. Two extensions over Flask's default
+provider apply to both paths:
+
+- SQLAlchemy result rows serialize as objects keyed by column label, so
+  a `select(...)` can be returned without building dicts first;
+- dates and datetimes serialize as ISO 8601 (what every `to_dict` already
+  emits) rather than HTTP dates.
+"""
+import json
+from datetime import date
+
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.engine import Row, RowMapping
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _default(o):
+    if isinstance(o, Row):
+        return o._asdict()
+    if isinstance(o, RowMapping):
+        return dict(o)
+    if isinstance(o, date):
+        return o.isoformat()
+    return DefaultJSONProvider.default(o)
+
+
+class JSONProvider(DefaultJSONProvider):
+    default = staticmethod(_default)
+
+    def __init__(self, app):
+        super().__init__(app)
+        # Flip off to compare against (or fall back to) the stdlib encoder
+        self.native = orjson is not None
+
+    def _pretty(self):
+        return self.compact is False or (self.compact is None and self._app.debug)
+
+    def _orjson_options(self, pretty):
+        options = orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if pretty:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def dumps(self, obj, **kwargs):
+        """Serialize obj; pass indent=None for one line even in debug (NDJSON)."""
+        pretty = self._pretty()
+        if "indent" in kwargs and kwargs["indent"] is None:
+            del kwargs["indent"]
+            pretty = False
+        # Callers passing other encoder options get the stdlib behaviour they asked for
+        if not kwargs:
+            if self.native:
+                try:
+                    return orjson.dumps(obj, default=_default, option=self._orjson_options(pretty)).decode()
+                except TypeError:
+                    # Out-of-range ints and the like; the stdlib encoder copes
+                    pass
+            kwargs = {"indent": 2} if pretty else {"separators": (",", ":")}
+        return super().dumps(obj, **kwargs)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(f"{self.dumps(obj)}\n", mimetype=self.mimetype)
+
+    def loads(self, s, **kwargs):
+        # orjson.JSONDecodeError subclasses json.JSONDecodeError
+        if self.native and not kwargs:
+            return orjson.loads(s)
+        return json.loads(s, **kwargs)
@@ -0,0 +1,215 @@
+"""Live updates for open workout logs over server-sent events.
+
+Endpoints that change a log publish a small delta to the log's channel
+once their transaction has committed; GET /api/logs/<id>/stream relays
+the channel to every device watching that log.
+
+Streams are only served when LIVE_UPDATES_ENABLED, which defaults to
+whether LIVE_UPDATES_URL points at a Redis server: messages are then
+published there and each process relays them to its own subscribers.
+The in-process broker only reaches subscribers in the same process, so
+enable it without Redis only when a single worker serves the app.
+Otherwise the stream answers 204, which tells browsers not to reconnect.
+
+Each open stream holds a worker thread (under gthread), so a process
+serves at most LIVE_MAX_STREAMS at once and answers 503 beyond that.
+
+A subscriber that falls more than LIVE_QUEUE_SIZE messages behind gets
+a "resync" event instead of the backlog and refetches the log. So does
+every subscriber when the Redis listener reconnects after losing its
+connection, since messages published in between are gone.
+"""
+import logging
+import queue
+import threading
+import time
+
+from flask import current_app, request
+
+RESYNC = "event: resync\ndata: {}\n\n"
+
+logger = logging.getLogger(__name__)
+
+
+def channel_for(log_id):
+    return f"log:{log_id}"
+
+
+class Subscription:
+    def __init__(self, channel, size):
+        self.channel = channel
+        self._queue = queue.Queue(maxsize=size)
+        self._overflowed = False
+        self.closed = False
+
+    def put(self, frame):
+        try:
+            self._queue.put_nowait(frame)
+        except queue.Full:
+            self._overflowed = True
+
+    def resync(self):
+        """Have the next get() return RESYNC, e.g. after messages were lost."""
+        self._overflowed = True
+
+    def get(self, timeout):
+        """The next frame to send, or None if nothing arrived within timeout."""
+        if self._overflowed:
+            self._overflowed = False
+            while not self._queue.empty():
+                self._queue.get_nowait()
+            return RESYNC
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class LocalBroker:
+    """Fan-out to subscribers in this process."""
+
+    name = "local"
+
+    def __init__(self, queue_size=100):
+        self.queue_size = queue_size
+        self._channels = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, channel):
+        subscription = Subscription(channel, self.queue_size)
+        with self._lock:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            subscribers = self._channels.get(subscription.channel)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._channels[subscription.channel]
+
+    def publish(self, channel, frame):
+        self._deliver(channel, frame)
+
+    def _deliver(self, channel, frame):
+        with self._lock:
+            subscribers = list(self._channels.get(channel, ()))
+        for subscription in subscribers:
+            subscription.put(frame)
+
+    def _resync_all(self):
+        with self._lock:
+            subscribers = [s for channel in self._channels.values() for s in channel]
+        for subscription in subscribers:
+            subscription.resync()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "channels": len(self._channels),
+                "subscribers": sum(len(s) for s in self._channels.values()),
+            }
+
+
+class RedisBroker(LocalBroker):
+    """Fan-out across processes through Redis pub/sub."""
+
+    name = "redis"
+    # Seconds to wait before reconnecting, doubling per failure up to the max
+    retry_delay = 1.0
+    max_retry_delay = 30.0
+
+    def __init__(self, url, queue_size=100, prefix="wt:live:"):
+        import redis  # optional dependency, only needed when configured
+
+        super().__init__(queue_size)
+        self._client = redis.Redis.from_url(url)
+        self.prefix = prefix
+        self._listener = None
+
+    def subscribe(self, channel):
+        # Started on first use rather than at import, so it runs in the
+        # gunicorn worker and not the preloading master
+        with self._lock:
+            if self._listener is None:
+                self._listener = threading.Thread(target=self._listen, name="live-updates", daemon=True)
+                self._listener.start()
+        return super().subscribe(channel)
+
+    def publish(self, channel, frame):
+        self._client.publish(self.prefix + channel, frame)
+
+    def _listen(self):
+        delay = self.retry_delay
+        reconnecting = False
+        while True:
+            pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+            try:
+                pubsub.psubscribe(self.prefix + "*")
+                if reconnecting:
+                    logger.info("Live updates reconnected to Redis")
+                    self._resync_all()
+                delay = self.retry_delay
+                for message in pubsub.listen():
+                    channel = message["channel"].decode()[len(self.prefix):]
+                    self._deliver(channel, message["data"].decode())
+            except Exception:
+                logger.warning("Live updates lost Redis; retrying in %.0fs", delay, exc_info=True)
+            finally:
+                try:
+                    pubsub.close()
+                except Exception:
+                    pass
+            reconnecting = True
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_retry_delay)
+
+
+class LiveUpdates:
+    def __init__(self, app=None):
+        self.broker = None
+        self.enabled = False
+        self.max_streams = 0
+        self._streams = 0
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        size = app.config.get("LIVE_QUEUE_SIZE", 100)
+        url = app.config.get("LIVE_UPDATES_URL")
+        enabled = app.config.get("LIVE_UPDATES_ENABLED")
+        self.enabled = bool(url) if enabled is None else enabled
+        self.max_streams = app.config.get("LIVE_MAX_STREAMS", 2)
+        self.broker = RedisBroker(url, queue_size=size) if url else LocalBroker(queue_size=size)
+        app.extensions["live_updates"] = self
+
+    def publish(self, log_id, event, data):
+        """Send event to everyone watching log_id, tagged with the writer's X-Client-Id."""
+        if not self.enabled:
+            return
+        payload = dict(data, origin=request.headers.get("X-Client-Id"))
+        frame = f"event: {event}\ndata: {current_app.json.dumps(payload, indent=None)}\n\n"
+        try:
+            self.broker.publish(channel_for(log_id), frame)
+        except Exception:
+            # Watchers catch up on their next resync; the write itself succeeded
+            current_app.logger.warning("Couldn't publish %s for log %s", event, log_id, exc_info=True)
+
+    def subscribe(self, log_id):
+        """A Subscription to log_id, or None if this process is at LIVE_MAX_STREAMS."""
+        with self._lock:
+            if self._streams >= self.max_streams:
+                return None
+            self._streams += 1
+        return self.broker.subscribe(channel_for(log_id))
+
+    def unsubscribe(self, subscription):
+        """Stop delivering to subscription; safe to call more than once."""
+        with self._lock:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            self._streams -= 1
+        self.broker.unsubscribe(subscription)
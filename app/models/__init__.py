@@ -3,6 +3,8 @@ from app.models.program import Program, ProgramWorkoutOrder
 from app.models.workout import Workout, WorkoutExercise
 from app.models.exercise import Exercise
 from app.models.log import WorkoutLog, SetLog
+from app.models.progress import ExerciseProgress
+from app.models.idempotency import IdempotencyKey
 
 __all__ = [
     "User",
@@ -13,4 +15,6 @@ __all__ = [
     "Exercise",
     "WorkoutLog",
     "SetLog",
+    "ExerciseProgress",
+    "IdempotencyKey",
 ]
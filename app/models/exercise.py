@@ -1,14 +1,17 @@
 from app import db
 
+MUSCLE_GROUPS = ("chest", "back", "legs", "shoulders", "arms", "core", "full_body")
+
 
 class Exercise(db.Model):
     __tablename__ = "exercises"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     type = db.Column(db.String(20), nullable=False, default="strength")  # "strength" | "cardio"
     unit = db.Column(db.String(20), default="reps")  # "reps" | "secs" | "mins"
+    muscle_group = db.Column(db.String(20), nullable=True)  # one of MUSCLE_GROUPS
 
     def to_dict(self):
         return {
@@ -16,4 +19,5 @@ class Exercise(db.Model):
             "name": self.name,
             "type": self.type,
             "unit": self.unit,
+            "muscle_group": self.muscle_group,
         }
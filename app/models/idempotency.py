@@ -0,0 +1,22 @@
+from datetime import datetime, timezone
+
+from app import db
+
+
+class IdempotencyKey(db.Model):
+    """The stored response for a write sent with an Idempotency-Key header."""
+
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_id_key"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    key = db.Column(db.String(64), nullable=False)
+    method = db.Column(db.String(10), nullable=False)
+    path = db.Column(db.String(255), nullable=False)
+    # NULL while the first request with the key is still being handled
+    status_code = db.Column(db.Integer, nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
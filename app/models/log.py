@@ -5,6 +5,17 @@ from app import db
 
 class WorkoutLog(db.Model):
     __tablename__ = "workout_logs"
+    __table_args__ = (
+        db.Index("ix_workout_logs_user_id_started_at", "user_id", "started_at"),
+        db.Index("ix_workout_logs_user_id_program_id_completed_at", "user_id", "program_id", "completed_at"),
+        # In-progress logs are looked up on every home page open
+        db.Index(
+            "ix_workout_logs_in_progress",
+            "user_id", "program_id", "started_at",
+            sqlite_where=db.text("completed_at IS NULL"),
+            postgresql_where=db.text("completed_at IS NULL"),
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
@@ -43,6 +54,10 @@ class WorkoutLog(db.Model):
 
 class SetLog(db.Model):
     __tablename__ = "set_logs"
+    __table_args__ = (
+        db.Index("ix_set_logs_workout_log_id_exercise_id", "workout_log_id", "exercise_id"),
+        db.Index("ix_set_logs_exercise_id_workout_log_id", "exercise_id", "workout_log_id"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_log_id = db.Column(db.Integer, db.ForeignKey("workout_logs.id"), nullable=False)
@@ -59,6 +74,7 @@ class SetLog(db.Model):
     def to_dict(self):
         return {
             "id": self.id,
+            "workout_log_id": self.workout_log_id,
             "exercise_id": self.exercise_id,
             "exercise_name": self.exercise.name,
             "exercise_type": self.exercise.type,
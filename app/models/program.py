@@ -7,7 +7,7 @@ class Program(db.Model):
     __tablename__ = "programs"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
 
@@ -46,6 +46,9 @@ class Program(db.Model):
 
 class ProgramWorkoutOrder(db.Model):
     __tablename__ = "program_workout_order"
+    __table_args__ = (
+        db.Index("ix_program_workout_order_program_id_position", "program_id", "position"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     program_id = db.Column(db.Integer, db.ForeignKey("programs.id"), nullable=False)
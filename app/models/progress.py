@@ -0,0 +1,33 @@
+from datetime import datetime, timezone
+
+from app import db
+
+
+class ExerciseProgress(db.Model):
+    """Per-(user, exercise) summary kept current by app.services.progress."""
+
+    __tablename__ = "exercise_progress"
+    __table_args__ = (
+        db.UniqueConstraint("user_id", "exercise_id", name="uq_exercise_progress_user_id_exercise_id"),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    exercise_id = db.Column(db.Integer, db.ForeignKey("exercises.id"), nullable=False)
+    pr_weight = db.Column(db.Float, nullable=True)
+    best_e1rm = db.Column(db.Float, nullable=True)
+    total_volume = db.Column(db.Float, nullable=False, default=0)
+    session_count = db.Column(db.Integer, nullable=False, default=0)
+    recent_weights = db.Column(db.JSON, nullable=False, default=list)
+    recent_durations = db.Column(db.JSON, nullable=False, default=list)
+    updated_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+
+    def to_dict(self):
+        return {
+            "pr": self.pr_weight,
+            "best_e1rm": self.best_e1rm,
+            "total_volume": self.total_volume,
+            "session_count": self.session_count,
+            "recent_weights": self.recent_weights,
+            "recent_durations": self.recent_durations,
+        }
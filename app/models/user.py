@@ -2,7 +2,8 @@ from datetime import datetime, timezone
 
 from flask_login import UserMixin
 
-from app import db, bcrypt, login_manager
+from app import db, login_manager, password_hasher, principal_cache
+from app.principal import auth_stamp
 
 
 class User(UserMixin, db.Model):
@@ -12,6 +13,10 @@ class User(UserMixin, db.Model):
     email = db.Column(db.String(255), unique=True, nullable=False, index=True)
     password_hash = db.Column(db.String(255), nullable=False)
     created_at = db.Column(db.DateTime, default=lambda: datetime.now(timezone.utc))
+    # Bumped on every API write; read endpoints derive their ETags from it
+    data_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
+    # Bumped only when the user's exercises change; keys the search index
+    exercise_version = db.Column(db.Integer, nullable=False, default=0, server_default="0")
 
     programs = db.relationship("Program", backref="user", lazy="dynamic")
     workouts = db.relationship("Workout", backref="user", lazy="dynamic")
@@ -19,10 +24,14 @@ class User(UserMixin, db.Model):
     workout_logs = db.relationship("WorkoutLog", backref="user", lazy="dynamic")
 
     def set_password(self, password):
-        self.password_hash = bcrypt.generate_password_hash(password).decode("utf-8")
+        self.password_hash = password_hasher.hash(password)
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_hasher.check(self.password_hash, password)
+
+    def get_id(self):
+        # Changes with the password, which logs out every existing session
+        return f"{self.id}:{auth_stamp(self.password_hash)}"
 
     def to_dict(self):
         return {
@@ -34,4 +43,4 @@ class User(UserMixin, db.Model):
 
 @login_manager.user_loader
 def load_user(user_id):
-    return db.session.get(User, int(user_id))
+    return principal_cache.load(user_id)
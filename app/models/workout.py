@@ -5,7 +5,7 @@ class Workout(db.Model):
     __tablename__ = "workouts"
 
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey("users.id"), nullable=False, index=True)
     name = db.Column(db.String(100), nullable=False)
 
     workout_exercises = db.relationship(
@@ -31,6 +31,9 @@ class Workout(db.Model):
 
 class WorkoutExercise(db.Model):
     __tablename__ = "workout_exercises"
+    __table_args__ = (
+        db.Index("ix_workout_exercises_workout_id_position", "workout_id", "position"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     workout_id = db.Column(db.Integer, db.ForeignKey("workouts.id"), nullable=False)
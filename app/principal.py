@@ -0,0 +1,163 @@
+"""Authenticate requests without loading the user row every time.
+
+Flask-Login calls the user loader on every request, and almost every
+view only needs ``current_user.id``. Instead of a User, the loader
+returns a Principal from an in-process LRU entry, trusted for
+PRINCIPAL_CACHE_TTL seconds, and otherwise from the users row, which
+refreshes the entry.
+
+Session and remember-cookie ids carry a stamp derived from the password
+hash (see ``get_id``). An id whose stamp is missing or doesn't match
+the cached or stored principal is treated as logged out, so sessions
+from before stamps existed sign in again. A password change therefore
+ends existing sessions immediately in the process that calls
+``PrincipalCache.invalidate`` and in every worker without a cached
+entry, but workers with one keep accepting the old stamp until it
+expires. That includes every server worker when the reset comes from
+another process (manage_user.py reset-password): the cache isn't
+shared, so lower PRINCIPAL_CACHE_TTL if that window is too long.
+"""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from flask import current_app
+from flask_login import UserMixin, user_logged_in
+
+
+def auth_stamp(password_hash):
+    return hashlib.sha256(password_hash.encode("utf-8")).hexdigest()[:16]
+
+
+class Principal(UserMixin):
+    """The logged-in user as most requests see it."""
+
+    def __init__(self, id, email, created_at, stamp):
+        self.id = id
+        self.email = email
+        self.created_at = created_at
+        self.stamp = stamp
+        self._data_version = None
+
+    @classmethod
+    def from_user(cls, user):
+        return cls(user.id, user.email, user.to_dict()["created_at"], auth_stamp(user.password_hash))
+
+    @classmethod
+    def from_snapshot(cls, data):
+        return cls(data["id"], data["email"], data["created_at"], data["stamp"])
+
+    def snapshot(self):
+        return {"id": self.id, "email": self.email, "created_at": self.created_at, "stamp": self.stamp}
+
+    @property
+    def data_version(self):
+        # Read once per request, and always from the row: other workers bump it
+        if self._data_version is None:
+            from app import db
+            from app.models.user import User
+
+            self._data_version = db.session.execute(
+                db.select(User.data_version).where(User.id == self.id)
+            ).scalar_one()
+        return self._data_version
+
+    def get_id(self):
+        return f"{self.id}:{self.stamp}"
+
+    def to_dict(self):
+        return {"id": self.id, "email": self.email, "created_at": self.created_at}
+
+
+class _TTLCache:
+    """Snapshots by user id, bounded by entry count, each kept for ttl seconds."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = (value, time.monotonic() + self.ttl)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class PrincipalCache:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        ttl = app.config.get("PRINCIPAL_CACHE_TTL", 60)
+        # Per app rather than per extension: ids are only unique within a database
+        app.extensions["principal_cache"] = _TTLCache(app.config.get("PRINCIPAL_CACHE_SIZE", 10000), ttl)
+        # Login just read the row: the session's next request needn't
+        user_logged_in.connect(self._cache_login, app)
+
+    @property
+    def _cache(self):
+        return current_app.extensions["principal_cache"]
+
+    def load(self, token):
+        """The Principal for a session/remember-cookie id, or None if it's stale."""
+        user_id, _, stamp = str(token).partition(":")
+        if not stamp or not user_id.isdigit():
+            return None
+        user_id = int(user_id)
+        cache = self._cache
+        if cache.ttl > 0:
+            cached = cache.get(user_id)
+            if cached is not None:
+                if stamp != cached["stamp"]:
+                    return None
+                return Principal.from_snapshot(cached)
+
+        from app import db
+        from app.models.user import User
+
+        user = db.session.get(User, user_id)
+        if user is None:
+            return None
+        principal = Principal.from_user(user)
+        if stamp != principal.stamp:
+            # The password changed since this session logged in
+            return None
+        if cache.ttl > 0:
+            cache.set(user_id, principal.snapshot())
+        return principal
+
+    def _cache_login(self, app, user, **extra):
+        if not isinstance(user, Principal):
+            self.invalidate(user)
+
+    def invalidate(self, user):
+        """Re-cache user's principal after a password change.
+
+        Sessions still carrying the old stamp are logged out by this
+        process on their next request. Other processes only notice once
+        their own entry expires.
+        """
+        cache = self._cache
+        if cache.ttl > 0:
+            cache.set(user.id, Principal.from_user(user).snapshot())
+
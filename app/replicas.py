@@ -0,0 +1,99 @@
+"""Send read-only API requests to read replicas.
+
+Replicas are extra SQLALCHEMY_BINDS named ``replica_<n>`` (see
+``replica_binds`` in app.config). A GET to one of the REPLICA_MODULES
+views picks a replica in a before_request hook, and RoutingSession
+sends that request's SELECTs there. Everything else goes to the
+primary:
+
+- anything that isn't a plain SELECT, and every flush; after the first
+  write the rest of the request stays on the primary;
+- the users table, so the data_version behind ETags and cache keys is
+  always current;
+- PRIMARY_ENDPOINTS, GETs that may write (exercise progress builds its
+  summary row on first view, from what it reads);
+- all requests for at least READ_REPLICA_STICKY_SECONDS after the same
+  session wrote, so users read their own writes while replicas catch up.
+  The session stores a deadline twice that far ahead and only moves it
+  once less than the window remains, so a burst of writes doesn't
+  re-sign the session cookie on every response.
+"""
+import random
+import time
+
+from flask import current_app, g, has_request_context, request, session
+from flask_sqlalchemy.session import Session
+
+REPLICA_BIND_PREFIX = "replica_"
+REPLICA_MODULES = frozenset({
+    "app.api.logs",
+    "app.api.programs",
+    "app.api.workouts",
+    "app.api.exercises",
+    "app.api.export",
+})
+PRIMARY_ENDPOINTS = frozenset({"api.exercise_progress"})
+READ_METHODS = ("GET", "HEAD")
+
+
+class RoutingSession(Session):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        replica = g.get("db_replica") if has_request_context() else None
+        if replica is not None and bind is None:
+            if (
+                not self._flushing
+                and clause is not None
+                and clause.is_select
+                and not _is_users_table(mapper)
+            ):
+                g.db_replica_used = True
+                return self._db.engines[replica]
+            if self._flushing or (clause is not None and clause.is_dml):
+                # Later reads in this request must see the write
+                g.db_replica = None
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+def _is_users_table(mapper):
+    from app.models.user import User
+
+    return mapper is not None and getattr(mapper, "class_", mapper) is User
+
+
+class ReadReplicas:
+    def __init__(self, app=None):
+        self.replicas = []
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.replicas = sorted(
+            key for key in app.config.get("SQLALCHEMY_BINDS") or {}
+            if key.startswith(REPLICA_BIND_PREFIX)
+        )
+        if not self.replicas:
+            return
+        self.sticky_seconds = app.config.get("READ_REPLICA_STICKY_SECONDS", 5)
+        app.extensions["read_replicas"] = self
+        app.before_request(self._choose_bind)
+        app.after_request(self._remember_write)
+
+    def _choose_bind(self):
+        g.db_replica = None
+        g.db_replica_used = False
+        if request.method not in READ_METHODS or request.endpoint in PRIMARY_ENDPOINTS:
+            return
+        view = current_app.view_functions.get(request.endpoint)
+        if getattr(view, "__module__", None) not in REPLICA_MODULES:
+            return
+        if time.time() < session.get("primary_until", 0):
+            return
+        g.db_replica = random.choice(self.replicas)
+
+    def _remember_write(self, response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            now = time.time()
+            if session.get("primary_until", 0) < now + self.sticky_seconds:
+                session["primary_until"] = now + 2 * self.sticky_seconds
+        return response
+
@@ -0,0 +1,112 @@
+"""Response serializers that load a whole subtree in a fixed number of queries.
+
+The model `to_dict(include_...=True)` methods walk dynamic relationships,
+issuing a query per object per level. These take a list of root objects,
+fetch each level for all of them with one IN query, and build the dicts
+from in-memory maps.
+"""
+from sqlalchemy import inspect, select
+from sqlalchemy.orm import joinedload
+
+from app import db
+from app.models.exercise import Exercise
+from app.models.log import SetLog
+from app.models.program import ProgramWorkoutOrder
+from app.models.workout import Workout, WorkoutExercise
+
+# The same keys as SetLog.to_dict, selected as plain rows: the JSON
+# provider encodes rows directly, skipping ORM objects for large histories
+SET_COLUMNS = (
+    SetLog.id,
+    SetLog.workout_log_id,
+    SetLog.exercise_id,
+    Exercise.name.label("exercise_name"),
+    Exercise.type.label("exercise_type"),
+    SetLog.set_number,
+    SetLog.planned_reps,
+    SetLog.actual_reps,
+    SetLog.weight,
+    SetLog.duration_minutes,
+    SetLog.completed,
+)
+
+
+def workout_exercises_by_workout(workout_ids):
+    """Map each workout id to its serialized exercises in position order."""
+    by_workout = {wid: [] for wid in workout_ids}
+    if not by_workout:
+        return by_workout
+    workout_exercises = (
+        WorkoutExercise.query
+        .filter(WorkoutExercise.workout_id.in_(by_workout))
+        .options(joinedload(WorkoutExercise.exercise))
+        .order_by(WorkoutExercise.workout_id, WorkoutExercise.position)
+        .all()
+    )
+    for we in workout_exercises:
+        by_workout[we.workout_id].append(we.to_dict())
+    return by_workout
+
+
+def serialize_workouts(workouts):
+    """Serialize workouts with their exercises, like `to_dict(include_exercises=True)`."""
+    exercises = workout_exercises_by_workout([w.id for w in workouts])
+    return [dict(w.to_dict(), exercises=exercises[w.id]) for w in workouts]
+
+
+def serialize_programs(programs):
+    """Serialize programs with their rotation, like `to_dict(include_workouts=True)`."""
+    order_by_program = {p.id: [] for p in programs}
+    if order_by_program:
+        ordered = (
+            ProgramWorkoutOrder.query
+            .filter(ProgramWorkoutOrder.program_id.in_(order_by_program))
+            .options(joinedload(ProgramWorkoutOrder.workout))
+            .order_by(ProgramWorkoutOrder.program_id, ProgramWorkoutOrder.position)
+            .all()
+        )
+        for pw in ordered:
+            order_by_program[pw.program_id].append(pw)
+
+    exercises = workout_exercises_by_workout(
+        {pw.workout_id for rows in order_by_program.values() for pw in rows}
+    )
+    return [
+        dict(
+            p.to_dict(),
+            workouts=[
+                {
+                    "id": pw.workout.id,
+                    "name": pw.workout.name,
+                    "position": pw.position,
+                    "exercises": [we["exercise_name"] for we in exercises[pw.workout_id]],
+                }
+                for pw in order_by_program[p.id]
+            ],
+        )
+        for p in programs
+    ]
+
+
+def serialize_logs(logs):
+    """Serialize logs with their sets, like `to_dict(include_sets=True)`."""
+    # Pull any workouts the caller didn't eager-load into the identity map,
+    # so `log.workout` below resolves without a query per log
+    missing = {
+        log.workout_id for log in logs
+        if log.workout_id is not None and "workout" in inspect(log).unloaded
+    }
+    if missing:
+        Workout.query.filter(Workout.id.in_(missing)).all()
+
+    sets_by_log = {log.id: [] for log in logs}
+    if sets_by_log:
+        rows = db.session.execute(
+            select(*SET_COLUMNS)
+            .join(Exercise, SetLog.exercise_id == Exercise.id)
+            .where(SetLog.workout_log_id.in_(sets_by_log))
+            .order_by(SetLog.workout_log_id, SetLog.exercise_id, SetLog.set_number, SetLog.id)
+        )
+        for row in rows:
+            sets_by_log[row.workout_log_id].append(row)
+    return [dict(log.to_dict(), sets=sets_by_log[log.id]) for log in logs]
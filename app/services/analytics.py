@@ -0,0 +1,175 @@
+"""Volume, tonnage and estimated-1RM trends.
+
+load_columns() fetches every completed, weighted strength set a user
+logged in one query and transposes the rows into one tuple per column.
+The functions below then work over whole columns with zip, with no ORM
+objects and no per-row attribute lookups. numpy isn't a dependency; the
+data is already in the layout an array library would want.
+"""
+from datetime import timedelta
+
+from sqlalchemy import select
+
+from app import db
+from app.models.exercise import Exercise
+from app.models.log import WorkoutLog, SetLog
+
+COLUMNS = ("log_id", "started_at", "exercise_id", "muscle_group", "weight", "reps")
+PERIODS = ("week", "month")
+
+
+def _epley(weight, reps):
+    return weight * (1 + reps / 30)
+
+
+def _brzycki(weight, reps):
+    return weight * 36 / (37 - reps) if reps < 37 else None
+
+
+# Both give the lifted weight for a single rep
+FORMULAS = {
+    "epley": lambda w, r: w if r == 1 else _epley(w, r),
+    "brzycki": lambda w, r: w if r == 1 else _brzycki(w, r),
+}
+
+
+def load_columns(user_id, since=None, until=None, exercise_id=None):
+    """Return {column: tuple} for the user's sets, oldest first."""
+    query = (
+        select(
+            SetLog.workout_log_id,
+            WorkoutLog.started_at,
+            SetLog.exercise_id,
+            Exercise.muscle_group,
+            SetLog.weight,
+            SetLog.actual_reps,
+        )
+        .join(WorkoutLog, SetLog.workout_log_id == WorkoutLog.id)
+        .join(Exercise, SetLog.exercise_id == Exercise.id)
+        .where(
+            WorkoutLog.user_id == user_id,
+            SetLog.completed.is_(True),
+            SetLog.weight > 0,
+            SetLog.actual_reps > 0,
+        )
+        .order_by(WorkoutLog.started_at, SetLog.id)
+    )
+    if since is not None:
+        query = query.where(WorkoutLog.started_at >= since)
+    if until is not None:
+        query = query.where(WorkoutLog.started_at < until)
+    if exercise_id is not None:
+        query = query.where(SetLog.exercise_id == exercise_id)
+
+    rows = db.session.execute(query).all()
+    if not rows:
+        return {name: () for name in COLUMNS}
+    return dict(zip(COLUMNS, zip(*rows)))
+
+
+def rolling_mean(values, window):
+    """Mean of each value and up to window - 1 before it."""
+    result = []
+    total = 0.0
+    for i, value in enumerate(values):
+        total += value
+        if i >= window:
+            total -= values[i - window]
+        result.append(total / min(i + 1, window))
+    return result
+
+
+def _period_start(moment, period):
+    day = moment.date()
+    if period == "month":
+        return day.replace(day=1)
+    return day - timedelta(days=day.weekday())
+
+
+def _next_period(day, period):
+    if period == "month":
+        return (day + timedelta(days=32)).replace(day=1)
+    return day + timedelta(days=7)
+
+
+def volume_by_period(columns, period="week", window=4):
+    """Tonnage, sets, reps and sessions per week or month, gaps included."""
+    buckets = {}
+    for started_at, weight, reps, log_id in zip(
+        columns["started_at"], columns["weight"], columns["reps"], columns["log_id"]
+    ):
+        key = _period_start(started_at, period)
+        bucket = buckets.get(key)
+        if bucket is None:
+            bucket = buckets[key] = [0.0, 0, 0, set()]
+        bucket[0] += weight * reps
+        bucket[1] += 1
+        bucket[2] += reps
+        bucket[3].add(log_id)
+    if not buckets:
+        return []
+
+    # Idle weeks count as zero in the rolling average
+    keys = []
+    day, last = min(buckets), max(buckets)
+    while day <= last:
+        keys.append(day)
+        day = _next_period(day, period)
+    tonnage = [buckets[k][0] if k in buckets else 0.0 for k in keys]
+    rolling = rolling_mean(tonnage, window)
+
+    result = []
+    for key, value, average in zip(keys, tonnage, rolling):
+        _, sets, reps, logs = buckets.get(key, (0, 0, 0, ()))
+        result.append({
+            "period_start": key.isoformat(),
+            "tonnage": round(value, 1),
+            "sets": sets,
+            "reps": reps,
+            "sessions": len(logs),
+            "rolling_tonnage": round(average, 1),
+        })
+    return result
+
+
+def tonnage_by_muscle_group(columns):
+    """Tonnage and set count per muscle group; unassigned exercises pooled."""
+    groups = {}
+    for group, weight, reps in zip(columns["muscle_group"], columns["weight"], columns["reps"]):
+        totals = groups.setdefault(group or "unassigned", [0.0, 0])
+        totals[0] += weight * reps
+        totals[1] += 1
+    return {
+        group: {"tonnage": round(tonnage, 1), "sets": sets}
+        for group, (tonnage, sets) in sorted(groups.items(), key=lambda item: -item[1][0])
+    }
+
+
+def e1rm_trend(columns, formula="epley", window=5):
+    """Best estimated 1RM per session, oldest first, with a rolling mean."""
+    estimate = FORMULAS[formula]
+    sessions = {}
+    for log_id, started_at, weight, reps in zip(
+        columns["log_id"], columns["started_at"], columns["weight"], columns["reps"]
+    ):
+        e1rm = estimate(weight, reps)
+        if e1rm is None:
+            continue
+        best = sessions.get(log_id)
+        if best is None or e1rm > best[1]:
+            sessions[log_id] = (started_at, e1rm, weight, reps)
+
+    # Columns are in session order, and dicts keep insertion order
+    points = list(sessions.items())
+    rolling = rolling_mean([e1rm for _, (_, e1rm, _, _) in points], window)
+    return [
+        {
+            "log_id": log_id,
+            "date": started_at.isoformat(),
+            "e1rm": round(e1rm, 1),
+            "weight": weight,
+            "reps": reps,
+            "rolling_e1rm": round(average, 1),
+        }
+        for (log_id, (started_at, e1rm, weight, reps)), average in zip(points, rolling)
+    ]
@@ -0,0 +1,93 @@
+"""Per-day activity buckets computed in SQL.
+
+Logs are stored as naive UTC. To bucket them by the user's local day we
+split the requested range into stretches with a constant UTC offset
+(at most a few per year, at DST changes) and shift each stretch by its
+offset inside the query.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+
+from sqlalchemy import Date, case, cast, distinct, func, literal
+
+from app import db
+from app.models.log import WorkoutLog, SetLog
+
+
+def _to_utc(local_dt):
+    return local_dt.astimezone(timezone.utc).replace(tzinfo=None)
+
+
+def offset_segments(tz, start_day, end_day):
+    """Return [(utc_start, utc_end, offset_minutes)] covering [start_day, end_day)."""
+    start = _to_utc(datetime.combine(start_day, time(), tz))
+    end = _to_utc(datetime.combine(end_day, time(), tz))
+
+    def offset_at(utc_dt):
+        return int(utc_dt.replace(tzinfo=timezone.utc).astimezone(tz).utcoffset().total_seconds() // 60)
+
+    segments = []
+    seg_start, seg_offset = start, offset_at(start)
+    cursor = start
+    while cursor < end:
+        step = min(cursor + timedelta(days=1), end)
+        if offset_at(step) != seg_offset or step == end:
+            # Narrow the change down to the hour it happened
+            hour = cursor
+            while hour < step and offset_at(hour) == seg_offset:
+                hour += timedelta(hours=1)
+            change = min(hour, step)
+            segments.append((seg_start, change, seg_offset))
+            seg_start, seg_offset = change, offset_at(change)
+        cursor = step
+    if seg_start < end:
+        segments.append((seg_start, end, seg_offset))
+    return segments
+
+
+def _shifted_date(column, minutes):
+    if db.session.get_bind().dialect.name == "sqlite":
+        return func.date(column, f"{minutes:+d} minutes")
+    return cast(column + literal(timedelta(minutes=minutes)), Date)
+
+
+def local_day(column, segments):
+    if len(segments) == 1:
+        return _shifted_date(column, segments[0][2])
+    return case(
+        *[(column < seg_end, _shifted_date(column, minutes)) for _, seg_end, minutes in segments[:-1]],
+        else_=_shifted_date(column, segments[-1][2]),
+    )
+
+
+def day_buckets(user_id, start_day, end_day, tz):
+    """Workout count, completed count and volume per local day in [start_day, end_day)."""
+    segments = offset_segments(tz, start_day, end_day)
+    day = local_day(WorkoutLog.started_at, segments).label("day")
+    volume = case((SetLog.completed.is_(True), SetLog.weight * SetLog.actual_reps), else_=0)
+
+    rows = (
+        db.session.query(
+            day,
+            func.count(distinct(WorkoutLog.id)),
+            func.count(distinct(case((WorkoutLog.completed_at.isnot(None), WorkoutLog.id)))),
+            func.coalesce(func.sum(volume), 0),
+        )
+        .outerjoin(SetLog, SetLog.workout_log_id == WorkoutLog.id)
+        .filter(
+            WorkoutLog.user_id == user_id,
+            WorkoutLog.started_at >= segments[0][0],
+            WorkoutLog.started_at < segments[-1][1],
+        )
+        .group_by(day)
+        .order_by(day)
+        .all()
+    )
+    return [
+        {
+            "date": d.isoformat() if isinstance(d, date) else d,
+            "count": count,
+            "completed": completed,
+            "volume": volume,
+        }
+        for d, count, completed, volume in rows
+    ]
@@ -0,0 +1,110 @@
+"""Stream a user's whole history out as CSV, NDJSON or column batches.
+
+One query joins logs, sets, exercises and workouts. It is read with
+yield_per, which uses a server-side cursor where the driver has one, so
+memory stays flat and each chunk costs one round trip however many
+years are exported. The record fields match what app.services.importer
+reads, so an export can be imported again.
+"""
+import csv
+import io
+from datetime import datetime
+
+from flask import current_app
+from sqlalchemy import func, select
+
+from app.models.exercise import Exercise
+from app.models.log import WorkoutLog, SetLog
+from app.models.workout import Workout
+
+CHUNK_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    "log_id", "date", "completed_at", "workout", "notes", "body_weight",
+    "exercise", "type", "muscle_group", "set_number", "planned_reps", "reps", "weight",
+    "duration_minutes", "completed",
+)
+
+
+def export_query(user_id):
+    # Sessions without sets still export, as one row with no exercise
+    return (
+        select(
+            WorkoutLog.id.label("log_id"),
+            WorkoutLog.started_at.label("date"),
+            WorkoutLog.completed_at,
+            func.coalesce(Workout.name, WorkoutLog.custom_name).label("workout"),
+            WorkoutLog.notes,
+            WorkoutLog.body_weight,
+            Exercise.name.label("exercise"),
+            Exercise.type,
+            Exercise.muscle_group,
+            SetLog.set_number,
+            SetLog.planned_reps,
+            SetLog.actual_reps.label("reps"),
+            SetLog.weight,
+            SetLog.duration_minutes,
+            SetLog.completed,
+        )
+        .select_from(WorkoutLog)
+        .outerjoin(Workout, WorkoutLog.workout_id == Workout.id)
+        .outerjoin(SetLog, SetLog.workout_log_id == WorkoutLog.id)
+        .outerjoin(Exercise, SetLog.exercise_id == Exercise.id)
+        .where(WorkoutLog.user_id == user_id)
+        .order_by(WorkoutLog.started_at, WorkoutLog.id, SetLog.id)
+    )
+
+
+def iter_chunks(session, user_id, chunk_size=None):
+    """Yield lists of export rows, fetched chunk_size at a time."""
+    result = session.execute(export_query(user_id).execution_options(yield_per=chunk_size or CHUNK_SIZE))
+    for partition in result.partitions():
+        yield partition
+
+
+def _csv_value(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return "" if value is None else value
+
+
+def csv_stream(chunks):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for rows in chunks:
+        writer.writerows([_csv_value(v) for v in row] for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def ndjson_stream(chunks):
+    dumps = current_app.json.dumps
+    for rows in chunks:
+        yield "".join(dumps(row, indent=None) + "\n" for row in rows)
+
+
+def columnar_stream(chunks):
+    """One JSON line per chunk holding its values column by column.
+
+    The layout of a Parquet row group, for tools that load column arrays;
+    analytics code can consume the same batches via iter_columns().
+    """
+    dumps = current_app.json.dumps
+    for columns in iter_columns(chunks):
+        yield dumps({"rows": len(columns["log_id"]), "columns": columns}, indent=None) + "\n"
+
+
+def iter_columns(chunks):
+    """Turn row chunks into {column: [values]} batches."""
+    for rows in chunks:
+        yield {name: list(values) for name, values in zip(EXPORT_COLUMNS, zip(*rows))}
+
+
+EXPORT_FORMATS = {
+    "csv": ("text/csv", "csv", csv_stream),
+    "ndjson": ("application/x-ndjson", "ndjson", ndjson_stream),
+    "columnar": ("application/x-ndjson", "columns.ndjson", columnar_stream),
+}
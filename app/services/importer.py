@@ -0,0 +1,320 @@
+"""Bulk import of workout history from other apps' exports.
+
+An export is a stream of per-set records, as CSV, NDJSON or a JSON
+array, parsed incrementally so memory stays flat however large it is.
+Recognised fields (CSV headers are matched case-insensitively, spaces
+and underscores alike, with a few common aliases):
+
+    date          session start; ISO date or datetime (required)
+    workout       session name
+    exercise      exercise name; a record without one is a session with no sets
+    type          "strength" or "cardio"; inferred when missing
+    muscle_group  one of MUSCLE_GROUPS, for exercises the import creates
+    set_number    defaults to the set's position within the exercise
+    reps, planned_reps (defaults to reps), weight, duration_minutes, completed
+    completed_at, notes, body_weight   per session; first record wins
+
+Consecutive records with the same date and workout form one session, as
+exports list them. Exercises are matched by name (case-insensitively)
+against the user's library and created when missing. Everything is
+inserted in one transaction, in chunks of bulk INSERTs.
+"""
+import csv
+import io
+import json
+import time
+from datetime import datetime, timezone
+
+from sqlalchemy import insert
+
+from app import db
+from app.models.exercise import Exercise, MUSCLE_GROUPS
+from app.models.log import WorkoutLog, SetLog
+from app.services.progress import refresh_progress
+from app.versioning import bump_data_version
+
+FORMATS = ("csv", "ndjson", "json")
+CHUNK_SIZE = 500
+READ_SIZE = 64 * 1024
+
+FIELD_ALIASES = {
+    "start_time": "date",
+    "started_at": "date",
+    "workout_name": "workout",
+    "exercise_name": "exercise",
+    "exercise_type": "type",
+    "set_order": "set_number",
+    "set": "set_number",
+    "duration": "duration_minutes",
+    "minutes": "duration_minutes",
+    "workout_notes": "notes",
+}
+TRUE_VALUES = {"1", "true", "yes", "y", "x"}
+
+
+class ImportFormatError(ValueError):
+    """A record that can't be imported; `line` is 1-based when known."""
+
+    def __init__(self, message, line=None):
+        super().__init__(f"line {line}: {message}" if line else message)
+        self.line = line
+
+
+def detect_format(filename=None, content_type=None):
+    """Best guess at the format from a filename or content type."""
+    name = (filename or "").lower()
+    content_type = (content_type or "").lower()
+    if name.endswith(".csv") or "csv" in content_type:
+        return "csv"
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in content_type:
+        return "ndjson"
+    if name.endswith(".json") or "json" in content_type:
+        return "json"
+    return None
+
+
+def _normalize_key(key):
+    key = (key or "").strip().lower().replace(" ", "_").replace("-", "_")
+    return FIELD_ALIASES.get(key, key)
+
+
+def _iter_json_array(text):
+    """Yield the elements of a top-level JSON array read in chunks."""
+    decoder = json.JSONDecoder()
+    buffer = ""
+    pos = 0
+    started = False
+    while True:
+        chunk = text.read(READ_SIZE)
+        buffer = buffer[pos:] + chunk
+        pos = 0
+        while True:
+            while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+                pos += 1
+            if not started:
+                if pos == len(buffer):
+                    break
+                if buffer[pos] != "[":
+                    raise ImportFormatError("expected a JSON array of records")
+                started = True
+                pos += 1
+                continue
+            if pos < len(buffer) and buffer[pos] == "]":
+                return
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if not chunk:
+                    raise ImportFormatError("truncated or invalid JSON")
+                # The element continues in the next chunk
+                break
+            yield item
+            pos = end
+        if not chunk:
+            raise ImportFormatError("truncated or invalid JSON")
+
+
+def parse_records(stream, fmt):
+    """Yield (line, record) pairs with normalized keys from a binary stream."""
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"format must be one of {', '.join(FORMATS)}")
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+
+    if fmt == "csv":
+        reader = csv.DictReader(text)
+        for row in reader:
+            yield reader.line_num, {_normalize_key(k): v for k, v in row.items() if k is not None}
+    elif fmt == "ndjson":
+        for n, line in enumerate(text, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise ImportFormatError(f"invalid JSON ({e.msg})", n)
+            if not isinstance(record, dict):
+                raise ImportFormatError("expected an object", n)
+            yield n, {_normalize_key(k): v for k, v in record.items()}
+    else:
+        for n, record in enumerate(_iter_json_array(text), 1):
+            if not isinstance(record, dict):
+                raise ImportFormatError("expected an object", n)
+            yield n, {_normalize_key(k): v for k, v in record.items()}
+
+
+def _blank(value):
+    return value is None or (isinstance(value, str) and not value.strip())
+
+
+def _number(record, field, cast, line):
+    value = record.get(field)
+    if _blank(value):
+        return None
+    try:
+        return cast(float(value)) if cast is int else cast(value)
+    except (TypeError, ValueError):
+        raise ImportFormatError(f"{field} must be a number, got {value!r}", line)
+
+
+def _flag(value):
+    if isinstance(value, bool):
+        return value
+    # Exports that don't track completion list only what was done
+    return True if _blank(value) else str(value).strip().lower() in TRUE_VALUES
+
+
+def _datetime(value, field, line):
+    if _blank(value):
+        return None
+    try:
+        parsed = datetime.fromisoformat(str(value).strip().replace("Z", "+00:00"))
+    except ValueError:
+        raise ImportFormatError(f"{field} must be an ISO date or datetime, got {value!r}", line)
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+class _Importer:
+    def __init__(self, user_id, chunk_size, progress):
+        self.user_id = user_id
+        self.chunk_size = chunk_size
+        self.progress = progress
+        self.exercises = {
+            e.name.strip().lower(): e
+            for e in Exercise.query.filter_by(user_id=user_id)
+        }
+        self.touched = set()
+        self.sessions = []
+        self.current = None
+        self.counts = {"records": 0, "logs": 0, "sets": 0, "exercises_created": 0}
+        self.started = time.perf_counter()
+
+    def exercise(self, record):
+        name = str(record["exercise"]).strip()
+        exercise = self.exercises.get(name.lower())
+        if exercise is None:
+            ex_type = str(record.get("type") or "").strip().lower()
+            if ex_type not in ("strength", "cardio"):
+                cardio = _blank(record.get("reps")) and not _blank(record.get("duration_minutes"))
+                ex_type = "cardio" if cardio else "strength"
+            muscle_group = str(record.get("muscle_group") or "").strip().lower().replace(" ", "_")
+            exercise = Exercise(
+                user_id=self.user_id, name=name, type=ex_type,
+                unit="mins" if ex_type == "cardio" else "reps",
+                muscle_group=muscle_group if muscle_group in MUSCLE_GROUPS else None,
+            )
+            db.session.add(exercise)
+            self.exercises[name.lower()] = exercise
+            self.counts["exercises_created"] += 1
+        return exercise
+
+    def add(self, line, record):
+        self.counts["records"] += 1
+        started_at = _datetime(record.get("date"), "date", line)
+        if started_at is None:
+            raise ImportFormatError("date is required", line)
+        workout = str(record.get("workout") or "").strip() or "Imported workout"
+        key = (started_at, workout)
+
+        if self.current is None or self.current["key"] != key:
+            if len(self.sessions) >= self.chunk_size:
+                self.flush()
+            self.current = {
+                "key": key,
+                "log": {
+                    "user_id": self.user_id,
+                    "program_id": None,
+                    "workout_id": None,
+                    "custom_name": workout[:200],
+                    "started_at": started_at,
+                    "completed_at": _datetime(record.get("completed_at"), "completed_at", line) or started_at,
+                    "notes": record.get("notes") or None,
+                    "body_weight": _number(record, "body_weight", float, line),
+                },
+                "sets": [],
+                "numbers": {},
+            }
+            self.sessions.append(self.current)
+
+        if _blank(record.get("exercise")):
+            return
+        exercise = self.exercise(record)
+        numbers = self.current["numbers"]
+        numbers[exercise] = numbers.get(exercise, 0) + 1
+        reps = _number(record, "reps", int, line)
+        self.current["sets"].append((exercise, {
+            "set_number": _number(record, "set_number", int, line) or numbers[exercise],
+            "planned_reps": _number(record, "planned_reps", int, line) or reps,
+            "actual_reps": reps,
+            "weight": _number(record, "weight", float, line),
+            "duration_minutes": _number(record, "duration_minutes", int, line),
+            "completed": _flag(record.get("completed")),
+        }))
+
+    def insert_logs(self):
+        """Insert the buffered logs and return their ids, in session order.
+
+        sort_by_parameter_order matches RETURNING rows back to the rows
+        sent. Backends that can't guarantee that for a batch (SQLite,
+        whose rowids SQLAlchemy won't use as a sentinel) get one INSERT
+        per log instead; their sets are still inserted in one batch.
+        """
+        result = db.session.execute(
+            insert(WorkoutLog).returning(WorkoutLog.id, sort_by_parameter_order=True),
+            [s["log"] for s in self.sessions],
+        )
+        return result.scalars().all()
+
+    def flush(self):
+        """Write the buffered sessions: one INSERT for logs, one for sets."""
+        if not self.sessions:
+            return
+        # New exercises need ids first
+        db.session.flush()
+        log_ids = self.insert_logs()
+
+        rows = []
+        for session, log_id in zip(self.sessions, log_ids):
+            for exercise, values in session["sets"]:
+                rows.append(dict(values, workout_log_id=log_id, exercise_id=exercise.id))
+                self.touched.add(exercise.id)
+        if rows:
+            db.session.execute(insert(SetLog), rows)
+
+        self.counts["logs"] += len(self.sessions)
+        self.counts["sets"] += len(rows)
+        self.sessions = []
+        self.current = None
+        if self.progress is not None:
+            self.progress(self.summary())
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        return dict(
+            self.counts,
+            seconds=round(elapsed, 3),
+            records_per_second=round(self.counts["records"] / elapsed) if elapsed else None,
+        )
+
+
+def import_records(user_id, records, chunk_size=None, progress=None):
+    """Import (line, record) pairs for user_id and commit; returns a summary.
+
+    progress, if given, is called with the running summary after each
+    chunk. On any error the whole import is rolled back.
+    """
+    importer = _Importer(user_id, chunk_size or CHUNK_SIZE, progress)
+    try:
+        for line, record in records:
+            importer.add(line, record)
+        importer.flush()
+        refresh_progress(user_id, importer.touched)
+        # Outside a request nothing else bumps the version; cached responses
+        # must not survive an import either way
+        bump_data_version(db.session, user_id, exercises=importer.counts["exercises_created"] > 0)
+        db.session.commit()
+    except Exception:
+        db.session.rollback()
+        raise
+    return importer.summary()
@@ -0,0 +1,227 @@
+"""Maintain the ExerciseProgress summary rows.
+
+Write endpoints call refresh_progress() with the exercises they touched,
+so reading progress never has to walk a lifter's whole history. Set
+edits go through apply_set_changes() instead, which folds a newly
+completed set into the row without rereading the history.
+"""
+from datetime import datetime, timezone
+
+from sqlalchemy import case, distinct, func
+
+from app import db
+from app.models.log import WorkoutLog, SetLog
+from app.models.progress import ExerciseProgress
+from app.services.analytics import FORMULAS
+
+RECENT_LIMIT = 3
+
+
+def _recent_values(user_id, exercise_id, column):
+    """Last RECENT_LIMIT distinct values of column, most recent session first."""
+    rows = (
+        db.session.query(column)
+        .join(WorkoutLog, SetLog.workout_log_id == WorkoutLog.id)
+        .filter(
+            WorkoutLog.user_id == user_id,
+            SetLog.exercise_id == exercise_id,
+            SetLog.completed.is_(True),
+            column > 0,
+        )
+        .group_by(column)
+        .order_by(func.max(WorkoutLog.started_at).desc())
+        .limit(RECENT_LIMIT)
+        .all()
+    )
+    return [row[0] for row in rows]
+
+
+def refresh_progress(user_id, exercise_ids):
+    """Recompute the summary rows for the given exercises.
+
+    Each exercise costs a handful of aggregate queries over its own sets,
+    independent of how much other history the user has.
+    """
+    exercise_ids = {eid for eid in exercise_ids if eid is not None}
+    if not exercise_ids:
+        return {}
+
+    existing = {
+        p.exercise_id: p
+        for p in ExerciseProgress.query.filter(
+            ExerciseProgress.user_id == user_id,
+            ExerciseProgress.exercise_id.in_(exercise_ids),
+        )
+    }
+
+    reps = func.coalesce(SetLog.actual_reps, 0)
+    totals = (
+        db.session.query(
+            SetLog.exercise_id,
+            func.max(SetLog.weight),
+            # Epley estimated one-rep max; a single is just the weight lifted,
+            # as in app.services.analytics
+            func.max(case((reps == 1, SetLog.weight), else_=SetLog.weight * (1 + reps / 30.0))),
+            func.coalesce(func.sum(SetLog.weight * reps), 0),
+            func.count(distinct(SetLog.workout_log_id)),
+        )
+        .join(WorkoutLog, SetLog.workout_log_id == WorkoutLog.id)
+        .filter(
+            WorkoutLog.user_id == user_id,
+            SetLog.exercise_id.in_(exercise_ids),
+            SetLog.completed.is_(True),
+        )
+        .group_by(SetLog.exercise_id)
+        .all()
+    )
+    totals = {row[0]: row[1:] for row in totals}
+
+    results = {}
+    for exercise_id in exercise_ids:
+        progress = existing.get(exercise_id)
+        if progress is None:
+            progress = ExerciseProgress(user_id=user_id, exercise_id=exercise_id)
+            db.session.add(progress)
+
+        pr_weight, best_e1rm, total_volume, session_count = totals.get(exercise_id, (None, None, 0, 0))
+        progress.pr_weight = pr_weight or None
+        progress.best_e1rm = round(best_e1rm, 1) if best_e1rm else None
+        progress.total_volume = total_volume
+        progress.session_count = session_count
+        progress.recent_weights = _recent_values(user_id, exercise_id, SetLog.weight)
+        progress.recent_durations = _recent_values(user_id, exercise_id, SetLog.duration_minutes)
+        progress.updated_at = datetime.now(timezone.utc)
+        results[exercise_id] = progress
+
+    return results
+
+
+def set_values(set_log, **changed):
+    """(completed, weight, actual_reps, duration_minutes) of a SetLog or row, with changed applied."""
+    completed, weight, reps, duration = (
+        changed[name] if name in changed else getattr(set_log, name)
+        for name in ("completed", "weight", "actual_reps", "duration_minutes")
+    )
+    return bool(completed), weight, reps, duration
+
+
+def _push_recent(values, value):
+    """values with value moved to the front, as _recent_values orders them."""
+    if not value or value <= 0:
+        return values
+    return ([value] + [v for v in values if v != value])[:RECENT_LIMIT]
+
+
+def apply_set_changes(user_id, log, changes):
+    """Update summaries after edits to sets of log, already flushed or executed.
+
+    changes maps set id -> (exercise_id, before, after), each from
+    set_values(). Edits to sets that aren't completed change nothing. A
+    set that was just completed, in the latest session of its exercise,
+    only raises maxima and adds volume, so it's applied to the existing
+    row; anything else (a completed set edited or undone, a past session)
+    could lower a value and recomputes the exercise with refresh_progress.
+    """
+    by_exercise = {}
+    for set_id, (exercise_id, before, after) in changes.items():
+        if before != after and (before[0] or after[0]):
+            by_exercise.setdefault(exercise_id, {})[set_id] = (before, after)
+    if not by_exercise:
+        return
+
+    refresh = {
+        exercise_id for exercise_id, sets in by_exercise.items()
+        if any(before[0] for before, _ in sets.values())
+    }
+    candidates = set(by_exercise) - refresh
+    rows = {}
+    if candidates:
+        rows = {
+            p.exercise_id: p
+            for p in ExerciseProgress.query.filter(
+                ExerciseProgress.user_id == user_id,
+                ExerciseProgress.exercise_id.in_(candidates),
+            )
+        }
+        # A later session decides the recent values, so this one can't be folded in
+        later = {
+            row[0] for row in
+            db.session.query(SetLog.exercise_id)
+            .join(WorkoutLog, SetLog.workout_log_id == WorkoutLog.id)
+            .filter(
+                WorkoutLog.user_id == user_id,
+                WorkoutLog.started_at > log.started_at,
+                SetLog.exercise_id.in_(candidates),
+                SetLog.completed.is_(True),
+            )
+            .distinct()
+        }
+        refresh |= {e for e in candidates if e not in rows or e in later}
+        candidates -= refresh
+    if candidates:
+        # Exercises this session already counted towards session_count
+        changed_ids = [set_id for e in candidates for set_id in by_exercise[e]]
+        counted = {
+            row[0] for row in
+            db.session.query(SetLog.exercise_id)
+            .filter(
+                SetLog.workout_log_id == log.id,
+                SetLog.exercise_id.in_(candidates),
+                SetLog.completed.is_(True),
+                SetLog.id.notin_(changed_ids),
+            )
+            .distinct()
+        }
+
+    now = datetime.now(timezone.utc)
+    for exercise_id in candidates:
+        progress = rows[exercise_id]
+        recent_weights = list(progress.recent_weights or [])
+        recent_durations = list(progress.recent_durations or [])
+        for _, (completed, weight, reps, duration) in by_exercise[exercise_id].values():
+            reps = reps or 0
+            if weight:
+                progress.pr_weight = max(progress.pr_weight or 0, weight)
+                e1rm = round(FORMULAS["epley"](weight, reps), 1)
+                progress.best_e1rm = max(progress.best_e1rm or 0, e1rm)
+                progress.total_volume = (progress.total_volume or 0) + weight * reps
+            recent_weights = _push_recent(recent_weights, weight)
+            recent_durations = _push_recent(recent_durations, duration)
+        if exercise_id not in counted:
+            progress.session_count = (progress.session_count or 0) + 1
+        progress.recent_weights = recent_weights
+        progress.recent_durations = recent_durations
+        progress.updated_at = now
+
+    if refresh:
+        refresh_progress(user_id, refresh)
+
+
+def get_progress(user_id, exercise_id):
+    """Return the summary row, building it on first access."""
+    progress = ExerciseProgress.query.filter_by(user_id=user_id, exercise_id=exercise_id).first()
+    if progress is None:
+        progress = refresh_progress(user_id, [exercise_id])[exercise_id]
+        db.session.commit()
+    return progress
+
+
+def backfill_progress(user_id=None):
+    """Rebuild summary rows for every exercise a user (or all users) has logged."""
+    query = (
+        db.session.query(WorkoutLog.user_id, SetLog.exercise_id)
+        .join(SetLog, SetLog.workout_log_id == WorkoutLog.id)
+        .distinct()
+    )
+    if user_id is not None:
+        query = query.filter(WorkoutLog.user_id == user_id)
+
+    by_user = {}
+    for uid, exercise_id in query:
+        by_user.setdefault(uid, set()).add(exercise_id)
+
+    count = 0
+    for uid, exercise_ids in by_user.items():
+        count += len(refresh_progress(uid, exercise_ids))
+        db.session.commit()
+    return count
@@ -0,0 +1,52 @@
+"""Save an ordered child list as a diff against the rows already stored.
+
+Reorder endpoints receive the whole list every time, usually with one
+item moved. Each desired item is matched to an existing row, by the
+row ``id`` when the client sends one and otherwise by its key column
+(exercise_id, workout_id) in current position order. Matched rows keep
+their ids and are only written if something changed; everything else
+is one bulk DELETE, one executemany UPDATE and one INSERT, however long
+the list.
+"""
+from sqlalchemy import delete, insert, select, update
+
+from app import db
+
+
+def sync_ordered(model, parent, parent_id, key, items):
+    """Make parent_id's rows of model match items, a list of column dicts.
+
+    parent and key name model's parent and key columns. Every item must
+    have the same columns; an "id" entry picks the row it should update.
+    Returns how many rows were updated, inserted and deleted.
+    """
+    table = model.__table__
+    rows = db.session.execute(
+        select(table).where(table.c[parent] == parent_id).order_by(table.c.position, table.c.id)
+    ).mappings().all()
+    remaining = {row["id"]: row for row in rows}
+
+    matched = [remaining.pop(item["id"], None) if "id" in item else None for item in items]
+    by_key = {}
+    for row in remaining.values():
+        by_key.setdefault(row[key], []).append(row)
+    for i, item in enumerate(items):
+        if matched[i] is None and by_key.get(item[key]):
+            matched[i] = by_key[item[key]].pop(0)
+            del remaining[matched[i]["id"]]
+
+    updates, inserts = [], []
+    for item, row in zip(items, matched):
+        values = {name: value for name, value in item.items() if name != "id"}
+        if row is None:
+            inserts.append({parent: parent_id, **values})
+        elif any(row[name] != value for name, value in values.items()):
+            updates.append({"id": row["id"], **values})
+
+    if remaining:
+        db.session.execute(delete(model).where(model.id.in_(list(remaining))))
+    if updates:
+        db.session.execute(update(model), updates)
+    if inserts:
+        db.session.execute(insert(model), inserts)
+    return {"updated": len(updates), "inserted": len(inserts), "deleted": len(remaining)}
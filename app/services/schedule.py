@@ -0,0 +1,76 @@
+"""Work out where a user is in a program's rotation."""
+from sqlalchemy.orm import joinedload
+
+from app.models.log import WorkoutLog
+from app.models.program import ProgramWorkoutOrder
+from app.serializers import workout_exercises_by_workout
+
+
+def _serialize_rotation(ordered):
+    """Serialize each distinct workout in the rotation once, with its exercises."""
+    workouts = {o.workout_id: o.workout for o in ordered}
+    exercises = workout_exercises_by_workout(workouts)
+    return {
+        wid: {"id": w.id, "name": w.name, "exercises": exercises[wid]}
+        for wid, w in workouts.items()
+    }
+
+
+def resolve_next_workout(program, user_id):
+    """Return the next_workout payload for program, or None if it has no workouts.
+
+    Runs a fixed number of queries however long the rotation is.
+    """
+    ordered = (
+        ProgramWorkoutOrder.query
+        .filter_by(program_id=program.id)
+        .options(joinedload(ProgramWorkoutOrder.workout))
+        .order_by(ProgramWorkoutOrder.position)
+        .all()
+    )
+    if not ordered:
+        return None
+
+    workout_ids = [o.workout_id for o in ordered]
+
+    # Check for an in-progress (started but not completed) workout log
+    in_progress_log = (
+        WorkoutLog.query
+        .filter_by(user_id=user_id, program_id=program.id)
+        .filter(WorkoutLog.completed_at.is_(None))
+        .order_by(WorkoutLog.started_at.desc())
+        .first()
+    )
+
+    if in_progress_log and in_progress_log.workout_id in workout_ids:
+        # Resume in-progress workout — treat it as the current one
+        next_idx = workout_ids.index(in_progress_log.workout_id)
+    else:
+        in_progress_log = None
+        last_log = (
+            WorkoutLog.query
+            .filter_by(user_id=user_id, program_id=program.id)
+            .filter(WorkoutLog.completed_at.isnot(None))
+            .order_by(WorkoutLog.completed_at.desc())
+            .first()
+        )
+        if last_log and last_log.workout_id in workout_ids:
+            next_idx = (workout_ids.index(last_log.workout_id) + 1) % len(workout_ids)
+        else:
+            next_idx = 0
+
+    serialized = _serialize_rotation(ordered)
+    upcoming = [
+        serialized[workout_ids[(next_idx + i) % len(workout_ids)]]
+        for i in range(len(workout_ids))
+    ]
+
+    result = {
+        "next_workout": upcoming[0],
+        "upcoming": upcoming,
+        "program": program.to_dict(),
+    }
+    # Include in-progress log id so the home page can resume it
+    if in_progress_log:
+        result["in_progress_log_id"] = in_progress_log.id
+    return result
@@ -0,0 +1,174 @@
+"""Exercise name search over a per-user in-memory index.
+
+An index is built from the user's exercises on their first search and
+kept, per app, for as long as the user's exercise_version stays the
+same (see app.versioning), so logging sets doesn't force a rebuild.
+Each query token is looked up in two maps:
+
+- token prefixes -> exercise ids, for autocomplete as the user types;
+- failing that, trigrams of the distinct name tokens, so a typo
+  ("sqaut") still finds the tokens it was meant to be ("squat"). The
+  vocabulary is far smaller than the list of names, which keeps this
+  cheap however many exercises share each word.
+
+Names must match every query token that matched anything. They are
+ranked exact name, then name prefix, then all tokens matched by prefix,
+then by how close the typo matches were; shorter names first within each.
+"""
+import heapq
+import re
+import threading
+from collections import OrderedDict
+
+from flask import current_app, g
+from sqlalchemy import select
+
+from app import db
+from app.models.exercise import Exercise
+from app.models.user import User
+
+MAX_PREFIX = 12
+# Dice coefficient over trigrams for a token to count as a typo of another
+MIN_SIMILARITY = 0.3
+MAX_INDEXED_USERS = 256
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text):
+    return _WORD_RE.findall((text or "").lower())
+
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class ExerciseIndex:
+    """Ranked name lookup over a fixed list of exercises."""
+
+    def __init__(self, exercises):
+        self.exercises = {}
+        self._names = {}
+        self._tokens = {}
+        self._prefixes = {}
+        self._trigrams = {}
+        for exercise in exercises:
+            exercise_id = exercise["id"]
+            tokens = tokenize(exercise["name"])
+            self.exercises[exercise_id] = exercise
+            self._names[exercise_id] = " ".join(tokens)
+            for token in tokens:
+                self._tokens.setdefault(token, set()).add(exercise_id)
+        for token, ids in self._tokens.items():
+            for end in range(1, min(len(token), MAX_PREFIX) + 1):
+                self._prefixes.setdefault(token[:end], set()).update(ids)
+            for gram in trigrams(token):
+                self._trigrams.setdefault(gram, set()).add(token)
+
+    def __len__(self):
+        return len(self.exercises)
+
+    def _prefix_ids(self, token):
+        ids = self._prefixes.get(token[:MAX_PREFIX], set())
+        if len(token) > MAX_PREFIX:
+            ids = {i for i in ids if any(t.startswith(token) for t in self._names[i].split())}
+        return ids
+
+    def _similar_ids(self, token):
+        """Ids of names with a token close to token, and the best similarity each reached."""
+        grams = trigrams(token)
+        shared = {}
+        for gram in grams:
+            for candidate in self._trigrams.get(gram, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        scores = {}
+        for candidate, count in shared.items():
+            similarity = 2 * count / (len(grams) + len(trigrams(candidate)))
+            if similarity >= MIN_SIMILARITY:
+                for exercise_id in self._tokens[candidate]:
+                    scores[exercise_id] = max(scores.get(exercise_id, 0), similarity)
+        return scores
+
+    def search(self, query, limit=10):
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        phrase = " ".join(tokens)
+
+        candidates = None
+        penalty = {}  # exercise id -> 1 - similarity, summed over typo-matched tokens
+        unmatched = 0
+        for token in tokens:
+            ids = self._prefix_ids(token)
+            if not ids:
+                scores = self._similar_ids(token)
+                if not scores:
+                    unmatched += 1
+                    continue
+                ids = scores.keys()
+                for exercise_id, similarity in scores.items():
+                    penalty[exercise_id] = penalty.get(exercise_id, 0) + 1 - similarity
+            candidates = set(ids) if candidates is None else candidates.intersection(ids)
+            if not candidates:
+                return []
+        if candidates is None:
+            return []
+
+        ranked = []
+        for exercise_id in candidates:
+            name = self._names[exercise_id]
+            if exercise_id in penalty or unmatched:
+                rank = (3, unmatched, penalty.get(exercise_id, 0))
+            else:
+                rank = (0 if name == phrase else 1 if name.startswith(phrase) else 2, 0, 0)
+            ranked.append((rank, len(name), name, exercise_id))
+        return [self.exercises[entry[-1]] for entry in heapq.nsmallest(limit, ranked)]
+
+
+class _Indexes:
+    """Built indexes by user id, least recently searched dropped first."""
+
+    def __init__(self, max_users):
+        self.max_users = max_users
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id, version):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != version:
+                return None
+            self._entries.move_to_end(user_id)
+            return entry[1]
+
+    def set(self, user_id, version, index):
+        with self._lock:
+            self._entries.pop(user_id, None)
+            self._entries[user_id] = (version, index)
+            while len(self._entries) > self.max_users:
+                self._entries.popitem(last=False)
+
+
+def _indexes():
+    # Per app: user ids are only unique within one database
+    return current_app.extensions.setdefault("exercise_search", _Indexes(MAX_INDEXED_USERS))
+
+
+def load_index(user_id):
+    """The user's index as of their current exercise_version, building it if needed."""
+    # The users table is always read from the primary (see app.replicas)
+    version = db.session.execute(select(User.exercise_version).where(User.id == user_id)).scalar_one()
+    indexes = _indexes()
+    index = indexes.get(user_id, version)
+    if index is not None:
+        return index
+    rows = db.session.execute(
+        select(Exercise.id, Exercise.name, Exercise.type, Exercise.unit, Exercise.muscle_group)
+        .where(Exercise.user_id == user_id)
+    ).mappings()
+    index = ExerciseIndex(dict(row) for row in rows)
+    # A replica may lag the version read from the primary; don't keep what it returned
+    if not g.get("db_replica_used"):
+        indexes.set(user_id, version, index)
+    return index
@@ -0,0 +1,98 @@
+"""Instantiate a workout template's planned sets for a log."""
+from sqlalchemy import insert
+
+from app import db
+from app.models.exercise import Exercise
+from app.models.log import SetLog
+from app.models.workout import WorkoutExercise
+
+
+def materialize_sets(log, workout_id):
+    """Insert the planned sets for workout_id into log and return them serialized.
+
+    The template and its exercises are read in one query and all sets are
+    written with a single executemany INSERT, so the cost is the same for
+    a one-exercise template as for a twenty-exercise one.
+    """
+    template = (
+        db.session.query(
+            WorkoutExercise.exercise_id,
+            WorkoutExercise.default_sets,
+            WorkoutExercise.default_reps,
+            WorkoutExercise.default_weight,
+            WorkoutExercise.default_duration_minutes,
+            Exercise.name,
+            Exercise.type,
+        )
+        .join(Exercise, WorkoutExercise.exercise_id == Exercise.id)
+        .filter(WorkoutExercise.workout_id == workout_id)
+        .order_by(WorkoutExercise.position, WorkoutExercise.id)
+        .all()
+    )
+
+    rows = []
+    exercises = {}
+    for we in template:
+        exercises[we.exercise_id] = we
+        if we.type == "cardio":
+            rows.append({
+                "workout_log_id": log.id,
+                "exercise_id": we.exercise_id,
+                "set_number": 1,
+                "planned_reps": None,
+                "actual_reps": None,
+                "weight": None,
+                "duration_minutes": we.default_duration_minutes,
+                "completed": False,
+            })
+        else:
+            for s in range(1, (we.default_sets or 0) + 1):
+                rows.append({
+                    "workout_log_id": log.id,
+                    "exercise_id": we.exercise_id,
+                    "set_number": s,
+                    "planned_reps": we.default_reps,
+                    "actual_reps": we.default_reps,
+                    "weight": we.default_weight,
+                    "duration_minutes": None,
+                    "completed": False,
+                })
+
+    if not rows:
+        return []
+
+    columns = (
+        SetLog.id,
+        SetLog.exercise_id,
+        SetLog.set_number,
+        SetLog.planned_reps,
+        SetLog.actual_reps,
+        SetLog.weight,
+        SetLog.duration_minutes,
+        SetLog.completed,
+    )
+    if db.session.get_bind().dialect.insert_executemany_returning:
+        inserted = db.session.execute(insert(SetLog).returning(*columns), rows).all()
+    else:
+        db.session.execute(insert(SetLog), rows)
+        inserted = db.session.execute(
+            db.select(*columns).filter_by(workout_log_id=log.id)
+        ).all()
+
+    # RETURNING order is not guaranteed; list sets as GET /api/logs/<id> does
+    return [
+        {
+            "id": row.id,
+            "workout_log_id": log.id,
+            "exercise_id": row.exercise_id,
+            "exercise_name": exercises[row.exercise_id].name,
+            "exercise_type": exercises[row.exercise_id].type,
+            "set_number": row.set_number,
+            "planned_reps": row.planned_reps,
+            "actual_reps": row.actual_reps,
+            "weight": row.weight,
+            "duration_minutes": row.duration_minutes,
+            "completed": row.completed,
+        }
+        for row in sorted(inserted, key=lambda row: (row.exercise_id, row.set_number, row.id))
+    ]
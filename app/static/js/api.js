@@ -1,10 +1,26 @@
 // Shared API helper
+function newIdempotencyKey() {
+    if (self.crypto && crypto.randomUUID) return crypto.randomUUID();
+    return `${Date.now().toString(36)}-${Math.random().toString(36).slice(2)}${Math.random().toString(36).slice(2)}`;
+}
+
 const api = {
-    async request(method, url, body = null) {
+    // Identifies this page's own writes when they come back as live updates
+    clientId: newIdempotencyKey(),
+
+    async request(method, url, body = null, extra = {}) {
+        const headers = { 'Content-Type': 'application/json', 'X-Client-Id': api.clientId };
+        if (method !== 'GET') {
+            // Lets the server drop duplicates when the service worker replays a write
+            headers['Idempotency-Key'] = newIdempotencyKey();
+            // Lets the service worker keep one account's queued writes from another's
+            if (document.body.dataset.userId) headers['X-User-Id'] = document.body.dataset.userId;
+        }
         const opts = {
             method,
-            headers: { 'Content-Type': 'application/json' },
+            headers,
             credentials: 'same-origin',
+            ...extra,
         };
         if (body) opts.body = JSON.stringify(body);
         const res = await fetch(url, opts);
@@ -14,12 +30,60 @@ const api = {
         }
         return data;
     },
-    get: (url) => api.request('GET', url),
+    get: (url, extra) => api.request('GET', url, null, extra),
     post: (url, body) => api.request('POST', url, body),
     put: (url, body) => api.request('PUT', url, body),
+    patch: (url, body, extra) => api.request('PATCH', url, body, extra),
     delete: (url) => api.request('DELETE', url),
+
+    // Queue a set edit; rapid edits are merged into one PATCH per log
+    updateSet: (logId, setId, fields) => setUpdates.queue(logId, setId, fields),
+    flushSetUpdates: () => setUpdates.flushAll(),
 };
 
+const setUpdates = {
+    delay: 400,
+    pending: new Map(),  // logId -> { sets: Map(setId -> fields), timer, waiters }
+
+    queue(logId, setId, fields) {
+        let batch = this.pending.get(logId);
+        if (!batch) {
+            batch = { sets: new Map(), timer: null, waiters: [] };
+            this.pending.set(logId, batch);
+        }
+        batch.sets.set(setId, { ...(batch.sets.get(setId) || {}), ...fields });
+        clearTimeout(batch.timer);
+        // Errors reach callers through the promises returned below
+        batch.timer = setTimeout(() => this.flush(logId).catch(() => {}), this.delay);
+        return new Promise((resolve, reject) => batch.waiters.push({ resolve, reject }));
+    },
+
+    async flush(logId, extra = {}) {
+        const batch = this.pending.get(logId);
+        if (!batch) return;
+        this.pending.delete(logId);
+        clearTimeout(batch.timer);
+
+        const sets = Array.from(batch.sets, ([id, fields]) => ({ id, ...fields }));
+        try {
+            const data = await api.patch(`/api/logs/${logId}/sets`, { sets }, extra);
+            batch.waiters.forEach(w => w.resolve(data));
+        } catch (err) {
+            batch.waiters.forEach(w => w.reject(err));
+            throw err;
+        }
+    },
+
+    flushAll(extra = {}) {
+        return Promise.all(Array.from(this.pending.keys(), logId => this.flush(logId, extra)));
+    },
+};
+
+// Don't lose queued edits when the page is closed or navigated away from
+window.addEventListener('pagehide', () => {
+    setUpdates.flushAll({ keepalive: true }).catch(() => {});
+});
+
 function showToast(message, type = '') {
     const existing = document.querySelector('.toast');
     if (existing) existing.remove();
@@ -1,6 +1,6 @@
-const CACHE_NAME = 'workout-tracker-v1';
+const CACHE_NAME = 'workout-tracker-v5';
+const API_CACHE_NAME = 'workout-tracker-api-v2';
 const urlsToCache = [
-  '/',
   '/static/css/style.css',
   '/static/js/api.js',
 ];
@@ -15,42 +15,261 @@ self.addEventListener('install', (event) => {
   );
 });
 
+// --- API reads: stale-while-revalidate ----------------------------------
+// Cached API responses are shown immediately while a conditional request
+// (the browser sends If-None-Match for us) refreshes the copy. Any write
+// clears the cache so the next read can't show data from before it. Only
+// small JSON replies are kept: downloads and streamed bodies (the export,
+// a full history) go straight to the network.
+
+function isCacheableRead(request) {
+  const url = new URL(request.url);
+  return request.method === 'GET'
+    && request.cache !== 'no-store'
+    && url.origin === self.location.origin
+    && url.pathname.startsWith('/api/')
+    && !url.pathname.startsWith('/api/auth/')
+    && !url.pathname.startsWith('/api/export');
+}
+
+function isCacheableResponse(response) {
+  const type = response.headers.get('Content-Type') || '';
+  // Streamed responses are sent without a length
+  return response.status === 200
+    && type.startsWith('application/json')
+    && response.headers.has('Content-Length');
+}
+
+async function staleWhileRevalidate(event) {
+  const cache = await caches.open(API_CACHE_NAME);
+  const cached = await cache.match(event.request);
+  const network = fetch(event.request).then((response) => {
+    if (isCacheableResponse(response)) {
+      cache.put(event.request, response.clone());
+    } else if (response.status === 401) {
+      cache.delete(event.request);
+    }
+    return response;
+  });
+
+  if (cached) {
+    event.waitUntil(network.catch(() => {}));
+    return cached;
+  }
+  return network;
+}
+
+function clearApiCache() {
+  return caches.delete(API_CACHE_NAME);
+}
+
+// --- Pages and static assets: network first --------------------------
+// Always ask the server so a deploy reaches users on their next load; the
+// cached copy is only for when the network is down. Redirects (to the
+// login page, say) are never stored in place of the page asked for.
+
+function isPageOrAsset(request) {
+  const url = new URL(request.url);
+  return request.method === 'GET'
+    && url.origin === self.location.origin
+    && (request.mode === 'navigate' || url.pathname.startsWith('/static/'));
+}
+
+async function networkFirst(request) {
+  try {
+    const response = await fetch(request);
+    if (response.status === 200 && !response.redirected) {
+      const cache = await caches.open(CACHE_NAME);
+      cache.put(request, response.clone());
+    }
+    return response;
+  } catch (err) {
+    const cached = await caches.match(request);
+    if (cached) {
+      return cached;
+    }
+    throw err;
+  }
+}
+
+// --- Offline write queue -------------------------------------------------
+// API writes that fail for lack of a connection are stored in IndexedDB and
+// replayed in order later. Each carries the Idempotency-Key api.js gave it,
+// so a write that did reach the server before the connection dropped is
+// never applied twice. Entries are tagged with the account that made them,
+// and logging in or out drops any that belong to someone else.
+
+const OUTBOX_DB = 'workout-tracker';
+const OUTBOX_STORE = 'outbox';
+const OUTBOX_SYNC_TAG = 'replay-outbox';
+
+function openOutbox() {
+  return new Promise((resolve, reject) => {
+    const req = indexedDB.open(OUTBOX_DB, 1);
+    req.onupgradeneeded = () => req.result.createObjectStore(OUTBOX_STORE, { keyPath: 'id', autoIncrement: true });
+    req.onsuccess = () => resolve(req.result);
+    req.onerror = () => reject(req.error);
+  });
+}
+
+function outboxTx(mode, fn) {
+  return openOutbox().then((db) => new Promise((resolve, reject) => {
+    const tx = db.transaction(OUTBOX_STORE, mode);
+    const request = fn(tx.objectStore(OUTBOX_STORE));
+    tx.oncomplete = () => resolve(request.result);
+    tx.onerror = () => reject(tx.error);
+  }));
+}
+
+const outbox = {
+  add: (entry) => outboxTx('readwrite', (store) => store.add(entry)),
+  all: () => outboxTx('readonly', (store) => store.getAll()),
+  count: () => outboxTx('readonly', (store) => store.count()),
+  remove: (id) => outboxTx('readwrite', (store) => store.delete(id)),
+};
+
+async function dropOutboxExcept(userId) {
+  for (const entry of await outbox.all()) {
+    if (entry.user !== userId) {
+      await outbox.remove(entry.id);
+    }
+  }
+}
+
+function isQueueable(request) {
+  const url = new URL(request.url);
+  return request.method !== 'GET'
+    && url.origin === self.location.origin
+    && url.pathname.startsWith('/api/')
+    && !url.pathname.startsWith('/api/auth/')
+    // Starting a workout needs the new log's id right away, so it can't wait
+    && !(request.method === 'POST' && url.pathname === '/api/logs')
+    && request.headers.has('Idempotency-Key');
+}
+
+async function enqueue(request) {
+  await outbox.add({
+    url: request.url,
+    method: request.method,
+    body: await request.clone().text(),
+    headers: {
+      'Content-Type': request.headers.get('Content-Type') || 'application/json',
+      'Idempotency-Key': request.headers.get('Idempotency-Key'),
+    },
+    user: request.headers.get('X-User-Id'),
+    queuedAt: Date.now(),
+  });
+  await clearApiCache();
+  if (self.registration.sync) {
+    self.registration.sync.register(OUTBOX_SYNC_TAG).catch(() => {});
+  }
+  return new Response(JSON.stringify({ queued: true }), {
+    status: 202,
+    headers: { 'Content-Type': 'application/json', 'X-Queued': 'true' },
+  });
+}
+
+let replaying = null;
+
+function replayOutbox() {
+  // One replay at a time keeps writes in their original order
+  if (!replaying) {
+    replaying = (async () => {
+      for (const entry of await outbox.all()) {
+        let response;
+        try {
+          response = await fetch(entry.url, {
+            method: entry.method,
+            headers: entry.headers,
+            body: entry.body || undefined,
+            credentials: 'same-origin',
+          });
+        } catch (err) {
+          return;  // Still offline; try again on the next trigger
+        }
+        if (response.status >= 500) return;
+        // Success or a permanent client error: either way it's done
+        await outbox.remove(entry.id);
+      }
+    })().finally(() => { replaying = null; });
+  }
+  return replaying;
+}
+
+async function sendWrite(request) {
+  // Keep order: while anything is queued, new writes go to the back of the line
+  if (await outbox.count()) {
+    const response = await enqueue(request);
+    replayOutbox();
+    return response;
+  }
+  try {
+    const response = await fetch(request.clone());
+    await clearApiCache();
+    return response;
+  } catch (err) {
+    return enqueue(request);
+  }
+}
+
+async function sendAuth(request) {
+  // Send what this account queued while its session still stands
+  await replayOutbox().catch(() => {});
+  await clearApiCache();
+  const response = await fetch(request);
+  if (response.ok) {
+    // Login and register return the user; logout returns no id, dropping everything
+    const user = await response.clone().json().catch(() => ({}));
+    await dropOutboxExcept(user.id != null ? String(user.id) : null);
+  }
+  return response;
+}
+
+self.addEventListener('sync', (event) => {
+  if (event.tag === OUTBOX_SYNC_TAG) {
+    event.waitUntil(replayOutbox());
+  }
+});
+
+self.addEventListener('message', (event) => {
+  if (event.data && event.data.type === 'replay-outbox') {
+    event.waitUntil(replayOutbox());
+  }
+});
+
 self.addEventListener('fetch', (event) => {
-  if (event.request.method !== 'GET') {
+  // Live update streams never end; caching one would hold it open forever
+  if (event.request.headers.get('Accept') === 'text/event-stream') {
     return;
   }
 
-  event.respondWith(
-    caches.match(event.request).then((response) => {
-      if (response) {
-        return response;
-      }
+  if (isQueueable(event.request)) {
+    event.respondWith(sendWrite(event.request));
+    return;
+  }
 
-      return fetch(event.request).then((response) => {
-        if (!response || response.status !== 200 || response.type === 'basic') {
-          return response;
-        }
+  if (isCacheableRead(event.request)) {
+    event.respondWith(staleWhileRevalidate(event));
+    return;
+  }
 
-        const responseToCache = response.clone();
-        caches.open(CACHE_NAME).then((cache) => {
-          cache.put(event.request, responseToCache);
-        });
+  // Logging in or out must never leave another account's data behind
+  if (event.request.method !== 'GET' && new URL(event.request.url).pathname.startsWith('/api/auth/')) {
+    event.respondWith(sendAuth(event.request));
+    return;
+  }
 
-        return response;
-      }).catch(() => {
-        // Return cached response if network fails
-        return caches.match(event.request);
-      });
-    })
-  );
+  if (isPageOrAsset(event.request)) {
+    event.respondWith(networkFirst(event.request));
+  }
 });
 
 self.addEventListener('activate', (event) => {
   event.waitUntil(
-    caches.keys().then((cacheNames) => {
+    replayOutbox().then(() => caches.keys()).then((cacheNames) => {
       return Promise.all(
         cacheNames.map((cacheName) => {
-          if (cacheName !== CACHE_NAME) {
+          if (cacheName !== CACHE_NAME && cacheName !== API_CACHE_NAME) {
             return caches.delete(cacheName);
           }
         })
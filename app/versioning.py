@@ -0,0 +1,90 @@
+"""Per-user data version.
+
+Any transaction committed while serving an API request for a logged-in
+user bumps users.data_version. Response caching and ETags key on it, so
+they can never serve data from before the latest write. Transactions
+that change exercises also bump users.exercise_version, which the
+exercise search index keys on instead: logging sets changes the data
+version constantly during a workout, but not the exercise list.
+"""
+from flask import has_request_context, request
+from flask_login import current_user
+from sqlalchemy import event, update
+
+from app import db
+from app.models.exercise import Exercise
+from app.models.user import User
+
+# Bookkeeping tables whose rows don't change what any endpoint returns
+UNVERSIONED_TABLES = {"idempotency_keys", "exercise_progress"}
+
+_CHANGED = "data_changed"
+_EXERCISES_CHANGED = "exercises_changed"
+
+
+def _is_versioned(objects):
+    return any(
+        getattr(obj, "__tablename__", None) not in UNVERSIONED_TABLES
+        for obj in objects
+    )
+
+
+def _touches_exercises(*collections):
+    return any(isinstance(obj, Exercise) for objects in collections for obj in objects)
+
+
+def bump_data_version(session, user_id, exercises=False):
+    """Invalidate every cached response for user_id, and its search index if exercises."""
+    users = User.__table__
+    values = {"data_version": users.c.data_version + 1}
+    if exercises:
+        values["exercise_version"] = users.c.exercise_version + 1
+    # Core statement on the session's connection: no autoflush, no ORM events
+    session.connection().execute(update(users).where(users.c.id == user_id).values(**values))
+
+
+def _versioned_user_id():
+    if not has_request_context() or request.blueprint != "api":
+        return None
+    if not current_user.is_authenticated:
+        return None
+    return current_user.id
+
+
+@event.listens_for(db.session, "before_flush")
+def _track_flush(session, flush_context, instances):
+    if _is_versioned(session.new) or _is_versioned(session.dirty) or _is_versioned(session.deleted):
+        session.info[_CHANGED] = True
+    if _touches_exercises(session.new, session.dirty, session.deleted):
+        session.info[_EXERCISES_CHANGED] = True
+
+
+@event.listens_for(db.session, "do_orm_execute")
+def _track_bulk_statement(orm_execute_state):
+    # Bulk INSERT/UPDATE/DELETE statements bypass the unit of work
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        mapper = orm_execute_state.bind_mapper
+        if mapper is None or mapper.local_table.name not in UNVERSIONED_TABLES:
+            orm_execute_state.session.info[_CHANGED] = True
+        if mapper is None or mapper.local_table is Exercise.__table__:
+            orm_execute_state.session.info[_EXERCISES_CHANGED] = True
+
+
+@event.listens_for(db.session, "before_commit")
+def _bump_version(session):
+    changed = session.info.pop(_CHANGED, False)
+    changed = changed or _is_versioned(session.new) or _is_versioned(session.dirty) or _is_versioned(session.deleted)
+    exercises = session.info.pop(_EXERCISES_CHANGED, False)
+    exercises = exercises or _touches_exercises(session.new, session.dirty, session.deleted)
+    if not changed:
+        return
+    user_id = _versioned_user_id()
+    if user_id is None:
+        return
+    bump_data_version(session, user_id, exercises=exercises)
+
+
+@event.listens_for(db.session, "after_rollback")
+def _forget_changes(session):
+    session.info.pop(_CHANGED, None)
+    session.info.pop(_EXERCISES_CHANGED, None)
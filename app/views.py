@@ -1,9 +1,19 @@
-from flask import Blueprint, render_template
+from flask import Blueprint, render_template, current_app, send_from_directory
 from flask_login import login_required, current_user
 
+from app import live_updates
+
 views_bp = Blueprint("views", __name__)
 
 
+@views_bp.route("/sw.js")
+def service_worker():
+    # Served from the root so the worker's scope covers pages and /api/
+    response = send_from_directory(current_app.static_folder, "sw.js", mimetype="application/javascript")
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
 @views_bp.route("/login")
 def login():
     if current_user.is_authenticated:
@@ -45,7 +55,7 @@ def workout_edit(workout_id):
 @views_bp.route("/workout/<int:log_id>/active")
 @login_required
 def active_workout(log_id):
-    return render_template("active_workout.html", log_id=log_id)
+    return render_template("active_workout.html", log_id=log_id, live_updates=live_updates.enabled)
 
 
 @views_bp.route("/quick-log")
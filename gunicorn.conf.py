@@ -0,0 +1,79 @@
+"""gunicorn settings, picked up automatically from the project root.
+
+Everything can be overridden from the environment:
+
+    GUNICORN_WORKER_CLASS   gthread (default), gevent or sync
+    WEB_CONCURRENCY         worker processes
+    GUNICORN_THREADS        threads per gthread worker
+    GUNICORN_BIND           socket or host:port
+    GUNICORN_PRELOAD        load the app once in the master (default on)
+
+gthread suits this app: bcrypt and SQLite release the GIL, so a slow
+login or a large history response only ties up one thread. gevent needs
+`pip install gevent` (and psycogreen for Postgres).
+
+Live-update streams (GET /api/logs/<id>/stream) are off unless
+LIVE_UPDATES_URL (e.g. redis://localhost:6379/0) is set, so updates
+reach devices whose stream landed on a different worker; with a single
+worker LIVE_UPDATES_ENABLED=1 turns them on without Redis. Each open
+stream holds a thread for up to LIVE_STREAM_MAX_SECONDS, and a worker
+serves at most LIVE_MAX_STREAMS of them (default 2 of its 4 threads):
+raise both together, or use gevent, when many devices watch workouts.
+"""
+import multiprocessing
+import os
+
+_cpus = multiprocessing.cpu_count()
+
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+
+if worker_class == "gevent":
+    # Patch before the app (and its drivers) are imported by preload_app
+    from gevent import monkey
+
+    monkey.patch_all()
+
+bind = os.environ.get("GUNICORN_BIND", "unix:/run/workout-tracker.sock")
+
+if worker_class == "sync":
+    workers = int(os.environ.get("WEB_CONCURRENCY", 2 * _cpus + 1))
+else:
+    workers = int(os.environ.get("WEB_CONCURRENCY", _cpus + 1))
+threads = int(os.environ.get("GUNICORN_THREADS", 4)) if worker_class == "gthread" else 1
+worker_connections = int(os.environ.get("GUNICORN_WORKER_CONNECTIONS", 1000))
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "true").lower() in ("1", "true", "yes")
+
+# Recycle workers now and then so slow leaks can't accumulate; the jitter
+# keeps them from all restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 1000))
+max_requests_jitter = int(os.environ.get("GUNICORN_MAX_REQUESTS_JITTER", 100))
+
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = int(os.environ.get("GUNICORN_KEEPALIVE", 5))
+
+# Heartbeat files on tmpfs, so a slow disk can't get workers killed
+if os.path.isdir("/dev/shm"):
+    worker_tmp_dir = "/dev/shm"
+
+accesslog = os.environ.get("GUNICORN_ACCESSLOG")
+errorlog = "-"
+
+
+def post_fork(server, worker):
+    """Drop connections inherited from the master.
+
+    With preload_app the app (and possibly pooled connections) is created
+    before forking; sharing a socket between processes corrupts it, so
+    each worker starts with an empty pool.
+    """
+    if not preload_app:
+        return
+
+    from app import db
+    from run import app
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
@@ -3,6 +3,9 @@
 CLI script to manage users - e.g., reset password
 Usage:
     python manage_user.py reset-password <email> <new_password>
+    python manage_user.py backfill-progress [email]
+    python manage_user.py import <email> <file> [csv|ndjson|json]
+    python manage_user.py export <email> [csv|ndjson|columnar] [file]
 """
 
 import sys
@@ -19,16 +22,98 @@ def reset_password(email, password):
             print(f"❌ User '{email}' not found")
             return False
 
-        from app import bcrypt
-        user.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        user.set_password(password)
         db.session.commit()
+        # The server workers' principal caches aren't shared with this
+        # process, so sessions from before the reset can outlive it briefly
         print(f"✓ Password updated for {email}")
+        print(f"  Existing sessions end within {app.config['PRINCIPAL_CACHE_TTL']}s")
+        return True
+
+def backfill_progress(email=None):
+    with app.app_context():
+        from app.services.progress import backfill_progress as backfill
+
+        user_id = None
+        if email:
+            user = User.query.filter_by(email=email).first()
+            if not user:
+                print(f"❌ User '{email}' not found")
+                return False
+            user_id = user.id
+
+        count = backfill(user_id)
+        print(f"✓ Rebuilt progress for {count} exercise(s)")
+        return True
+
+def import_history(email, path, fmt=None):
+    with app.app_context():
+        from app.services.importer import (
+            FORMATS, ImportFormatError, detect_format, import_records, parse_records,
+        )
+
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            print(f"❌ User '{email}' not found")
+            return False
+
+        fmt = fmt or detect_format(path)
+        if fmt not in FORMATS:
+            print(f"❌ Can't tell the format of '{path}'; pass one of {', '.join(FORMATS)}")
+            return False
+
+        def report(summary):
+            print(
+                f"  {summary['logs']} sessions, {summary['sets']} sets "
+                f"({summary['records_per_second']} records/s)",
+                flush=True,
+            )
+
+        try:
+            with open(path, "rb") as f:
+                summary = import_records(user.id, parse_records(f, fmt), progress=report)
+        except ImportFormatError as e:
+            print(f"❌ Nothing imported: {e}")
+            return False
+
+        print(
+            f"✓ Imported {summary['logs']} sessions, {summary['sets']} sets, "
+            f"{summary['exercises_created']} new exercise(s) in {summary['seconds']}s "
+            f"({summary['records_per_second']} records/s)"
+        )
+        return True
+
+def export_history(email, fmt="csv", path=None):
+    with app.app_context():
+        from app.services.export import EXPORT_FORMATS, iter_chunks
+
+        user = User.query.filter_by(email=email).first()
+        if not user:
+            print(f"❌ User '{email}' not found", file=sys.stderr)
+            return False
+        if fmt not in EXPORT_FORMATS:
+            print(f"❌ Format must be one of {', '.join(EXPORT_FORMATS)}", file=sys.stderr)
+            return False
+
+        stream = EXPORT_FORMATS[fmt][2]
+        out = open(path, "w", newline="") if path else sys.stdout
+        try:
+            for text in stream(iter_chunks(db.session, user.id)):
+                out.write(text)
+        finally:
+            if path:
+                out.close()
+        if path:
+            print(f"✓ Exported {email} to {path}")
         return True
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage: python manage_user.py reset-password <email> [password]")
         print("  If password not provided, you'll be prompted for it")
+        print("       python manage_user.py backfill-progress [email]")
+        print("       python manage_user.py import <email> <file> [csv|ndjson|json]")
+        print("       python manage_user.py export <email> [csv|ndjson|columnar] [file]")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -46,6 +131,21 @@ if __name__ == "__main__":
             sys.exit(1)
 
         reset_password(email, password)
+    elif command == "backfill-progress":
+        backfill_progress(sys.argv[2] if len(sys.argv) > 2 else None)
+    elif command == "import":
+        if len(sys.argv) < 4:
+            print("Usage: python manage_user.py import <email> <file> [csv|ndjson|json]")
+            sys.exit(1)
+        if not import_history(sys.argv[2], sys.argv[3], sys.argv[4] if len(sys.argv) > 4 else None):
+            sys.exit(1)
+    elif command == "export":
+        if len(sys.argv) < 3:
+            print("Usage: python manage_user.py export <email> [csv|ndjson|columnar] [file]")
+            sys.exit(1)
+        fmt = sys.argv[3] if len(sys.argv) > 3 else "csv"
+        if not export_history(sys.argv[2], fmt, sys.argv[4] if len(sys.argv) > 4 else None):
+            sys.exit(1)
     else:
         print(f"❌ Unknown command: {command}")
         sys.exit(1)
@@ -0,0 +1,26 @@
+"""add data_version to users
+
+Revision ID: 3d9f7a61c5e2
+Revises: e58a2b9d4c63
+Create Date: 2026-10-18 12:14:52.260417
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d9f7a61c5e2'
+down_revision = 'e58a2b9d4c63'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('data_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('data_version')
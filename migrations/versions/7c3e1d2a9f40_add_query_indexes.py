@@ -0,0 +1,74 @@
+"""add indexes for per-user, time-ordered queries
+
+Revision ID: 7c3e1d2a9f40
+Revises: 18ef74d0aa21
+Create Date: 2026-10-18 09:12:31.402117
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7c3e1d2a9f40'
+down_revision = '18ef74d0aa21'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('exercises', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_exercises_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('workouts', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_workouts_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('programs', schema=None) as batch_op:
+        batch_op.create_index(batch_op.f('ix_programs_user_id'), ['user_id'], unique=False)
+
+    with op.batch_alter_table('workout_exercises', schema=None) as batch_op:
+        batch_op.create_index('ix_workout_exercises_workout_id_position', ['workout_id', 'position'], unique=False)
+
+    with op.batch_alter_table('program_workout_order', schema=None) as batch_op:
+        batch_op.create_index('ix_program_workout_order_program_id_position', ['program_id', 'position'], unique=False)
+
+    with op.batch_alter_table('workout_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_workout_logs_user_id_started_at', ['user_id', 'started_at'], unique=False)
+        batch_op.create_index('ix_workout_logs_user_id_program_id_completed_at', ['user_id', 'program_id', 'completed_at'], unique=False)
+        batch_op.create_index(
+            'ix_workout_logs_in_progress',
+            ['user_id', 'program_id', 'started_at'],
+            unique=False,
+            sqlite_where=sa.text('completed_at IS NULL'),
+            postgresql_where=sa.text('completed_at IS NULL'),
+        )
+
+    with op.batch_alter_table('set_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_set_logs_workout_log_id_exercise_id', ['workout_log_id', 'exercise_id'], unique=False)
+        batch_op.create_index('ix_set_logs_exercise_id_workout_log_id', ['exercise_id', 'workout_log_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('set_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_set_logs_exercise_id_workout_log_id')
+        batch_op.drop_index('ix_set_logs_workout_log_id_exercise_id')
+
+    with op.batch_alter_table('workout_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_workout_logs_in_progress')
+        batch_op.drop_index('ix_workout_logs_user_id_program_id_completed_at')
+        batch_op.drop_index('ix_workout_logs_user_id_started_at')
+
+    with op.batch_alter_table('program_workout_order', schema=None) as batch_op:
+        batch_op.drop_index('ix_program_workout_order_program_id_position')
+
+    with op.batch_alter_table('workout_exercises', schema=None) as batch_op:
+        batch_op.drop_index('ix_workout_exercises_workout_id_position')
+
+    with op.batch_alter_table('programs', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_programs_user_id'))
+
+    with op.batch_alter_table('workouts', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_workouts_user_id'))
+
+    with op.batch_alter_table('exercises', schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f('ix_exercises_user_id'))
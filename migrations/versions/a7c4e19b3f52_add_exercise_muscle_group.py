@@ -0,0 +1,26 @@
+"""add muscle_group to exercises
+
+Revision ID: a7c4e19b3f52
+Revises: 3d9f7a61c5e2
+Create Date: 2026-10-18 21:40:12.518306
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4e19b3f52'
+down_revision = '3d9f7a61c5e2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('exercises', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('muscle_group', sa.String(length=20), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('exercises', schema=None) as batch_op:
+        batch_op.drop_column('muscle_group')
@@ -0,0 +1,41 @@
+"""add exercise_progress summary table
+
+Revision ID: b41f6e0c2d17
+Revises: 7c3e1d2a9f40
+Create Date: 2026-10-18 10:02:47.918233
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b41f6e0c2d17'
+down_revision = '7c3e1d2a9f40'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('exercise_progress',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('exercise_id', sa.Integer(), nullable=False),
+    sa.Column('pr_weight', sa.Float(), nullable=True),
+    sa.Column('best_e1rm', sa.Float(), nullable=True),
+    sa.Column('total_volume', sa.Float(), nullable=False),
+    sa.Column('session_count', sa.Integer(), nullable=False),
+    sa.Column('recent_weights', sa.JSON(), nullable=False),
+    sa.Column('recent_durations', sa.JSON(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['exercise_id'], ['exercises.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'exercise_id', name='uq_exercise_progress_user_id_exercise_id')
+    )
+    # Existing rows are built lazily on first view, or eagerly with
+    # `python manage_user.py backfill-progress`.
+
+
+def downgrade():
+    op.drop_table('exercise_progress')
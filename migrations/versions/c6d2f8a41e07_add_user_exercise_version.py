@@ -0,0 +1,26 @@
+"""add exercise_version to users
+
+Revision ID: c6d2f8a41e07
+Revises: a7c4e19b3f52
+Create Date: 2026-10-18 22:05:13.418208
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6d2f8a41e07'
+down_revision = 'a7c4e19b3f52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('exercise_version', sa.Integer(), server_default='0', nullable=False))
+
+
+def downgrade():
+    with op.batch_alter_table('users', schema=None) as batch_op:
+        batch_op.drop_column('exercise_version')
@@ -0,0 +1,27 @@
+"""allow pending idempotency keys
+
+Revision ID: d93b5e0f7a21
+Revises: c6d2f8a41e07
+Create Date: 2026-10-19 09:41:27.582036
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd93b5e0f7a21'
+down_revision = 'c6d2f8a41e07'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.alter_column('status_code', existing_type=sa.Integer(), nullable=True)
+
+
+def downgrade():
+    op.execute("DELETE FROM idempotency_keys WHERE status_code IS NULL")
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.alter_column('status_code', existing_type=sa.Integer(), nullable=False)
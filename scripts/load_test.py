@@ -0,0 +1,188 @@
+"""Compare gunicorn throughput: one sync worker vs gunicorn.conf.py.
+
+    python scripts/load_test.py --users 20 --duration 15
+    python scripts/load_test.py --mode login --users 50
+
+Seeds a throwaway SQLite database with benchmark users (see
+tests/benchmarks/seed.py), starts gunicorn on a local port with each
+configuration in turn, and has `--users` concurrent clients log in and
+then loop over the history and calendar endpoints plus a cheap /auth/me.
+Prints requests/sec and latency percentiles for each run; the /auth/me
+p95 shows how long cheap requests queue behind expensive ones.
+
+`--mode login` has every client sign in over and over instead (a login
+storm, as when everyone's remember cookie expires at once) and reports
+logins/sec alongside the /auth/me p95 of one already signed-in client.
+"""
+import argparse
+import http.cookiejar
+import json
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+SCENARIOS = {
+    # What scripts/prod/server.sh used to run
+    "sync x1": ["--worker-class", "sync", "--workers", "1", "--config", os.devnull],
+    "gunicorn.conf.py": ["--config", os.path.join(ROOT, "gunicorn.conf.py")],
+}
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed_database(path, users, years):
+    os.environ["DATABASE_URL"] = f"sqlite:///{path}"
+    from app import create_app, db
+    from tests.benchmarks.seed import seed
+
+    app = create_app("production")
+    with app.app_context():
+        db.create_all()
+        return seed(users=users, years=years)
+
+
+def wait_until_up(base_url, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            urllib.request.urlopen(f"{base_url}/login", timeout=1)
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError("gunicorn did not start")
+
+
+def make_caller(base_url, latencies, errors):
+    opener = urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+    def call(path, body=None, kind="heavy"):
+        data = json.dumps(body).encode() if body is not None else None
+        req = urllib.request.Request(
+            base_url + path, data=data, headers={"Content-Type": "application/json"}
+        )
+        start = time.perf_counter()
+        try:
+            opener.open(req, timeout=60).read()
+            latencies.append((kind, time.perf_counter() - start))
+        except OSError:
+            errors.append(path)
+
+    return call
+
+
+def client_loop(base_url, email, stop, latencies, errors):
+    call = make_caller(base_url, latencies, errors)
+    call("/api/auth/login", {"email": email, "password": "password123"}, kind="login")
+    paths = ["/api/logs?limit=50", "/api/logs/calendar?view=year", "/api/programs", "/api/logs"]
+    i = 0
+    while not stop.is_set():
+        # Vary the query string so the response cache doesn't answer everything
+        path = paths[i % len(paths)]
+        call(f"{path}{'&' if '?' in path else '?'}_={i}")
+        call("/api/auth/me", kind="light")
+        i += 1
+
+
+def login_loop(base_url, email, stop, latencies, errors):
+    call = make_caller(base_url, latencies, errors)
+    while not stop.is_set():
+        call("/api/auth/login", {"email": email, "password": "password123"}, kind="login")
+
+
+def signed_in_loop(base_url, email, stop, latencies, errors):
+    call = make_caller(base_url, latencies, errors)
+    call("/api/auth/login", {"email": email, "password": "password123"}, kind="setup")
+    while not stop.is_set():
+        call("/api/auth/me", kind="light")
+
+
+def run_scenario(name, args, env, emails, users, duration, mode="mixed"):
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", *args, "--bind", f"127.0.0.1:{port}", "run:app"],
+        cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    try:
+        wait_until_up(base_url)
+        stop = threading.Event()
+        latencies, errors = [], []
+        loop = login_loop if mode == "login" else client_loop
+        clients = [
+            threading.Thread(target=loop, args=(base_url, emails[n % len(emails)], stop, latencies, errors))
+            for n in range(users)
+        ]
+        if mode == "login":
+            clients.append(threading.Thread(
+                target=signed_in_loop, args=(base_url, emails[0], stop, latencies, errors),
+            ))
+        start = time.perf_counter()
+        for t in clients:
+            t.start()
+        time.sleep(duration)
+        stop.set()
+        for t in clients:
+            t.join()
+        elapsed = time.perf_counter() - start
+    finally:
+        server.terminate()
+        server.wait()
+
+    def pct(values, p):
+        values = sorted(values)
+        return values[min(int(len(values) * p), len(values) - 1)] * 1000 if values else 0
+
+    every = [seconds for kind, seconds in latencies if kind != "setup"]
+    light = [seconds for kind, seconds in latencies if kind == "light"]
+    if mode == "login":
+        logins = [seconds for kind, seconds in latencies if kind == "login"]
+        print(
+            f"{name:<18} {len(logins) / elapsed:8.1f} logins/s   "
+            f"p50 {pct(logins, 0.5):7.1f}ms   p95 {pct(logins, 0.95):7.1f}ms   "
+            f"/auth/me p95 {pct(light, 0.95):7.1f}ms   errors {len(errors)}"
+        )
+        return
+    print(
+        f"{name:<18} {len(every) / elapsed:8.1f} req/s   "
+        f"p50 {pct(every, 0.5):7.1f}ms   p95 {pct(every, 0.95):7.1f}ms   "
+        f"/auth/me p95 {pct(light, 0.95):7.1f}ms   errors {len(errors)}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=20, help="concurrent clients")
+    parser.add_argument("--accounts", type=int, default=5, help="distinct seeded accounts")
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--duration", type=float, default=15, help="seconds per scenario")
+    parser.add_argument("--mode", choices=("mixed", "login"), default="mixed")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, "load.db")
+        emails = seed_database(db_path, args.accounts, args.years)
+        env = dict(
+            os.environ,
+            FLASK_ENV="production",
+            DATABASE_URL=f"sqlite:///{db_path}",
+            SECRET_KEY="load-test",
+        )
+        print(f"{args.users} clients, {args.duration:.0f}s per scenario, {os.cpu_count()} CPU(s)")
+        for name, scenario_args in SCENARIOS.items():
+            run_scenario(name, scenario_args, env, emails, args.users, args.duration, args.mode)
+
+
+if __name__ == "__main__":
+    main()
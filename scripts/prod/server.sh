@@ -1,4 +1,5 @@
 #!/usr/bin/env bash
 cd /var/projects/workout-tracker
 source venv/bin/activate
-exec gunicorn --bind unix:/run/workout-tracker.sock run:app
\ No newline at end of file
+# Workers, threads and bind address come from gunicorn.conf.py (env-overridable)
+exec gunicorn --config gunicorn.conf.py run:app
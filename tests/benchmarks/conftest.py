@@ -0,0 +1,143 @@
+"""Fixtures for the endpoint benchmarks.
+
+Environment knobs (pytest options can't be added from a nested conftest):
+
+    BENCHMARK_SIZES=1y,3y,10y       history sizes to seed (default 1y,3y)
+    BENCHMARK_ROUNDS=5              timed calls per endpoint
+    BENCHMARK_TIMING=1              also fail on median time > baseline x BENCHMARK_TOLERANCE
+    BENCHMARK_TOLERANCE=2.0
+    BENCHMARK_UPDATE_BASELINE=1     rewrite baseline.json from this run
+"""
+import json
+import os
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+from sqlalchemy import event
+
+from app import create_app, db
+from app.config import TestingConfig, config
+from app.models import Exercise, Program, SetLog, WorkoutLog
+from tests.benchmarks.seed import SEED_PASSWORD, seed_user
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+SIZES = {"1y": 1, "3y": 3, "10y": 10}
+
+
+class BenchmarkConfig(TestingConfig):
+    # Measure the endpoints themselves, not the response cache
+    RESPONSE_CACHE_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4
+
+
+config.setdefault("benchmark", BenchmarkConfig)
+
+
+def selected_sizes():
+    names = os.environ.get("BENCHMARK_SIZES", "1y,3y").split(",")
+    return [n.strip() for n in names if n.strip() in SIZES]
+
+
+class Seeded:
+    """A seeded app plus the ids benchmarks need."""
+
+    def __init__(self, size):
+        self.size = size
+        self.app = create_app("benchmark")
+        with self.app.app_context():
+            db.create_all()
+            user = seed_user("bench@example.com", years=SIZES[size])
+            self.engine = db.engine
+            self.program_id = Program.query.filter_by(user_id=user.id).first().id
+            self.squat_id = Exercise.query.filter_by(user_id=user.id, name="Squat").first().id
+            last_log = WorkoutLog.query.filter_by(user_id=user.id).order_by(WorkoutLog.id.desc()).first()
+            self.workout_id = last_log.workout_id
+            self.log_id = last_log.id
+            self.set_id = SetLog.query.filter_by(workout_log_id=last_log.id).first().id
+            self.year = last_log.started_at.year
+            self.log_count = WorkoutLog.query.filter_by(user_id=user.id).count()
+            self.email = user.email
+
+    def client(self):
+        client = self.app.test_client()
+        client.post("/api/auth/login", json={"email": self.email, "password": SEED_PASSWORD})
+        return client
+
+
+_seeded = {}
+
+
+@pytest.fixture(params=selected_sizes())
+def seeded(request):
+    if request.param not in _seeded:
+        _seeded[request.param] = Seeded(request.param)
+    return _seeded[request.param]
+
+
+class Benchmark:
+    def __init__(self, results, baseline):
+        self.results = results
+        self.baseline = baseline
+        self.rounds = int(os.environ.get("BENCHMARK_ROUNDS", 5))
+
+    def __call__(self, name, seeded, call):
+        statements = []
+
+        def count(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        timings = []
+        queries = None
+        event.listen(seeded.engine, "before_cursor_execute", count)
+        try:
+            for _ in range(self.rounds):
+                statements.clear()
+                start = time.perf_counter()
+                response = call()
+                response.get_data()
+                timings.append(time.perf_counter() - start)
+                assert response.status_code < 400, (name, response.status_code)
+                queries = len(statements) if queries is None else max(queries, len(statements))
+        finally:
+            event.remove(seeded.engine, "before_cursor_execute", count)
+
+        key = f"{name}[{seeded.size}]"
+        result = {
+            "queries": queries,
+            "median_ms": round(statistics.median(timings) * 1000, 3),
+            "min_ms": round(min(timings) * 1000, 3),
+        }
+        self.results[key] = result
+        self.check(key, result)
+        return result
+
+    def check(self, key, result):
+        expected = self.baseline.get(key)
+        if expected is None or os.environ.get("BENCHMARK_UPDATE_BASELINE"):
+            return
+        assert result["queries"] <= expected["queries"], (
+            f"{key}: {result['queries']} queries, baseline {expected['queries']}"
+        )
+        if os.environ.get("BENCHMARK_TIMING"):
+            tolerance = float(os.environ.get("BENCHMARK_TOLERANCE", 2.0))
+            assert result["median_ms"] <= expected["median_ms"] * tolerance, (
+                f"{key}: median {result['median_ms']}ms, baseline {expected['median_ms']}ms"
+            )
+
+
+@pytest.fixture(scope="session")
+def benchmark_results():
+    results = {}
+    yield results
+    if os.environ.get("BENCHMARK_UPDATE_BASELINE") and results:
+        baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+        baseline.update(results)
+        BASELINE_PATH.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+@pytest.fixture
+def benchmark(benchmark_results):
+    baseline = json.loads(BASELINE_PATH.read_text()) if BASELINE_PATH.exists() else {}
+    return Benchmark(benchmark_results, baseline)
@@ -0,0 +1,140 @@
+"""Synthetic multi-year training history for benchmarks and load tests.
+
+    python -m tests.benchmarks.seed --users 5 --years 3
+
+seeds the database configured for FLASK_ENV. Every user gets an
+exercise library, a few workout templates in a program rotation, and
+`years` of completed sessions with progressing weights. Output is
+deterministic for a given --seed.
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from sqlalchemy import insert
+
+from app import db, bcrypt
+from app.services.progress import backfill_progress
+from app.models import (
+    User, Program, ProgramWorkoutOrder, Workout, WorkoutExercise, Exercise, WorkoutLog, SetLog,
+)
+
+STRENGTH = [
+    "Squat", "Bench Press", "Deadlift", "Overhead Press", "Barbell Row", "Pull Up",
+    "Dip", "Romanian Deadlift", "Lunge", "Incline Press", "Curl", "Face Pull",
+]
+CARDIO = ["Peloton", "Rower", "Run"]
+SEED_PASSWORD = "password123"
+LOG_CHUNK = 500
+
+
+def seed_user(email, years=1, sessions_per_week=3, templates=4, rng=None, password_hash=None):
+    """Create one user with `years` of history and return it."""
+    rng = rng or random.Random(0)
+    user = User(email=email, password_hash=password_hash or bcrypt.generate_password_hash(SEED_PASSWORD).decode("utf-8"))
+    db.session.add(user)
+    db.session.flush()
+
+    exercises = [Exercise(user_id=user.id, name=n, type="strength") for n in STRENGTH]
+    exercises += [Exercise(user_id=user.id, name=n, type="cardio", unit="mins") for n in CARDIO]
+    db.session.add_all(exercises)
+    db.session.flush()
+
+    strength = [e for e in exercises if e.type == "strength"]
+    cardio = [e for e in exercises if e.type == "cardio"]
+    start_weight = {e.id: rng.choice([45, 65, 95, 135]) for e in strength}
+
+    program = Program(user_id=user.id, name="Rotation")
+    db.session.add(program)
+    workouts = []
+    for t in range(templates):
+        workout = Workout(user_id=user.id, name=f"Day {chr(ord('A') + t)}")
+        db.session.add(workout)
+        db.session.flush()
+        picks = rng.sample(strength, rng.randint(4, 6)) + [rng.choice(cardio)]
+        for pos, ex in enumerate(picks):
+            db.session.add(WorkoutExercise(
+                workout_id=workout.id,
+                exercise_id=ex.id,
+                position=pos,
+                default_sets=1 if ex.type == "cardio" else 5,
+                default_reps=5,
+                default_weight=start_weight.get(ex.id),
+                default_duration_minutes=30 if ex.type == "cardio" else None,
+            ))
+        db.session.add(ProgramWorkoutOrder(program_id=program.id, workout_id=workout.id, position=t))
+        workouts.append((workout, picks))
+    db.session.flush()
+
+    total_sessions = int(years * 52 * sessions_per_week)
+    when = datetime(2026, 1, 1) - timedelta(days=int(years * 365))
+    gap = timedelta(days=7 / sessions_per_week)
+
+    for chunk_start in range(0, total_sessions, LOG_CHUNK):
+        logs = []
+        plans = []
+        for i in range(chunk_start, min(chunk_start + LOG_CHUNK, total_sessions)):
+            workout, picks = workouts[i % len(workouts)]
+            started = when + gap * i + timedelta(minutes=rng.randint(0, 120))
+            logs.append(WorkoutLog(
+                user_id=user.id,
+                program_id=program.id,
+                workout_id=workout.id,
+                started_at=started,
+                completed_at=started + timedelta(minutes=rng.randint(40, 90)),
+            ))
+            plans.append((i, picks))
+        db.session.add_all(logs)
+        db.session.flush()
+
+        rows = []
+        for log, (i, picks) in zip(logs, plans):
+            for ex in picks:
+                if ex.type == "cardio":
+                    rows.append({
+                        "workout_log_id": log.id, "exercise_id": ex.id, "set_number": 1,
+                        "duration_minutes": rng.choice([20, 30, 45]), "completed": rng.random() > 0.1,
+                    })
+                    continue
+                weight = start_weight[ex.id] + 5 * (i // (len(workouts) * 2))
+                for s in range(1, 6):
+                    reps = 5 if rng.random() > 0.15 else rng.randint(1, 4)
+                    rows.append({
+                        "workout_log_id": log.id, "exercise_id": ex.id, "set_number": s,
+                        "planned_reps": 5, "actual_reps": reps, "weight": weight, "completed": True,
+                    })
+        db.session.execute(insert(SetLog), rows)
+
+    db.session.commit()
+    # Live writes keep these rows current; build them once for bulk-seeded history
+    backfill_progress(user.id)
+    return user
+
+
+def seed(users=1, years=1, sessions_per_week=3, seed_value=0):
+    """Seed `users` users named bench<N>@example.com; returns their emails."""
+    rng = random.Random(seed_value)
+    password_hash = bcrypt.generate_password_hash(SEED_PASSWORD).decode("utf-8")
+    emails = []
+    for n in range(users):
+        email = f"bench{n}@example.com"
+        seed_user(email, years=years, sessions_per_week=sessions_per_week, rng=rng, password_hash=password_hash)
+        emails.append(email)
+    return emails
+
+
+if __name__ == "__main__":
+    from app import create_app
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--users", type=int, default=1)
+    parser.add_argument("--years", type=float, default=1)
+    parser.add_argument("--sessions-per-week", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        emails = seed(args.users, args.years, args.sessions_per_week, args.seed)
+    print(f"✓ Seeded {len(emails)} user(s), password '{SEED_PASSWORD}': {', '.join(emails)}")
@@ -0,0 +1,90 @@
+"""Endpoint timings and query counts at several history sizes.
+
+Query counts are compared against baseline.json on every run; timings
+only with BENCHMARK_TIMING=1, since they depend on the machine.
+"""
+from tests.benchmarks.seed import SEED_PASSWORD
+
+
+def test_list_logs_page(benchmark, seeded):
+    c = seeded.client()
+    benchmark("list_logs_page", seeded, lambda: c.get("/api/logs?limit=50"))
+
+
+def test_list_logs_full(benchmark, seeded):
+    c = seeded.client()
+    benchmark("list_logs_full", seeded, lambda: c.get("/api/logs"))
+
+
+def test_calendar_year(benchmark, seeded):
+    c = seeded.client()
+    benchmark("calendar_year", seeded, lambda: c.get(f"/api/logs/calendar?year={seeded.year}&view=year"))
+
+
+def test_exercise_progress(benchmark, seeded):
+    c = seeded.client()
+    benchmark("exercise_progress", seeded, lambda: c.get(f"/api/exercises/{seeded.squat_id}/progress"))
+
+
+def test_next_workout(benchmark, seeded):
+    c = seeded.client()
+    benchmark("next_workout", seeded, lambda: c.get(f"/api/programs/{seeded.program_id}/next"))
+
+
+def test_start_workout(benchmark, seeded):
+    c = seeded.client()
+    benchmark("start_workout", seeded, lambda: c.post("/api/logs", json={
+        "workout_id": seeded.workout_id, "program_id": seeded.program_id,
+    }))
+
+
+def test_update_set(benchmark, seeded):
+    c = seeded.client()
+    benchmark("update_set", seeded, lambda: c.put(
+        f"/api/logs/{seeded.log_id}/sets/{seeded.set_id}", json={"completed": True, "actual_reps": 5},
+    ))
+
+
+def test_list_logs_full_stdlib_json(benchmark, seeded):
+    c = seeded.client()
+    seeded.app.json.native = False
+    try:
+        benchmark("list_logs_full_stdlib_json", seeded, lambda: c.get("/api/logs"))
+    finally:
+        seeded.app.json.native = True
+
+
+def test_list_logs_full_gzip(benchmark, seeded):
+    c = seeded.client()
+    result = benchmark("list_logs_full_gzip", seeded, lambda: c.get("/api/logs", headers={"Accept-Encoding": "gzip"}))
+    plain = len(c.get("/api/logs").get_data())
+    compressed = len(c.get("/api/logs", headers={"Accept-Encoding": "gzip"}).get_data())
+    result["bytes"], result["compressed_bytes"] = plain, compressed
+    assert compressed < plain
+
+
+def test_auth_me(benchmark, seeded):
+    # Per-request authentication overhead with the cached principal
+    c = seeded.client()
+    benchmark("auth_me", seeded, lambda: c.get("/api/auth/me"))
+    assert "Set-Cookie" not in c.get("/api/auth/me").headers
+
+
+def test_auth_me_uncached(benchmark, seeded):
+    # The same with PRINCIPAL_CACHE_TTL=0: the users row is read every request
+    c = seeded.client()
+    cache = seeded.app.extensions["principal_cache"]
+    seeded.app.extensions["principal_cache"] = type(cache)(cache.max_entries, 0)
+    try:
+        benchmark("auth_me_uncached", seeded, lambda: c.get("/api/auth/me"))
+    finally:
+        seeded.app.extensions["principal_cache"] = cache
+
+
+def test_login(benchmark, seeded):
+    # Queries per login, one at a time; for throughput under concurrent
+    # logins use scripts/load_test.py --mode login
+    c = seeded.app.test_client()
+    benchmark("login", seeded, lambda: c.post(
+        "/api/auth/login", json={"email": seeded.email, "password": SEED_PASSWORD},
+    ))
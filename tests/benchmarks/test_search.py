@@ -0,0 +1,69 @@
+"""Exercise search index at 10k exercises, without the HTTP layer."""
+import itertools
+import os
+import statistics
+import time
+
+import pytest
+
+from app.services.search import ExerciseIndex
+
+MODIFIERS = ["Incline", "Decline", "Seated", "Standing", "Single Arm", "Paused", "Tempo", "Deficit", "Close Grip", "Wide Grip"]
+EQUIPMENT = ["Barbell", "Dumbbell", "Cable", "Machine", "Kettlebell", "Band", "Smith", "Landmine", "Trap Bar", "Bodyweight"]
+MOVEMENTS = [
+    "Squat", "Front Squat", "Split Squat", "Lunge", "Step Up", "Deadlift", "Romanian Deadlift", "Good Morning",
+    "Hip Thrust", "Glute Bridge", "Bench Press", "Floor Press", "Overhead Press", "Push Press", "Row",
+    "Pendlay Row", "Pullover", "Fly", "Lateral Raise", "Front Raise", "Rear Delt Fly", "Shrug", "Curl",
+    "Hammer Curl", "Preacher Curl", "Triceps Extension", "Skull Crusher", "Kickback", "Pulldown", "Pull Up",
+    "Chin Up", "Dip", "Push Up", "Calf Raise", "Leg Press", "Leg Curl", "Leg Extension", "Hack Squat",
+    "Crunch", "Russian Twist", "Woodchopper", "Pallof Press", "Farmer Carry", "Suitcase Carry", "Clean",
+    "Snatch", "Thruster", "Swing", "Face Pull", "Upright Row",
+]
+QUERIES = {
+    "prefix": "squ",
+    "tokens": "incl db bench",
+    "phrase": "barbell bench press",
+    "typo": "romainan dedlift",
+}
+
+
+def exercises():
+    names = (" ".join(parts) for parts in itertools.product(MODIFIERS, EQUIPMENT, MOVEMENTS, ["", "(Variation)"]))
+    return [{"id": i, "name": name.strip()} for i, name in enumerate(names, 1)]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return ExerciseIndex(exercises())
+
+
+def test_build_10k(benchmark):
+    rows = exercises()
+    start = time.perf_counter()
+    index = ExerciseIndex(rows)
+    elapsed = time.perf_counter() - start
+    assert len(index) == 10000
+    ms = round(elapsed * 1000, 3)
+    result = {"queries": 0, "median_ms": ms, "min_ms": ms}
+    benchmark.results["exercise_search_build[10k]"] = result
+    benchmark.check("exercise_search_build[10k]", result)
+
+
+@pytest.mark.parametrize("kind", sorted(QUERIES))
+def test_search_10k(benchmark, index, kind):
+    timings = []
+    for _ in range(max(benchmark.rounds, 20)):
+        start = time.perf_counter()
+        results = index.search(QUERIES[kind])
+        timings.append(time.perf_counter() - start)
+    assert results
+    key = f"exercise_search_{kind}[10k]"
+    result = {
+        "queries": 0,
+        "median_ms": round(statistics.median(timings) * 1000, 3),
+        "min_ms": round(min(timings) * 1000, 3),
+    }
+    benchmark.results[key] = result
+    benchmark.check(key, result)
+    if os.environ.get("BENCHMARK_TIMING"):
+        assert result["median_ms"] < 1.0 or kind == "typo", result
@@ -1,4 +1,8 @@
+from contextlib import contextmanager
+
 import pytest
+from sqlalchemy import event
+
 from app import create_app, db as _db
 
 
@@ -25,3 +29,18 @@ def db(app):
 def register_and_login(client, email="test@example.com", password="password123"):
     client.post("/api/auth/register", json={"email": email, "password": password})
     return client
+
+
+@contextmanager
+def count_queries(db):
+    """Collect the SQL statements executed inside the block."""
+    statements = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
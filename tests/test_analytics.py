@@ -0,0 +1,85 @@
+from tests.conftest import register_and_login, count_queries
+
+CSV = """date,workout,exercise,muscle_group,weight,reps
+2025-01-06T07:00:00,A,Squat,legs,100,5
+2025-01-06T07:00:00,A,Squat,legs,100,5
+2025-01-06T07:00:00,A,Bench,chest,80,10
+2025-01-08T07:00:00,B,Squat,legs,110,3
+2025-01-20T07:00:00,A,Squat,legs,120,1
+2025-01-20T07:00:00,A,Curl,,20,10
+"""
+
+
+def imported(client):
+    c = register_and_login(client)
+    assert c.post("/api/import?format=csv", data=CSV).status_code == 201
+    exercises = {e["name"]: e for e in c.get("/api/exercises").json}
+    return c, exercises
+
+
+def test_weekly_and_monthly_volume(client):
+    c, exercises = imported(client)
+
+    res = c.get("/api/analytics/volume?window=2")
+    assert res.status_code == 200
+    weeks = res.json["volume"]
+    # The idle week in between is reported as zero
+    assert [w["period_start"] for w in weeks] == ["2025-01-06", "2025-01-13", "2025-01-20"]
+    assert [w["tonnage"] for w in weeks] == [100 * 5 * 2 + 800 + 330, 0, 120 + 200]
+    assert [w["sessions"] for w in weeks] == [2, 0, 1]
+    assert [w["rolling_tonnage"] for w in weeks] == [2130, 1065, 160]
+
+    months = c.get("/api/analytics/volume?period=month").json["volume"]
+    assert months == [{
+        "period_start": "2025-01-01", "tonnage": 2450, "sets": 6, "reps": 34,
+        "sessions": 3, "rolling_tonnage": 2450,
+    }]
+
+    assert c.get("/api/analytics/volume?period=day").status_code == 400
+    assert c.get("/api/analytics/volume?from=2025-01-07").json["volume"][0]["tonnage"] == 330
+    assert c.get("/api/analytics/volume?to=junk").status_code == 400
+
+
+def test_tonnage_by_muscle_group(client):
+    c, exercises = imported(client)
+    assert exercises["Squat"]["muscle_group"] == "legs"
+
+    res = c.get("/api/analytics/muscle-groups")
+    assert res.json == {
+        "legs": {"tonnage": 1450, "sets": 4},
+        "chest": {"tonnage": 800, "sets": 1},
+        "unassigned": {"tonnage": 200, "sets": 1},
+    }
+
+
+def test_e1rm_trend(client):
+    c, exercises = imported(client)
+    squat = exercises["Squat"]["id"]
+
+    res = c.get(f"/api/analytics/e1rm/{squat}?window=2")
+    trend = res.json["trend"]
+    assert [p["e1rm"] for p in trend] == [116.7, 121.0, 120]
+    assert [p["rolling_e1rm"] for p in trend] == [116.7, 118.8, 120.5]
+    assert res.json["best_e1rm"] == 121.0
+
+    brzycki = c.get(f"/api/analytics/e1rm/{squat}?formula=brzycki").json["trend"]
+    assert [p["e1rm"] for p in brzycki] == [112.5, 116.5, 120]
+
+    assert c.get(f"/api/analytics/e1rm/{squat}?formula=guess").status_code == 400
+    assert c.get("/api/analytics/e1rm/9999").status_code == 404
+
+
+def test_analytics_cached_until_next_write(client, db):
+    c, exercises = imported(client)
+
+    first = c.get("/api/analytics/volume")
+    assert first.headers["X-Cache"] == "MISS"
+    with count_queries(db) as statements:
+        again = c.get("/api/analytics/volume")
+    assert again.headers["X-Cache"] == "HIT"
+    assert not any("set_logs" in s for s in statements)
+
+    c.post("/api/import?format=csv", data="date,exercise,weight,reps\n2025-02-03,Squat,100,5\n")
+    res = c.get("/api/analytics/volume")
+    assert res.headers["X-Cache"] == "MISS"
+    assert res.json["volume"][-1]["period_start"] == "2025-02-03"
@@ -1,4 +1,8 @@
-from tests.conftest import register_and_login
+from flask import g
+
+from app import bcrypt, principal_cache
+from app.models.user import User
+from tests.conftest import count_queries, register_and_login
 
 
 def test_register(client):
@@ -59,3 +63,61 @@ def test_logout(client):
     assert res.status_code == 200
     res = client.get("/api/auth/me")
     assert res.status_code == 401
+
+
+def get_me(client):
+    # The tests share one app context, so Flask-Login's per-request user
+    # would otherwise carry over from the previous request
+    g.pop("_login_user", None)
+    return client.get("/api/auth/me")
+
+
+def test_authenticated_request_skips_user_lookup(client, db):
+    register_and_login(client)
+    get_me(client)
+    with count_queries(db) as statements:
+        res = get_me(client)
+    assert res.status_code == 200
+    assert res.json["email"] == "test@example.com"
+    # Only the data_version behind cache keys, never the whole users row
+    assert not [s for s in statements if "users.password_hash" in s]
+    assert len(statements) == 1
+    # Nothing in the session changed, so the cookie isn't re-issued
+    assert "Set-Cookie" not in res.headers
+
+
+def test_password_reset_ends_existing_sessions(client, db):
+    register_and_login(client)
+    assert get_me(client).status_code == 200
+
+    user = User.query.filter_by(email="test@example.com").first()
+    user.password_hash = bcrypt.generate_password_hash("newpassword").decode("utf-8")
+    db.session.commit()
+    principal_cache.invalidate(user)
+
+    assert get_me(client).status_code == 401
+    res = client.post("/api/auth/login", json={"email": "test@example.com", "password": "newpassword"})
+    assert res.status_code == 200
+    assert get_me(client).status_code == 200
+
+
+def test_session_without_a_stamp_is_logged_out(client):
+    register_and_login(client)
+    assert get_me(client).status_code == 200
+
+    # A session id from before stamps were added carries no stamp
+    with client.session_transaction() as session:
+        session["_user_id"] = session["_user_id"].partition(":")[0]
+    client.delete_cookie("remember_token")
+    assert get_me(client).status_code == 401
+
+
+def test_password_reset_seen_by_workers_without_a_cached_principal(app, client, db):
+    register_and_login(client)
+    user = User.query.filter_by(email="test@example.com").first()
+    user.set_password("newpassword")
+    db.session.commit()
+
+    # Another worker, e.g. a reset from manage_user.py: nothing cached here
+    app.extensions["principal_cache"] = type(app.extensions["principal_cache"])(100, 60)
+    assert get_me(client).status_code == 401
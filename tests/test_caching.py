@@ -0,0 +1,82 @@
+from tests.test_logging import setup_workout
+
+
+def test_etag_not_modified(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    res = c.get("/api/programs")
+    etag = res.headers["ETag"]
+    assert res.headers["Cache-Control"] == "private, no-cache"
+
+    res = c.get("/api/programs", headers={"If-None-Match": etag})
+    assert res.status_code == 304
+    assert res.headers["ETag"] == etag
+    assert res.get_data() == b""
+
+    # Different URL, different tag
+    assert c.get("/api/workouts").headers["ETag"] != etag
+
+
+def test_write_invalidates_etag(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    etag = c.get("/api/programs").headers["ETag"]
+    c.put(f"/api/programs/{p['id']}", json={"name": "Renamed"})
+
+    res = c.get("/api/programs", headers={"If-None-Match": etag})
+    assert res.status_code == 200
+    assert res.json[0]["name"] == "Renamed"
+    assert res.headers["ETag"] != etag
+
+
+def test_failed_write_keeps_etag(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    etag = c.get("/api/programs").headers["ETag"]
+    assert c.post("/api/programs", json={"name": ""}).status_code == 400
+    assert c.get("/api/programs", headers={"If-None-Match": etag}).status_code == 304
+
+
+def test_etags_are_per_user(client, app):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    etag = c.get("/api/exercises").headers["ETag"]
+
+    other = app.test_client()
+    other.post("/api/auth/register", json={"email": "other@example.com", "password": "password123"})
+    assert other.get("/api/exercises", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_response_cache_hit_and_invalidation(client, app):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    assert c.get("/api/workouts").headers["X-Cache"] == "MISS"
+    res = c.get("/api/workouts")
+    assert res.headers["X-Cache"] == "HIT"
+    assert res.json[0]["name"] == "Full Body"
+
+    # Writes bump the version through session events, including bulk statements
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    c.get(f"/api/logs/{log['id']}")
+    c.patch(f"/api/logs/{log['id']}/sets", json={"sets": [{"id": log["sets"][0]["id"], "completed": True}]})
+    res = c.get(f"/api/logs/{log['id']}")
+    assert res.headers["X-Cache"] == "MISS"
+    assert res.json["sets"][0]["completed"] is True
+
+    stats = c.get("/api/cache/stats").json
+    assert stats["backend"] == "lru"
+    assert stats["hits"] >= 1
+
+
+def test_lru_backend_is_bounded():
+    from app.cache import LRUBackend
+
+    cache = LRUBackend(max_entries=2, max_bytes=10)
+    cache.set("a", b"1234")
+    cache.set("b", b"1234")
+    cache.get("a")
+    cache.set("c", b"1234")
+    assert cache.get("b") is None
+    assert cache.get("a") == b"1234"
+
+    cache.set("d", b"12345678")
+    assert cache.stats()["bytes"] <= 10
@@ -0,0 +1,71 @@
+import threading
+
+import pytest
+
+from app import create_app, db as _db
+from app.config import TestingConfig, config, engine_options
+
+THREADS = 8
+UPDATES = 40
+
+
+@pytest.fixture
+def file_app(tmp_path, monkeypatch):
+    """An app on a SQLite file, which (unlike :memory:) real workers share."""
+    uri = f"sqlite:///{tmp_path / 'workout.db'}"
+
+    class FileConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = uri
+        SQLALCHEMY_ENGINE_OPTIONS = engine_options(uri)
+
+    monkeypatch.setitem(config, "file", FileConfig)
+    app = create_app("file")
+    with app.app_context():
+        _db.create_all()
+    yield app
+    with app.app_context():
+        _db.session.remove()
+        _db.engine.dispose()
+
+
+def start_session(app, n):
+    c = app.test_client()
+    c.post("/api/auth/register", json={"email": f"user{n}@example.com", "password": "password123"})
+    ex = c.post("/api/exercises", json={"name": "Squat", "type": "strength"}).json
+    w = c.post("/api/workouts", json={"name": "Legs"}).json
+    c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": ex["id"], "default_sets": 5})
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    return c, log
+
+
+def test_sqlite_pragmas_applied(file_app):
+    with file_app.app_context():
+        with _db.engine.connect() as conn:
+            assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+            assert conn.exec_driver_sql("PRAGMA busy_timeout").scalar() == 30000
+            assert conn.exec_driver_sql("PRAGMA synchronous").scalar() == 1  # NORMAL
+
+
+def test_concurrent_set_updates(file_app):
+    sessions = [start_session(file_app, n) for n in range(THREADS)]
+    barrier = threading.Barrier(THREADS)
+    failures = []
+
+    def hammer(c, log):
+        barrier.wait()
+        for i in range(UPDATES):
+            s = log["sets"][i % len(log["sets"])]
+            res = c.put(f"/api/logs/{log['id']}/sets/{s['id']}", json={"weight": 100 + i, "completed": True})
+            if res.status_code != 200:
+                failures.append(res.status_code)
+
+    threads = [threading.Thread(target=hammer, args=session) for session in sessions]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert failures == []
+    for c, log in sessions:
+        sets = c.get(f"/api/logs/{log['id']}").json["sets"]
+        assert [s["weight"] for s in sets] == [100 + i for i in range(UPDATES - len(sets), UPDATES)]
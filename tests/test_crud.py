@@ -1,4 +1,5 @@
-from tests.conftest import register_and_login
+from app.models import Exercise, User, WorkoutExercise
+from tests.conftest import register_and_login, count_queries
 
 
 def test_program_crud(client):
@@ -98,3 +99,106 @@ def test_program_workout_order(client):
     assert res.status_code == 200
     assert len(res.json["workouts"]) == 2
     assert res.json["workouts"][0]["name"] == "A"
+
+
+def test_program_and_workout_lists_use_constant_queries(client, db):
+    c = register_and_login(client)
+    squat = c.post("/api/exercises", json={"name": "Squat", "type": "strength"}).json
+
+    def add_program(n):
+        w = c.post("/api/workouts", json={"name": f"W{n}"}).json
+        c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": squat["id"]})
+        p = c.post("/api/programs", json={"name": f"P{n}"}).json
+        c.put(f"/api/programs/{p['id']}/order", json={"workout_ids": [w["id"]]})
+
+    add_program(0)
+    with count_queries(db) as few_programs:
+        c.get("/api/programs")
+    with count_queries(db) as few_workouts:
+        c.get("/api/workouts")
+
+    for n in range(1, 6):
+        add_program(n)
+    with count_queries(db) as many_programs:
+        res = c.get("/api/programs")
+    assert [p["workouts"][0]["exercises"] for p in res.json] == [["Squat"]] * 6
+    with count_queries(db) as many_workouts:
+        res = c.get("/api/workouts")
+    assert [w["exercises"][0]["exercise_name"] for w in res.json] == ["Squat"] * 6
+
+    assert len(many_programs) == len(few_programs)
+    assert len(many_workouts) == len(few_workouts)
+
+
+def test_reorders_are_diffs_with_constant_queries(client, db):
+    c = register_and_login(client)
+
+    def setup(n):
+        exercises = [c.post("/api/exercises", json={"name": f"E{n}-{i}"}).json["id"] for i in range(n)]
+        w = c.post("/api/workouts", json={"name": f"W{n}"}).json
+        c.put(f"/api/workouts/{w['id']}/exercises", json={
+            "exercises": [{"exercise_id": e} for e in exercises],
+        })
+        workouts = [c.post("/api/workouts", json={"name": f"R{n}-{i}"}).json["id"] for i in range(n)]
+        p = c.post("/api/programs", json={"name": f"P{n}"}).json
+        c.put(f"/api/programs/{p['id']}/order", json={"workout_ids": workouts})
+        return w["id"], exercises, p["id"], workouts
+
+    def move_last_to_front(workout_id, exercises, program_id, workouts):
+        before = {we["exercise_id"]: we["id"] for we in c.get(f"/api/workouts/{workout_id}").json["exercises"]}
+        with count_queries(db) as workout_statements:
+            res = c.put(f"/api/workouts/{workout_id}/exercises", json={
+                "exercises": [{"exercise_id": e} for e in exercises[-1:] + exercises[:-1]],
+            })
+        assert [we["exercise_id"] for we in res.json["exercises"]] == exercises[-1:] + exercises[:-1]
+        # Every row survives the move with its id
+        assert {we["exercise_id"]: we["id"] for we in res.json["exercises"]} == before
+
+        with count_queries(db) as program_statements:
+            res = c.put(f"/api/programs/{program_id}/order", json={"workout_ids": workouts[-1:] + workouts[:-1]})
+        assert [w["id"] for w in res.json["workouts"]] == workouts[-1:] + workouts[:-1]
+        return len(workout_statements), len(program_statements)
+
+    assert move_last_to_front(*setup(3)) == move_last_to_front(*setup(20))
+
+
+def test_reorder_inserts_updates_and_deletes(client, db):
+    c = register_and_login(client)
+    squat, bench, row = (c.post("/api/exercises", json={"name": n}).json["id"] for n in ("Squat", "Bench", "Row"))
+    other = User(email="other@example.com", password_hash="x")
+    db.session.add(other)
+    db.session.flush()
+    theirs = Exercise(user_id=other.id, name="Theirs")
+    db.session.add(theirs)
+    db.session.commit()
+    foreign = theirs.id
+
+    w = c.post("/api/workouts", json={"name": "A"}).json
+    first = c.put(f"/api/workouts/{w['id']}/exercises", json={
+        "exercises": [{"exercise_id": squat}, {"exercise_id": bench}],
+    }).json["exercises"]
+    res = c.put(f"/api/workouts/{w['id']}/exercises", json={"exercises": [
+        {"exercise_id": row},
+        {"exercise_id": foreign},
+        {"exercise_id": squat, "default_weight": 225},
+    ]})
+    exercises = res.json["exercises"]
+    assert [we["exercise_id"] for we in exercises] == [row, squat]
+    assert exercises[1]["id"] == first[0]["id"]
+    assert exercises[1]["default_weight"] == 225
+    assert exercises[1]["position"] == 2
+    assert WorkoutExercise.query.filter_by(workout_id=w["id"], exercise_id=bench).count() == 0
+
+
+def test_reorder_rejects_malformed_exercises(client):
+    c = register_and_login(client)
+    squat = c.post("/api/exercises", json={"name": "Squat"}).json["id"]
+    w = c.post("/api/workouts", json={"name": "A"}).json
+    url = f"/api/workouts/{w['id']}/exercises"
+    c.put(url, json={"exercises": [{"exercise_id": squat}]})
+
+    for exercises in ([{"exercise_id": [squat]}], [{"exercise_id": {"id": squat}}], [squat],
+                      [{"exercise_id": True}], [{"exercise_id": squat, "id": "1"}], {"exercise_id": squat}):
+        assert c.put(url, json={"exercises": exercises}).status_code == 400
+    assert c.put(url, json=[{"exercise_id": squat}]).status_code == 400
+    assert [we["exercise_id"] for we in c.get(f"/api/workouts/{w['id']}").json["exercises"]] == [squat]
@@ -0,0 +1,74 @@
+import csv
+import io
+import json
+
+from app.services import export
+from tests.conftest import register_and_login, count_queries
+from tests.test_logging import setup_workout
+
+
+def finished_session(c, w, p):
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    c.put(f"/api/logs/{log['id']}/sets/{log['sets'][0]['id']}", json={"completed": True, "weight": 140})
+    c.put(f"/api/logs/{log['id']}", json={"complete": True, "notes": "Felt good", "body_weight": 155.0})
+    return log
+
+
+def rows_without_ids(text):
+    rows = list(csv.DictReader(io.StringIO(text)))
+    for row in rows:
+        del row["log_id"]
+    return rows
+
+
+def test_export_csv_round_trips_through_import(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    finished_session(c, w, p)
+    finished_session(c, w, p)
+
+    res = c.get("/api/export?format=csv")
+    assert res.status_code == 200
+    assert res.mimetype == "text/csv"
+    assert res.headers["Content-Disposition"].startswith("attachment;")
+    exported = res.get_data(as_text=True)
+    rows = rows_without_ids(exported)
+    assert len(rows) == 2 * 4
+    assert rows[0]["workout"] == "Full Body"
+    assert rows[0]["exercise"] == "Squat"
+    assert rows[0]["weight"] == "140.0"
+    assert rows[0]["notes"] == "Felt good"
+
+    c.post("/api/auth/logout")
+    other = register_and_login(client, email="other@example.com")
+    assert other.post("/api/import?format=csv", data=exported).status_code == 201
+    assert rows_without_ids(other.get("/api/export?format=csv").get_data(as_text=True)) == rows
+
+
+def test_export_ndjson_and_columnar(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    finished_session(c, w, p)
+    c.post("/api/logs", json={"custom_name": "Empty session"})
+
+    lines = c.get("/api/export?format=ndjson").get_data(as_text=True).splitlines()
+    records = [json.loads(line) for line in lines]
+    assert len(records) == 5
+    assert records[-1]["workout"] == "Empty session"
+    assert records[-1]["exercise"] is None
+
+    batches = [json.loads(line) for line in c.get("/api/export?format=columnar").get_data(as_text=True).splitlines()]
+    assert sum(b["rows"] for b in batches) == 5
+    assert batches[0]["columns"]["exercise"][:4] == [r["exercise"] for r in records[:4]]
+
+    assert c.get("/api/export?format=xlsx").status_code == 400
+
+
+def test_export_fetches_in_chunks(client, db, monkeypatch):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    for _ in range(5):
+        finished_session(c, w, p)
+    monkeypatch.setattr(export, "CHUNK_SIZE", 4)
+
+    with count_queries(db) as statements:
+        text = c.get("/api/export?format=ndjson").get_data(as_text=True)
+    assert len(text.splitlines()) == 20
+    assert sum("FROM workout_logs" in s for s in statements) == 1
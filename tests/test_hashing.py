@@ -0,0 +1,75 @@
+import bcrypt as _bcrypt
+
+from app import db, hashing, password_hasher
+from app.hashing import MAX_ROUNDS, MIN_ROUNDS, PasswordHasher, calibrate, hash_rounds
+from app.models.user import User
+from tests.conftest import register_and_login
+
+
+def test_hash_rounds():
+    assert hash_rounds(_bcrypt.hashpw(b"x", _bcrypt.gensalt(5)).decode()) == 5
+    assert hash_rounds("not a bcrypt hash") is None
+
+
+def test_calibrate_stays_within_bounds():
+    assert calibrate(0) == MIN_ROUNDS
+    assert calibrate(10 ** 9) == MAX_ROUNDS
+
+
+def test_testing_uses_low_fixed_cost(app):
+    assert password_hasher.rounds == app.config["BCRYPT_LOG_ROUNDS"] == 4
+    register_and_login(app.test_client())
+    assert hash_rounds(User.query.first().password_hash) == 4
+
+
+def test_cost_is_calibrated_on_first_hash(app, monkeypatch):
+    calls = []
+    monkeypatch.setattr(hashing, "calibrate", lambda target_ms: calls.append(target_ms) or 4)
+    monkeypatch.setitem(app.config, "BCRYPT_LOG_ROUNDS", None)
+    monkeypatch.setitem(app.extensions, "password_hasher", password_hasher)
+    hasher = PasswordHasher(app)
+    assert hasher.rounds is None
+    assert calls == []
+
+    assert hash_rounds(hasher.hash("password123")) == 4
+    hasher.hash("password123")
+    assert calls == [app.config["PASSWORD_HASH_TARGET_MS"]]
+
+
+def test_login_rehashes_when_cost_raised(client, monkeypatch):
+    user = User(email="old@example.com")
+    user.password_hash = _bcrypt.hashpw(b"password123", _bcrypt.gensalt(4)).decode()
+    db.session.add(user)
+    db.session.commit()
+    monkeypatch.setattr(password_hasher, "rounds", 5)
+
+    res = client.post("/api/auth/login", json={"email": "old@example.com", "password": "password123"})
+    assert res.status_code == 200
+    assert hash_rounds(user.password_hash) == 5
+    # Still the same password
+    client.post("/api/auth/logout")
+    res = client.post("/api/auth/login", json={"email": "old@example.com", "password": "password123"})
+    assert res.status_code == 200
+
+
+def test_login_keeps_hashes_above_the_current_cost(client):
+    user = User(email="old@example.com")
+    user.password_hash = stored = _bcrypt.hashpw(b"password123", _bcrypt.gensalt(5)).decode()
+    db.session.add(user)
+    db.session.commit()
+
+    res = client.post("/api/auth/login", json={"email": "old@example.com", "password": "password123"})
+    assert res.status_code == 200
+    assert user.password_hash == stored
+
+
+def test_login_returns_503_when_hashing_is_saturated(client, monkeypatch):
+    register_and_login(client)
+    client.post("/api/auth/logout")
+    monkeypatch.setattr(password_hasher, "max_pending", 0)
+    before = password_hasher.stats()["rejected"]
+
+    res = client.post("/api/auth/login", json={"email": "test@example.com", "password": "password123"})
+    assert res.status_code == 503
+    assert res.headers["Retry-After"] == "1"
+    assert password_hasher.stats()["rejected"] == before + 1
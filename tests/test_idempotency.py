@@ -0,0 +1,63 @@
+from tests.test_logging import setup_workout
+
+
+def test_replayed_write_is_applied_once(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    headers = {"Idempotency-Key": "3f1c9a52-key"}
+
+    first = c.post("/api/logs", json={"workout_id": w["id"]}, headers=headers)
+    again = c.post("/api/logs", json={"workout_id": w["id"]}, headers=headers)
+
+    assert first.status_code == again.status_code == 201
+    assert again.json == first.json
+    assert again.headers["Idempotent-Replayed"] == "true"
+    assert len(c.get("/api/logs").json) == 1
+
+
+def test_idempotency_key_reused_for_other_request(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    headers = {"Idempotency-Key": "reused"}
+
+    log = c.post("/api/logs", json={"workout_id": w["id"]}, headers=headers).json
+    res = c.put(f"/api/logs/{log['id']}", json={"complete": True}, headers=headers)
+    assert res.status_code == 422
+
+
+def test_idempotency_keys_are_per_user(client, app):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    headers = {"Idempotency-Key": "shared"}
+    c.post("/api/exercises", json={"name": "Row"}, headers=headers)
+
+    other = app.test_client()
+    other.post("/api/auth/register", json={"email": "other@example.com", "password": "password123"})
+    res = other.post("/api/exercises", json={"name": "Row"}, headers=headers)
+    assert res.status_code == 201
+    assert "Idempotent-Replayed" not in res.headers
+
+
+def test_service_worker_served_from_root(client):
+    res = client.get("/sw.js")
+    assert res.status_code == 200
+    assert res.mimetype == "application/javascript"
+
+
+def test_logout_with_idempotency_key(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    res = c.post("/api/auth/logout", headers={"Idempotency-Key": "logout-1"})
+    assert res.status_code == 200
+    assert c.get("/api/auth/me").status_code == 401
+
+
+def test_duplicate_while_first_is_in_flight(client, db):
+    from app.models.idempotency import IdempotencyKey
+
+    c, p, w, ex1, ex2 = setup_workout(client)
+    user_id = c.get("/api/auth/me").json["id"]
+    # What the first request commits before its view runs
+    db.session.add(IdempotencyKey(user_id=user_id, key="in-flight", method="POST", path="/api/logs"))
+    db.session.commit()
+
+    res = c.post("/api/logs", json={"workout_id": w["id"]}, headers={"Idempotency-Key": "in-flight"})
+    assert res.status_code == 409
+    assert res.headers["Retry-After"] == "1"
+    assert c.get("/api/logs").json == []
@@ -0,0 +1,94 @@
+import io
+import json
+
+from app.services import importer
+from tests.conftest import register_and_login, count_queries
+
+CSV = """Date,Workout Name,Exercise Name,Set Order,Weight,Reps,Duration
+2025-01-06 07:00:00,Day A,Squat,1,135,5,
+2025-01-06 07:00:00,Day A,Squat,2,145,5,
+2025-01-06 07:00:00,Day A,Rower,1,,,20
+2025-01-08 07:00:00,Day B,squat,1,155,3,
+"""
+
+
+def test_import_csv(client):
+    c = register_and_login(client)
+    c.post("/api/exercises", json={"name": "Squat", "type": "strength"})
+
+    res = c.post("/api/import?format=csv", data=CSV)
+    assert res.status_code == 201
+    assert res.json["logs"] == 2
+    assert res.json["sets"] == 4
+    assert res.json["exercises_created"] == 1
+
+    exercises = {e["name"]: e for e in c.get("/api/exercises").json}
+    assert set(exercises) == {"Squat", "Rower"}
+    assert exercises["Rower"]["type"] == "cardio"
+
+    logs = c.get("/api/logs").json
+    assert [log["workout_name"] for log in logs] == ["Day B", "Day A"]
+    assert [(s["exercise_name"], s["set_number"], s["weight"]) for s in logs[1]["sets"]] == [
+        ("Squat", 1, 135), ("Squat", 2, 145), ("Rower", 1, None),
+    ]
+    assert logs[1]["sets"][2]["duration_minutes"] == 20
+
+    progress = c.get(f"/api/exercises/{exercises['Squat']['id']}/progress").json
+    assert progress["pr"] == 155
+    assert progress["session_count"] == 2
+
+
+def test_import_json_formats_upload(client):
+    c = register_and_login(client)
+    records = [
+        {"date": "2025-02-01T10:00:00Z", "workout": "Upper", "exercise": "Bench", "reps": 8, "weight": 95},
+        {"date": "2025-02-01T10:00:00Z", "workout": "Upper", "exercise": "Bench", "reps": 8, "weight": 95},
+    ]
+    ndjson = "\n".join(json.dumps(r) for r in records)
+
+    res = c.post("/api/import", data={"file": (io.BytesIO(ndjson.encode()), "export.ndjson")})
+    assert res.status_code == 201
+    assert (res.json["logs"], res.json["sets"]) == (1, 2)
+
+    res = c.post("/api/import", data=json.dumps(records), content_type="application/json")
+    assert res.status_code == 201
+    assert (res.json["logs"], res.json["sets"], res.json["exercises_created"]) == (1, 2, 0)
+
+
+def test_json_array_parsed_across_chunks(monkeypatch):
+    monkeypatch.setattr(importer, "READ_SIZE", 7)
+    records = [{"exercise": f"Ex {n}", "notes": "x" * n} for n in range(20)]
+    stream = io.BytesIO(json.dumps(records).encode())
+    assert [r for _, r in importer.parse_records(stream, "json")] == records
+
+
+def test_bad_record_rolls_back(client):
+    c = register_and_login(client)
+    bad = CSV + "2025-01-09,Day A,Squat,1,heavy,5,\n"
+
+    res = c.post("/api/import?format=csv", data=bad)
+    assert res.status_code == 400
+    assert res.json["line"] == 6
+    assert "weight" in res.json["error"]
+    assert c.get("/api/logs").json == []
+    assert c.get("/api/exercises").json == []
+
+
+def test_import_inserts_in_chunks(client, db, monkeypatch):
+    c = register_and_login(client)
+    monkeypatch.setattr(importer, "CHUNK_SIZE", 10)
+
+    lines = ["date,workout,exercise,reps,weight"]
+    for n in range(40):
+        for ex in ("Squat", "Bench", "Row"):
+            lines += [f"2025-03-01T{n // 60:02d}:{n % 60:02d}:00,W,{ex},5,100"] * 3
+
+    with count_queries(db) as statements:
+        res = c.post("/api/import?format=csv", data="\n".join(lines))
+    assert (res.json["logs"], res.json["sets"]) == (40, 360)
+
+    inserts = [s.split("(")[0].strip() for s in statements if s.startswith("INSERT")]
+    # Log ids must come back in order, which SQLite can't do for a batch
+    assert inserts.count("INSERT INTO workout_logs") == (40 if db.engine.dialect.name == "sqlite" else 4)
+    assert inserts.count("INSERT INTO set_logs") == 4
+    assert inserts.count("INSERT INTO exercises") == 3
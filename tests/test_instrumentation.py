@@ -0,0 +1,48 @@
+import logging
+
+import pytest
+
+from app import create_app, db as _db, instrumentation
+from app.config import TestingConfig
+from tests.conftest import register_and_login
+
+
+@pytest.fixture
+def instrumented_app(monkeypatch):
+    monkeypatch.setattr(TestingConfig, "INSTRUMENTATION_ENABLED", True)
+    monkeypatch.setattr(TestingConfig, "QUERY_BUDGET", 0)
+    app = create_app("testing")
+    with app.app_context():
+        _db.create_all()
+        yield app
+        _db.session.remove()
+        _db.drop_all()
+
+
+def test_server_timing_and_metrics(instrumented_app, caplog):
+    c = register_and_login(instrumented_app.test_client())
+    c.post("/api/exercises", json={"name": "Squat"})
+
+    with caplog.at_level(logging.WARNING):
+        res = c.get("/api/exercises")
+        res.close()  # totals are recorded once the body has been sent
+    assert 'desc="' in res.headers["Server-Timing"]
+    assert "serialize;dur=" in res.headers["Server-Timing"]
+    assert any("api.list_exercises ran" in r.getMessage() for r in caplog.records)
+
+    res = c.get("/api/logs")
+    res.get_data()
+    res.close()
+
+    metrics = c.get("/metrics").get_data(as_text=True)
+    assert 'workout_tracker_requests_total{endpoint="api.list_exercises"} 1' in metrics
+    assert 'workout_tracker_sql_statements_total{endpoint="api.list_logs"}' in metrics
+    assert "workout_tracker_response_cache_misses_total" in metrics
+    assert "workout_tracker_password_hash_rounds 4" in metrics
+    assert instrumentation.snapshot()["api.list_exercises"]["response_bytes"] > 0
+
+
+def test_metrics_disabled_by_default(client):
+    assert client.get("/metrics").status_code == 404
+    register_and_login(client)
+    assert "Server-Timing" not in client.get("/api/exercises").headers
@@ -0,0 +1,74 @@
+import gzip
+from datetime import datetime
+
+import pytest
+from sqlalchemy import select
+
+from app.models.log import WorkoutLog
+from tests.test_logging import setup_workout
+
+
+def log_several(c, w, p, count=5):
+    for _ in range(count):
+        c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]})
+
+
+def test_native_and_stdlib_encoders_agree(client, app):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log_several(c, w, p)
+    if not app.json.native:
+        pytest.skip("orjson not installed")
+
+    native = c.get("/api/logs").get_data()
+    app.json.native = False
+    stdlib = c.get("/api/logs?_=1").get_data()
+    assert native == stdlib
+
+
+def test_rows_and_datetimes_encode_directly(client, app, db):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log_several(c, w, p, count=1)
+
+    row = db.session.execute(select(WorkoutLog.id, WorkoutLog.started_at)).first()
+    available = app.json.native
+    for native in (True, False):
+        app.json.native = native and available
+        data = app.json.loads(app.json.dumps({"row": row, "at": datetime(2026, 1, 2, 3, 4, 5)}))
+        assert data == {"row": {"id": row.id, "started_at": row.started_at.isoformat()}, "at": "2026-01-02T03:04:05"}
+
+
+def test_large_responses_are_gzipped(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log_several(c, w, p)
+
+    plain = c.get("/api/logs?limit=50")
+    assert "Content-Encoding" not in plain.headers
+
+    res = c.get("/api/logs?limit=50&_=1", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in res.headers["Vary"]
+    assert gzip.decompress(res.get_data()) == plain.get_data()
+
+    # Compressed bodies carry a weak tag that still revalidates
+    etag = res.headers["ETag"]
+    assert etag.startswith("W/")
+    res = c.get("/api/logs?limit=50&_=1", headers={"Accept-Encoding": "gzip", "If-None-Match": etag})
+    assert res.status_code == 304
+
+
+def test_streamed_responses_are_gzipped(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log_several(c, w, p)
+
+    plain = c.get("/api/logs").get_data()
+    res = c.get("/api/logs?_=1", headers={"Accept-Encoding": "gzip"})
+    assert res.is_streamed
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert gzip.decompress(res.get_data()) == plain
+
+
+def test_small_responses_are_not_compressed(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    res = c.get("/api/auth/me", headers={"Accept-Encoding": "gzip"})
+    assert "Content-Encoding" not in res.headers
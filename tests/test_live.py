@@ -0,0 +1,156 @@
+import json
+import sys
+import threading
+import types
+
+import pytest
+
+from app import live_updates
+from app.live import RESYNC, LocalBroker, RedisBroker
+from tests.conftest import register_and_login
+
+
+@pytest.fixture
+def live_log(app, client):
+    app.config.update(LIVE_HEARTBEAT_SECONDS=0.01, LIVE_STREAM_MAX_SECONDS=5)
+    c = register_and_login(client)
+    ex = c.post("/api/exercises", json={"name": "Squat"}).json
+    w = c.post("/api/workouts", json={"name": "A"}).json
+    c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": ex["id"], "default_sets": 3})
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    return c, log
+
+
+def next_event(events):
+    """The next non-keepalive frame as (event, data)."""
+    for frame in events:
+        if not frame.startswith(":"):
+            break
+    name, data = (line.split(": ", 1)[1] for line in frame.strip().split("\n"))
+    return name, json.loads(data)
+
+
+def test_stream_relays_set_deltas(live_log):
+    c, log = live_log
+    sets = log["sets"]
+    res = c.get(f"/api/logs/{log['id']}/stream")
+    assert res.mimetype == "text/event-stream"
+    assert "ETag" not in res.headers
+    events = (frame.decode() for frame in res.response)
+    assert next(events).startswith("retry:")
+
+    c.put(f"/api/logs/{log['id']}/sets/{sets[0]['id']}", json={"completed": True}, headers={"X-Client-Id": "phone"})
+    assert next_event(events) == ("sets", {"sets": [{"id": sets[0]["id"], "completed": True}], "origin": "phone"})
+
+    c.patch(f"/api/logs/{log['id']}/sets", json={"sets": [{"id": sets[1]["id"], "actual_reps": 3}]})
+    assert next_event(events) == ("sets", {"sets": [{"id": sets[1]["id"], "actual_reps": 3}], "origin": None})
+
+    c.delete(f"/api/logs/{log['id']}/sets/{sets[2]['id']}")
+    assert next_event(events) == ("set_deleted", {"id": sets[2]["id"], "origin": None})
+
+    c.put(f"/api/logs/{log['id']}", json={"notes": "Felt strong"})
+    assert next_event(events) == ("log", {"log": {"notes": "Felt strong"}, "origin": None})
+    res.close()
+    assert live_updates.broker.stats()["subscribers"] == 0
+
+
+def test_stream_ends_and_unsubscribes(app, live_log):
+    c, log = live_log
+    app.config["LIVE_STREAM_MAX_SECONDS"] = 0.05
+    frames = [frame.decode() for frame in c.get(f"/api/logs/{log['id']}/stream").response]
+    assert frames[0].startswith("retry:")
+    assert set(frames[1:]) == {": keepalive\n\n"}
+    assert live_updates.broker.stats() == {"channels": 0, "subscribers": 0}
+
+
+def test_stream_requires_own_log(live_log):
+    c, log = live_log
+    assert c.get(f"/api/logs/{log['id'] + 1}/stream").status_code == 404
+
+
+def test_slow_subscriber_gets_resync():
+    broker = LocalBroker(queue_size=2)
+    subscription = broker.subscribe("log:1")
+    other = broker.subscribe("log:2")
+    for n in range(3):
+        broker.publish("log:1", f"event: sets\ndata: {n}\n\n")
+
+    assert subscription.get(timeout=0) == RESYNC
+    assert subscription.get(timeout=0) is None
+    assert other.get(timeout=0) is None
+    broker.publish("log:1", "event: sets\ndata: 3\n\n")
+    assert subscription.get(timeout=0) == "event: sets\ndata: 3\n\n"
+
+
+class FlakyRedis:
+    """Drops the first pub/sub connection, then relays one message."""
+
+    def __init__(self):
+        self.connections = 0
+        self.done = threading.Event()
+        self.received = threading.Event()
+
+    def pubsub(self, ignore_subscribe_messages):
+        self.connections += 1
+        return FlakyPubSub(self, self.connections)
+
+
+class FlakyPubSub:
+    def __init__(self, redis, number):
+        self.redis = redis
+        self.number = number
+
+    def psubscribe(self, pattern):
+        if self.number > 2:
+            threading.Event().wait()  # Park the listener once the test is over
+
+    def listen(self):
+        if self.number == 1:
+            raise ConnectionError("Connection reset by peer")
+        yield {"channel": b"wt:live:log:1", "data": b"event: sets\ndata: 1\n\n"}
+        self.redis.received.set()
+        self.redis.done.wait()
+
+    def close(self):
+        pass
+
+
+def test_redis_listener_reconnects(monkeypatch):
+    fake = FlakyRedis()
+    monkeypatch.setitem(sys.modules, "redis", types.SimpleNamespace(
+        Redis=types.SimpleNamespace(from_url=lambda url: fake),
+    ))
+    broker = RedisBroker("redis://test")
+    broker.retry_delay = 0.01
+    subscription = broker.subscribe("log:1")
+    try:
+        assert fake.received.wait(timeout=5)
+        assert fake.connections == 2
+        # Whatever was published while disconnected is lost, so refetch
+        assert subscription.get(timeout=1) == RESYNC
+    finally:
+        fake.done.set()
+
+
+def test_stream_is_off_without_a_shared_broker(live_log, monkeypatch):
+    c, log = live_log
+    monkeypatch.setattr(live_updates, "enabled", False)
+    # 204 tells EventSource not to reconnect
+    assert c.get(f"/api/logs/{log['id']}/stream").status_code == 204
+    assert b"const LIVE_UPDATES = false;" in c.get(f"/workout/{log['id']}/active").data
+
+
+def test_streams_per_process_are_capped(live_log, monkeypatch):
+    c, log = live_log
+    monkeypatch.setattr(live_updates, "max_streams", 1)
+    held = live_updates.subscribe(log["id"])
+    try:
+        res = c.get(f"/api/logs/{log['id']}/stream")
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == "30"
+    finally:
+        live_updates.unsubscribe(held)
+    res = c.get(f"/api/logs/{log['id']}/stream")
+    assert res.status_code == 200
+    res.close()
+    assert live_updates.broker.stats()["subscribers"] == 0
@@ -1,4 +1,4 @@
-from tests.conftest import register_and_login
+from tests.conftest import register_and_login, count_queries
 
 
 def setup_workout(client):
@@ -107,3 +107,332 @@ def test_next_workout(client):
     res = c.get(f"/api/programs/{p['id']}/next")
     assert res.status_code == 200
     assert res.json["next_workout"]["name"] == "Full Body"
+
+
+def test_history_pagination(client, db):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    ids = [c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json["id"] for _ in range(5)]
+
+    res = c.get("/api/logs?limit=2")
+    assert res.status_code == 200
+    assert [log["id"] for log in res.json["logs"]] == ids[::-1][:2]
+    assert len(res.json["logs"][0]["sets"]) == 4
+
+    seen = [log["id"] for log in res.json["logs"]]
+    cursor = res.json["next_cursor"]
+    while cursor:
+        page = c.get(f"/api/logs?limit=2&cursor={cursor}").json
+        seen += [log["id"] for log in page["logs"]]
+        cursor = page["next_cursor"]
+    assert seen == ids[::-1]
+
+    assert c.get("/api/logs?limit=2&cursor=bogus").status_code == 400
+
+
+def test_history_query_count_is_bounded(client, db):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]})
+    with count_queries(db) as few:
+        c.get("/api/logs?limit=50").get_data()
+
+    for _ in range(5):
+        c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]})
+    with count_queries(db) as many:
+        c.get("/api/logs?limit=50").get_data()
+
+    assert len(many) == len(few)
+
+
+def test_exercise_progress(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    first = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    squats = [s for s in first["sets"] if s["exercise_id"] == ex1["id"]]
+    c.put(f"/api/logs/{first['id']}/sets/{squats[0]['id']}", json={"completed": True, "weight": 135})
+    c.put(f"/api/logs/{first['id']}/sets/{squats[1]['id']}", json={"completed": True, "weight": 145})
+
+    second = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    squat = next(s for s in second["sets"] if s["exercise_id"] == ex1["id"])
+    c.put(f"/api/logs/{second['id']}/sets/{squat['id']}", json={"completed": True, "weight": 155})
+
+    res = c.get(f"/api/exercises/{ex1['id']}/progress")
+    assert res.status_code == 200
+    assert res.json["pr"] == 155
+    assert res.json["recent_weights"] == [155, 145, 135]
+    assert res.json["session_count"] == 2
+    assert res.json["total_volume"] == (135 + 145 + 155) * 5
+    assert [h["log_id"] for h in res.json["history"]] == [second["id"], first["id"]]
+
+    # Summary follows deletes
+    c.delete(f"/api/logs/{second['id']}")
+    res = c.get(f"/api/exercises/{ex1['id']}/progress?limit=1")
+    assert res.json["pr"] == 145
+    assert res.json["session_count"] == 1
+    assert res.json["next_offset"] is None
+
+    c.delete(f"/api/logs/{first['id']}/sets/{squats[1]['id']}")
+    res = c.get(f"/api/exercises/{ex1['id']}/progress")
+    assert res.json["pr"] == 135
+    assert res.json["recent_weights"] == [135]
+
+
+def test_start_workout_query_count_is_constant(client, db):
+    c = register_and_login(client)
+
+    def template(size):
+        w = c.post("/api/workouts", json={"name": f"W{size}"}).json
+        for i in range(size):
+            ex = c.post("/api/exercises", json={"name": f"Ex {size}-{i}", "type": "strength"}).json
+            c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": ex["id"], "default_sets": 5})
+        return w
+
+    small, large = template(1), template(10)
+
+    with count_queries(db) as few:
+        res = c.post("/api/logs", json={"workout_id": small["id"]})
+    assert len(res.json["sets"]) == 5
+
+    with count_queries(db) as many:
+        res = c.post("/api/logs", json={"workout_id": large["id"]})
+    assert len(res.json["sets"]) == 50
+    assert res.json["sets"][0]["exercise_name"] == "Ex 10-0"
+    assert len(many) == len(few)
+
+    # Switching workouts reuses the same path
+    res = c.put(f"/api/logs/{res.json['id']}", json={"workout_id": small["id"]})
+    assert len(res.json["sets"]) == 5
+    assert res.json["workout_name"] == "W1"
+
+
+def test_batch_update_sets(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    s1, s2, s3, cardio = log["sets"]
+
+    res = c.patch(f"/api/logs/{log['id']}/sets", json={"sets": [
+        {"id": s1["id"], "completed": True},
+        {"id": s2["id"], "completed": True, "actual_reps": 3},
+        {"id": s1["id"], "weight": 140},
+        {"id": cardio["id"], "duration_minutes": 25, "completed": True},
+    ]})
+    assert res.status_code == 200
+    updated = {s["id"]: s for s in res.json["sets"]}
+    assert len(updated) == 3
+    assert updated[s1["id"]]["completed"] is True
+    assert updated[s1["id"]]["weight"] == 140
+    assert updated[s2["id"]]["actual_reps"] == 3
+    assert updated[cardio["id"]]["duration_minutes"] == 25
+
+    sets = {s["id"]: s for s in c.get(f"/api/logs/{log['id']}").json["sets"]}
+    assert sets[s3["id"]]["completed"] is False
+    assert c.get(f"/api/exercises/{ex1['id']}/progress").json["pr"] == 140
+
+
+def test_batch_update_sets_checks_ownership(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    other = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+
+    res = c.patch(f"/api/logs/{log['id']}/sets", json={"sets": [
+        {"id": log["sets"][0]["id"], "completed": True},
+        {"id": other["sets"][0]["id"], "completed": True},
+    ]})
+    assert res.status_code == 404
+    assert res.json["set_ids"] == [other["sets"][0]["id"]]
+
+    # Nothing was applied
+    assert c.get(f"/api/logs/{log['id']}").json["sets"][0]["completed"] is False
+
+    res = c.patch(f"/api/logs/{log['id']}/sets", json={"sets": [{"completed": True}]})
+    assert res.status_code == 400
+
+
+def test_batch_update_sets_rejects_bad_input(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    set_id = log["sets"][0]["id"]
+    url = f"/api/logs/{log['id']}/sets"
+
+    assert c.patch(url, json=[{"id": set_id, "completed": True}]).status_code == 400
+    assert c.patch(url, json={"sets": [{"id": True, "completed": True}]}).status_code == 400
+    for field, value in [("weight", "heavy"), ("actual_reps", 2.5), ("completed", 1), ("duration_minutes", [5])]:
+        res = c.patch(url, json={"sets": [{"id": set_id, field: value}]})
+        assert res.status_code == 400
+        assert field in res.json["error"]
+
+    res = c.put(f"{url}/{set_id}", json={"weight": "heavy"})
+    assert res.status_code == 400
+    assert c.get(f"/api/logs/{log['id']}").json["sets"][0]["weight"] != "heavy"
+
+
+def test_next_workout_rotation(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    w2 = c.post("/api/workouts", json={"name": "Upper"}).json
+    c.put(f"/api/programs/{p['id']}/order", json={"workout_ids": [w["id"], w2["id"]]})
+
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    res = c.get(f"/api/programs/{p['id']}/next").json
+    assert res["in_progress_log_id"] == log["id"]
+    assert res["next_workout"]["name"] == "Full Body"
+    assert len(res["next_workout"]["exercises"]) == 2
+
+    c.put(f"/api/logs/{log['id']}", json={"complete": True})
+    res = c.get(f"/api/programs/{p['id']}/next").json
+    assert "in_progress_log_id" not in res
+    assert [u["name"] for u in res["upcoming"]] == ["Upper", "Full Body"]
+    assert res["next_workout"] == res["upcoming"][0]
+
+
+def test_next_workout_query_count_is_constant(client, db):
+    c, p, w, ex1, ex2 = setup_workout(client)
+
+    with count_queries(db) as short:
+        c.get(f"/api/programs/{p['id']}/next")
+
+    long_program = c.post("/api/programs", json={"name": "Long"}).json
+    ids = []
+    for i in range(8):
+        wk = c.post("/api/workouts", json={"name": f"Day {i}"}).json
+        c.post(f"/api/workouts/{wk['id']}/exercises", json={"exercise_id": ex1["id"]})
+        c.post(f"/api/workouts/{wk['id']}/exercises", json={"exercise_id": ex2["id"]})
+        ids.append(wk["id"])
+    c.put(f"/api/programs/{long_program['id']}/order", json={"workout_ids": ids})
+
+    with count_queries(db) as long:
+        res = c.get(f"/api/programs/{long_program['id']}/next")
+    assert len(res.json["upcoming"]) == 8
+    assert len(long) == len(short)
+
+
+def test_calendar_year_view_in_local_time(client, db):
+    from datetime import datetime
+    from app.models.log import WorkoutLog
+
+    c, p, w, ex1, ex2 = setup_workout(client)
+    late = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    squat = next(s for s in late["sets"] if s["exercise_id"] == ex1["id"])
+    c.put(f"/api/logs/{late['id']}/sets/{squat['id']}", json={"completed": True})
+    c.put(f"/api/logs/{late['id']}", json={"complete": True})
+    other = c.post("/api/logs", json={"workout_id": w["id"]}).json
+
+    # 03:30 UTC on March 10th is still the evening of March 9th in New York
+    db.session.get(WorkoutLog, late["id"]).started_at = datetime(2026, 3, 10, 3, 30)
+    db.session.get(WorkoutLog, other["id"]).started_at = datetime(2026, 7, 4, 12, 0)
+    db.session.commit()
+
+    res = c.get("/api/logs/calendar?year=2026&view=year&tz=America/New_York")
+    assert res.status_code == 200
+    assert res.json["workout_dates"] == ["2026-03-09", "2026-07-04"]
+    march = res.json["days"][0]
+    assert march["count"] == 1
+    assert march["completed"] == 1
+    assert march["volume"] == 135 * 5
+
+    res = c.get("/api/logs/calendar?year=2026&month=3")
+    assert res.json["workout_dates"] == ["2026-03-10"]
+
+    assert c.get("/api/logs/calendar?tz=Nowhere/Special").status_code == 400
+    for query in ("month=13", "month=0&year=2026", "year=9999&view=year", "year=9999&month=12", "year=1&tz=Asia/Tokyo"):
+        assert c.get(f"/api/logs/calendar?{query}").status_code == 400
+    assert c.get("/api/logs/calendar?year=9998&month=12&tz=Pacific/Kiritimati").status_code == 200
+
+
+def test_logs_for_a_local_day(client, db):
+    from datetime import datetime
+    from app.models.log import WorkoutLog
+
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    db.session.get(WorkoutLog, log["id"]).started_at = datetime(2026, 3, 10, 3, 30)
+    db.session.commit()
+
+    # March 9th in New York (UTC-5), as history.html asks for it
+    res = c.get("/api/logs?from=2026-03-09T05:00:00.000Z&to=2026-03-10T04:59:59.999Z")
+    assert [l["id"] for l in res.json] == [log["id"]]
+    assert c.get("/api/logs?from=2026-03-10T00:00:00-05:00").json == []
+    assert c.get("/api/logs?from=yesterday").status_code == 400
+
+
+def test_completing_sets_updates_progress_incrementally(client, db):
+    from app.models.progress import ExerciseProgress
+    from app.services.progress import refresh_progress
+
+    c, p, w, ex1, ex2 = setup_workout(client)
+    first = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    squats = [s for s in first["sets"] if s["exercise_id"] == ex1["id"]]
+    c.put(f"/api/logs/{first['id']}/sets/{squats[0]['id']}", json={"completed": True, "weight": 135})
+
+    second = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    squats = [s for s in second["sets"] if s["exercise_id"] == ex1["id"]]
+    with count_queries(db) as statements:
+        c.put(f"/api/logs/{second['id']}/sets/{squats[0]['id']}", json={"completed": True, "weight": 155})
+    # Folded into the summary row, without rereading the exercise's history
+    assert not [s for s in statements if "GROUP BY" in s]
+    c.patch(f"/api/logs/{second['id']}/sets", json={"sets": [
+        {"id": squats[1]["id"], "completed": True, "weight": 145, "actual_reps": 1},
+        {"id": squats[2]["id"], "completed": True, "weight": 135},
+    ]})
+
+    def summary():
+        row = ExerciseProgress.query.filter_by(exercise_id=ex1["id"]).one()
+        return row.to_dict() | {"recent_weights": sorted(row.recent_weights)}
+
+    incremental = summary()
+    refresh_progress(c.get("/api/auth/me").json["id"], [ex1["id"]])
+    db.session.commit()
+    assert incremental == summary()
+    assert incremental["session_count"] == 2
+    assert incremental["best_e1rm"] == round(155 * (1 + 5 / 30), 1)
+
+    # Lowering a completed set recomputes from the history
+    c.put(f"/api/logs/{second['id']}/sets/{squats[0]['id']}", json={"weight": 95})
+    assert c.get(f"/api/exercises/{ex1['id']}/progress").json["pr"] == 145
+
+
+def test_progress_e1rm_of_a_single_is_the_weight(client):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    squats = [s for s in log["sets"] if s["exercise_id"] == ex1["id"]]
+    c.put(f"/api/logs/{log['id']}/sets/{squats[0]['id']}", json={"completed": True, "weight": 100})
+
+    # Folded in incrementally, then recomputed in SQL after an edit
+    c.put(f"/api/logs/{log['id']}/sets/{squats[1]['id']}", json={"completed": True, "weight": 200, "actual_reps": 1})
+    assert c.get(f"/api/exercises/{ex1['id']}/progress").json["best_e1rm"] == 200
+    c.put(f"/api/logs/{log['id']}/sets/{squats[1]['id']}", json={"weight": 210})
+    assert c.get(f"/api/exercises/{ex1['id']}/progress").json["best_e1rm"] == 210
+
+
+def test_log_sets_ordered_by_exercise_and_set_number(client):
+    c = register_and_login(client)
+    first = c.post("/api/exercises", json={"name": "Squat"}).json
+    second = c.post("/api/exercises", json={"name": "Bench"}).json
+    w = c.post("/api/workouts", json={"name": "A"}).json
+    # Template order differs from exercise id order
+    c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": second["id"], "default_sets": 2})
+    c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": first["id"], "default_sets": 2})
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+
+    expected = [(first["id"], 1), (first["id"], 2), (second["id"], 1), (second["id"], 2)]
+    for sets in (c.get("/api/logs").json[0]["sets"], c.get(f"/api/logs/{log['id']}").json["sets"]):
+        assert [(s["exercise_id"], s["set_number"]) for s in sets] == expected
+
+
+def test_started_and_switched_sets_match_get(client):
+    c = register_and_login(client)
+    a = c.post("/api/exercises", json={"name": "Squat"}).json
+    b = c.post("/api/exercises", json={"name": "Bench"}).json
+    workouts = []
+    for name in ("B first", "Also B first"):
+        w = c.post("/api/workouts", json={"name": name}).json
+        c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": b["id"], "default_sets": 2})
+        c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": a["id"], "default_sets": 2})
+        workouts.append(w)
+
+    started = c.post("/api/logs", json={"workout_id": workouts[0]["id"]}).json
+    assert started["sets"] == c.get(f"/api/logs/{started['id']}").json["sets"]
+    switched = c.put(f"/api/logs/{started['id']}", json={"workout_id": workouts[1]["id"]}).json
+    assert switched["sets"] == c.get(f"/api/logs/{started['id']}?fresh=1").json["sets"]
+    assert [s["exercise_id"] for s in switched["sets"]] == [a["id"], a["id"], b["id"], b["id"]]
@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import event
+
+from tests.test_logging import setup_workout
+
+
+@pytest.fixture
+def plans(db):
+    """Record EXPLAIN QUERY PLAN output for every SELECT issued in the test."""
+    recorded = []
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT") and not executemany:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters).fetchall()
+            recorded.append((statement, [row[-1] for row in rows]))
+
+    event.listen(db.engine, "before_cursor_execute", before_cursor_execute)
+    yield recorded
+    event.remove(db.engine, "before_cursor_execute", before_cursor_execute)
+
+
+def full_scans(recorded):
+    """Return (table step, statement) pairs that walk a whole table."""
+    scans = []
+    for statement, details in recorded:
+        for detail in details:
+            # "SCAN t USING INDEX ix" is an ordered index walk and is fine
+            if detail.startswith("SCAN ") and "USING" not in detail:
+                scans.append((detail, statement))
+    return scans
+
+
+def test_api_reads_use_indexes(client, plans):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    c.put(f"/api/logs/{log['id']}/sets/{log['sets'][0]['id']}", json={"completed": True})
+    plans.clear()
+
+    for url in [
+        "/api/programs",
+        f"/api/programs/{p['id']}",
+        f"/api/programs/{p['id']}/next",
+        "/api/workouts",
+        f"/api/workouts/{w['id']}",
+        "/api/exercises",
+        "/api/logs",
+        "/api/logs?limit=10",
+        "/api/logs/calendar",
+        f"/api/logs/{log['id']}",
+        f"/api/exercises/{ex1['id']}/progress",
+        f"/api/exercises/{ex2['id']}/progress",
+    ]:
+        res = c.get(url)
+        res.get_data()
+        assert res.status_code == 200, url
+
+    assert plans
+    assert full_scans(plans) == []
+
+
+def test_api_writes_use_indexes(client, plans):
+    c, p, w, ex1, ex2 = setup_workout(client)
+    plans.clear()
+
+    log = c.post("/api/logs", json={"workout_id": w["id"], "program_id": p["id"]}).json
+    c.put(f"/api/logs/{log['id']}/sets/{log['sets'][0]['id']}", json={"completed": True})
+    c.patch(f"/api/logs/{log['id']}/sets", json={"sets": [{"id": log["sets"][1]["id"], "completed": True}]})
+    c.put(f"/api/logs/{log['id']}", json={"workout_id": w["id"]})
+    c.put(f"/api/programs/{p['id']}/order", json={"workout_ids": [w["id"]]})
+    c.delete(f"/api/logs/{log['id']}")
+
+    assert full_scans(plans) == []
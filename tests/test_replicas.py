@@ -0,0 +1,117 @@
+import sqlite3
+
+import pytest
+
+from app import create_app, db as _db
+from app.config import TestingConfig, config
+
+
+@pytest.fixture
+def replicated(tmp_path, monkeypatch):
+    """An app on a primary SQLite file plus one replica file, and a function
+    that "replicates" by copying the primary over the replica."""
+    primary, replica = tmp_path / "primary.db", tmp_path / "replica.db"
+
+    class ReplicaConfig(TestingConfig):
+        SQLALCHEMY_DATABASE_URI = f"sqlite:///{primary}"
+        SQLALCHEMY_BINDS = {"replica_0": f"sqlite:///{replica}"}
+        READ_REPLICA_STICKY_SECONDS = 60
+
+    monkeypatch.setitem(config, "replicated", ReplicaConfig)
+    app = create_app("replicated")
+    with app.app_context():
+        _db.create_all()
+
+    def replicate():
+        with app.app_context():
+            # Close pooled replica connections so they see the new file contents
+            _db.engines["replica_0"].dispose()
+        with sqlite3.connect(primary) as src, sqlite3.connect(replica) as dst:
+            src.backup(dst)
+
+    replicate()
+    yield app, replicate
+    with app.app_context():
+        for engine in _db.engines.values():
+            engine.dispose()
+    # init_app registered a metadata for the bind on the shared extension;
+    # later apps' create_all() would look for it
+    _db.metadatas.pop("replica_0", None)
+
+
+def expire_stickiness(c):
+    with c.session_transaction() as s:
+        s["primary_until"] = 0
+
+
+def test_reads_go_to_replica_after_sticky_window(replicated):
+    app, replicate = replicated
+    c = app.test_client()
+    c.post("/api/auth/register", json={"email": "a@example.com", "password": "password123"})
+    c.post("/api/programs", json={"name": "Replicated"})
+    replicate()
+    c.post("/api/programs", json={"name": "Primary only"})
+
+    # Just wrote: read your own writes from the primary
+    res = c.get("/api/programs")
+    assert [p["name"] for p in res.json] == ["Replicated", "Primary only"]
+
+    # Later reads hit the (lagging) replica, and aren't cached or tagged
+    expire_stickiness(c)
+    res = c.get("/api/programs?fresh=1")
+    assert [p["name"] for p in res.json] == ["Replicated"]
+    assert "ETag" not in res.headers
+
+    replicate()
+    res = c.get("/api/programs?fresh=2")
+    assert [p["name"] for p in res.json] == ["Replicated", "Primary only"]
+
+
+def test_writes_always_go_to_primary(replicated):
+    app, replicate = replicated
+    c = app.test_client()
+    c.post("/api/auth/register", json={"email": "a@example.com", "password": "password123"})
+    expire_stickiness(c)
+
+    res = c.post("/api/exercises", json={"name": "Squat", "type": "strength"})
+    assert res.status_code == 201
+
+    with app.app_context():
+        with _db.engines["replica_0"].connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM exercises").scalar() == 0
+        with _db.engine.connect() as conn:
+            assert conn.exec_driver_sql("SELECT count(*) FROM exercises").scalar() == 1
+
+
+def test_auth_reads_stay_on_primary(replicated):
+    app, replicate = replicated
+    c = app.test_client()
+    # Registered after the last replication: only the primary knows this user
+    c.post("/api/auth/register", json={"email": "a@example.com", "password": "password123"})
+    expire_stickiness(c)
+
+    assert c.get("/api/auth/me").status_code == 200
+    assert c.get("/api/programs").status_code == 200
+
+
+def test_progress_reads_stay_on_primary(replicated):
+    app, replicate = replicated
+    c = app.test_client()
+    c.post("/api/auth/register", json={"email": "a@example.com", "password": "password123"})
+    exercise = c.post("/api/exercises", json={"name": "Squat", "type": "strength"}).json
+    replicate()
+    expire_stickiness(c)
+
+    # The first view stores the summary row; the replica never sees it
+    assert c.get(f"/api/exercises/{exercise['id']}/progress").status_code == 200
+    assert c.get(f"/api/exercises/{exercise['id']}/progress?again=1").status_code == 200
+
+
+def test_writes_within_the_window_leave_the_cookie_alone(replicated):
+    app, replicate = replicated
+    c = app.test_client()
+    c.post("/api/auth/register", json={"email": "a@example.com", "password": "password123"})
+    c.post("/api/programs", json={"name": "First"})
+
+    res = c.post("/api/programs", json={"name": "Second"})
+    assert "Set-Cookie" not in res.headers
@@ -0,0 +1,68 @@
+from app.services.search import ExerciseIndex
+from tests.conftest import count_queries, register_and_login
+
+NAMES = ["Squat", "Front Squat", "Split Squat", "Squat Jump", "Bench Press", "Incline Bench Press", "Deadlift"]
+
+
+def names(res):
+    return [e["name"] for e in res.json]
+
+
+def test_search_ranks_matches(client):
+    c = register_and_login(client)
+    for name in NAMES:
+        c.post("/api/exercises", json={"name": name})
+
+    assert names(c.get("/api/exercises/search?q=squat")) == ["Squat", "Squat Jump", "Front Squat", "Split Squat"]
+    assert names(c.get("/api/exercises/search?q=ben")) == ["Bench Press", "Incline Bench Press"]
+    assert names(c.get("/api/exercises/search?q=inc+be")) == ["Incline Bench Press"]
+    assert names(c.get("/api/exercises/search?q=squat&limit=1")) == ["Squat"]
+    assert c.get("/api/exercises/search?q=").json == []
+
+
+def test_search_tolerates_typos(client):
+    c = register_and_login(client)
+    for name in NAMES:
+        c.post("/api/exercises", json={"name": name})
+
+    assert names(c.get("/api/exercises/search?q=sqaut"))[0] == "Squat"
+    assert names(c.get("/api/exercises/search?q=deadlfit")) == ["Deadlift"]
+    assert c.get("/api/exercises/search?q=zzzz").json == []
+
+
+def test_search_index_is_reused_and_invalidated(client, db):
+    c = register_and_login(client)
+    squat = c.post("/api/exercises", json={"name": "Squat"}).json
+    c.get("/api/exercises/search?q=sq")
+
+    with count_queries(db) as statements:
+        assert names(c.get("/api/exercises/search?q=squ")) == ["Squat"]
+    assert not [s for s in statements if "FROM exercises" in s]
+
+    c.post("/api/exercises", json={"name": "Squat Jump"})
+    assert names(c.get("/api/exercises/search?q=squ")) == ["Squat", "Squat Jump"]
+    c.put(f"/api/exercises/{squat['id']}", json={"name": "Box Squat"})
+    assert names(c.get("/api/exercises/search?q=box")) == ["Box Squat"]
+    c.delete(f"/api/exercises/{squat['id']}")
+    assert names(c.get("/api/exercises/search?q=squ")) == ["Squat Jump"]
+
+
+def test_search_index_survives_other_writes(client, db):
+    c = register_and_login(client)
+    squat = c.post("/api/exercises", json={"name": "Squat"}).json
+    w = c.post("/api/workouts", json={"name": "A"}).json
+    c.post(f"/api/workouts/{w['id']}/exercises", json={"exercise_id": squat["id"], "default_sets": 1})
+    log = c.post("/api/logs", json={"workout_id": w["id"]}).json
+    c.get("/api/exercises/search?q=sq")
+
+    # Logging sets mid-workout doesn't touch the exercise list
+    c.put(f"/api/logs/{log['id']}/sets/{log['sets'][0]['id']}", json={"completed": True, "actual_reps": 5})
+    with count_queries(db) as statements:
+        assert names(c.get("/api/exercises/search?q=squ")) == ["Squat"]
+    assert not [s for s in statements if "FROM exercises" in s]
+
+
+def test_index_long_prefixes():
+    index = ExerciseIndex([{"id": 1, "name": "Hyperextension"}, {"id": 2, "name": "Hyperextensions Machine"}])
+    assert [e["id"] for e in index.search("hyperextensions")] == [2]
+    assert [e["id"] for e in index.search("hyperextension")] == [1, 2]